@@ -0,0 +1 @@
+# jarvis/benchmarks/__init__.py
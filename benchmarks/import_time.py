@@ -0,0 +1,113 @@
+"""
+Import-time budget check.
+
+Imports each module in a fresh interpreter, several times, and fails when the
+best time exceeds its budget or when a heavy dependency that should only be
+loaded on first use shows up in sys.modules.
+
+Run from the project root:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --scale 2.0   # slower machine / CI
+
+Exits with status 1 if any budget is exceeded. Modules whose own dependencies
+are not installed are reported and skipped.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> (budget in milliseconds, modules that must not be imported as a side effect).
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "core.config": (10, ("dotenv",)),
+    "core.logger": (30, ()),
+    "core.tracing": (15, ()),
+    "core.metrics": (15, ("http.server",)),
+    "voice.text_to_speech.active_provider": (250, ("pygame", "aiohttp", "aiofiles", "dotenv")),
+    "voice.text_to_speech.batch": (250, ("pygame", "aiohttp", "aiofiles")),
+    "voice.wake_word": (50, ("pvporcupine", "pyaudio", "dotenv")),
+    "voice.recognition.providers.vosk_stt": (400, ("vosk", "pyaudio")),
+    "voice.dialog.providers.gemini_live.core.video": (400, ("cv2", "PIL", "mss")),
+}
+
+_PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+try:
+    importlib.import_module(sys.argv[1])
+except ImportError as e:
+    print(json.dumps({"missing": str(e)}))
+    sys.exit(0)
+print(json.dumps({"ms": (time.perf_counter() - start) * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure(module: str, runs: int) -> Dict:
+    """
+    Import module in `runs` fresh interpreters.
+
+    Returns:
+        Dict: {"ms": best time, "modules": modules loaded} or {"missing": error}.
+    """
+    best: Optional[Dict] = None
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _PROBE, module], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if "missing" in result:
+            return result
+        if best is None or result["ms"] < best["ms"]:
+            best = result
+    return best
+
+
+def check(modules: List[str], runs: int, scale: float) -> List[str]:
+    """
+    Measure each module against its budget.
+
+    Returns:
+        List[str]: Violations; empty when every module is within budget.
+    """
+    failures = []
+    print(f"{'module':<50} {'best ms':>9} {'budget':>8}  status")
+    for module in modules:
+        budget, forbidden = BUDGETS[module]
+        budget *= scale
+        result = measure(module, runs)
+        if "missing" in result:
+            print(f"{module:<50} {'-':>9} {budget:>8.0f}  skipped ({result['missing']})")
+            continue
+        problems = []
+        if result["ms"] > budget:
+            problems.append(f"{result['ms']:.0f} ms over the {budget:.0f} ms budget")
+        loaded = [name for name in forbidden if name in result["modules"]]
+        if loaded:
+            problems.append(f"eagerly imports {', '.join(loaded)}")
+        print(f"{module:<50} {result['ms']:>9.1f} {budget:>8.0f}  {'; '.join(problems) or 'ok'}")
+        failures.extend(f"{module}: {problem}" for problem in problems)
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check module import times against their budgets.")
+    parser.add_argument("modules", nargs="*", help="Modules to check; all budgeted modules by default.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module; the best run counts.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every time budget, e.g. for slow CI runners.")
+    args = parser.parse_args(argv)
+
+    unknown = [m for m in args.modules if m not in BUDGETS]
+    if unknown:
+        parser.error(f"No budget for: {', '.join(unknown)}")
+    failures = check(args.modules or list(BUDGETS), args.runs, args.scale)
+    if failures:
+        print("\nImport budget exceeded:\n  " + "\n  ".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# jarvis/benchmarks/tts/__init__.py
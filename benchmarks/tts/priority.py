@@ -0,0 +1,127 @@
+"""
+Interactive latency under background load.
+
+Runs a provider against the local fake backend behind a SynthesisScheduler
+with a fixed number of slots (standing in for a provider's rate limit) and
+measures interactive request latency in three scenarios:
+
+    idle         interactive requests only
+    fifo         batch threads saturate the provider; everything shares one queue
+    prioritized  the same batch load at batch priority, with slots reserved
+                 for interactive requests (one per interactive client by default)
+
+Run from the repository root with:
+    python -m benchmarks.tts.priority --slots 4 --batch-threads 16 --requests 60
+
+Exits with status 1 if the prioritized p95 is more than --max-regression
+above the idle p95.
+"""
+import argparse
+import itertools
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from benchmarks.tts.run import percentile, summarize
+
+
+def _interactive_latencies(manager, requests: int, clients: int, interval: float, priority) -> List[float]:
+    counter = itertools.count()
+
+    def one(_) -> float:
+        time.sleep(interval * (next(counter) % clients) / clients)
+        start = time.perf_counter()
+        manager.synthesize(f"Interactive reply {time.perf_counter_ns()}.", priority=priority)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        return list(executor.map(one, range(requests)))
+
+
+def run_scenario(manager, scenario: str, slots: int, reserved: int, batch_threads: int, requests: int,
+                 clients: int, interval: float) -> Dict[str, Any]:
+    """
+    Measure interactive latency for one scenario with a fresh scheduler.
+    """
+    from voice.text_to_speech.scheduler import Priority, SynthesisScheduler
+
+    prioritized = scenario != "fifo"
+    scheduler = SynthesisScheduler(max_concurrency=slots, reserved_interactive=reserved if prioritized else 0)
+    manager.set_scheduler(scheduler)
+    batch_priority = Priority.BATCH if prioritized else Priority.INTERACTIVE
+    stop = threading.Event()
+    batch_done = itertools.count()
+
+    def batch_worker(index: int) -> None:
+        for n in itertools.count():
+            if stop.is_set():
+                return
+            manager.synthesize(f"Batch job {index}-{n}.", priority=batch_priority)
+            next(batch_done)
+
+    workers = [threading.Thread(target=batch_worker, args=(i,), daemon=True)
+               for i in range(batch_threads if scenario != "idle" else 0)]
+    for worker in workers:
+        worker.start()
+    time.sleep(0.2 if workers else 0)
+    started = time.perf_counter()
+    latencies = _interactive_latencies(manager, requests, clients, interval, Priority.INTERACTIVE)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for worker in workers:
+        worker.join()
+    manager.set_scheduler(None)
+
+    result = summarize(latencies)
+    result["p95_ms"] = round(percentile(latencies, 95) * 1000.0, 3)
+    result["batch_throughput_rps"] = round(next(batch_done) / elapsed, 2) if workers else 0.0
+    result["scheduler"] = scheduler.stats()["priorities"]
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure interactive TTS latency while batch work runs.")
+    parser.add_argument("--provider", default="deepgram", help="PROVIDERS key of the provider to drive")
+    parser.add_argument("--slots", type=int, default=4, help="Concurrent provider calls allowed")
+    parser.add_argument("--reserved", type=int, default=None,
+                        help="Slots reserved for interactive requests (default: --clients)")
+    parser.add_argument("--batch-threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=60, help="Interactive requests per scenario")
+    parser.add_argument("--clients", type=int, default=2, help="Concurrent interactive clients")
+    parser.add_argument("--interval-ms", type=float, default=50.0, help="Spacing of interactive requests")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake backend latency")
+    parser.add_argument("--payload-kb", type=int, default=32)
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed relative p95 increase of 'prioritized' over 'idle'")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    from voice.text_to_speech.active_provider import TTSProviderManager
+    from voice.text_to_speech.fakes import FakeTTSBackend, FakeTTSServer
+
+    with FakeTTSServer(FakeTTSBackend(latency_ms=args.latency_ms, payload_kb=args.payload_kb)) as server:
+        manager = TTSProviderManager()
+        manager.set_provider(args.provider, **server.provider_kwargs(args.provider))
+        manager.set_cache(None)
+        results = {
+            scenario: run_scenario(manager, scenario, args.slots, args.clients if args.reserved is None else args.reserved,
+                                   args.batch_threads, args.requests, args.clients, args.interval_ms / 1000.0)
+            for scenario in ("idle", "fifo", "prioritized")
+        }
+
+    print(json.dumps(results, indent=2))
+    idle, prioritized = results["idle"]["p95_ms"], results["prioritized"]["p95_ms"]
+    print(f"\ninteractive p95: idle {idle:.1f} ms, fifo {results['fifo']['p95_ms']:.1f} ms, "
+          f"prioritized {prioritized:.1f} ms")
+    if prioritized > idle * (1 + args.max_regression):
+        print(f"Prioritized p95 is more than {args.max_regression:.0%} above idle.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+TTS provider benchmark suite.
+
+Run from the repository root with:
+    python -m benchmarks.tts.run --providers deepgram,edge_tts --concurrency 1,4,16 --requests 40
+
+Every provider class is pointed at the local fake backends from
+voice.text_to_speech.fakes, so no network access is needed. Each provider
+is benchmarked in a fresh process, which keeps its CPU time and peak RSS
+separate from the others and from the fake backend. For every concurrency
+level the suite records time to first audio chunk (via stream_speech), total
+latency percentiles and throughput.
+
+Results are written to benchmarks/tts/results/<timestamp>-<commit>.json; pass
+--baseline with an earlier result file to print the relative change.
+"""
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+SAMPLE_TEXTS = (
+    "Good morning, here is your briefing for today.",
+    "The meeting has been moved to three in the afternoon.",
+    "Your package was delivered to the front door.",
+    "It will be sunny with a high of twenty four degrees.",
+    "Reminder: call the dentist before noon.",
+)
+
+
+# Benchmark name -> (provider module, class, PROVIDERS key, TikTok variant). Providers are
+# imported lazily so each benchmark process only loads the one it measures.
+BENCHMARK_TARGETS: Dict[str, Tuple[str, str, str, Optional[str]]] = {
+    "deepgram": ("deepgram", "DeepgramTTSProvider", "deepgram", None),
+    "speechify": ("speechify", "SpeechifyTTSProvider", "speechify", None),
+    "tiktok_gesserit": ("tiktok_tts", "TikTokTTSProvider", "tiktok", "gesserit"),
+    "tiktok_weilbyte": ("tiktok_tts", "TikTokTTSProvider", "tiktok", "weilbyte"),
+    "hearling": ("hearling", "HearlingTTSProvider", "hearling", None),
+    "edge_tts": ("edge_tts", "EdgeTTSProvider", "edge_tts", None),
+}
+
+
+def create_provider(name: str, base_url: str):
+    """
+    Build the provider behind a benchmark name, pointed at the fake backend at base_url.
+    """
+    from voice.text_to_speech.fakes.runner import fake_provider_kwargs
+
+    module_name, class_name, provider_name, variant = BENCHMARK_TARGETS[name]
+    module = importlib.import_module(f"voice.text_to_speech.providers.{module_name}")
+    kwargs = fake_provider_kwargs(base_url, provider_name, variant or "gesserit")
+    return getattr(module, class_name)(**kwargs)
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """
+    Linearly interpolated percentile of values, q in [0, 100].
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Mean and p50/p90/p99 of values, in milliseconds."""
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000.0, 3) if value is not None else None
+    return {
+        "mean_ms": ms(sum(values) / len(values)) if values else None,
+        "p50_ms": ms(percentile(values, 50)),
+        "p90_ms": ms(percentile(values, 90)),
+        "p99_ms": ms(percentile(values, 99)),
+    }
+
+
+def _cpu_seconds() -> float:
+    if resource is None:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _timed_request(provider, text: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    first_chunk = None
+    size = 0
+    try:
+        for chunk in provider.stream_speech(text):
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            size += len(chunk)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    return {"ttfb": first_chunk, "total": time.perf_counter() - start, "bytes": size}
+
+
+def benchmark_provider(name: str, base_url: str, concurrency_levels: List[int], requests_per_level: int) -> Dict[str, Any]:
+    """
+    Benchmark one provider class against the fake backend. Runs in its own process.
+
+    Returns:
+        Dict[str, Any]: Per-level latency and throughput plus process CPU time and peak RSS.
+    """
+    logging.disable(logging.INFO)
+    cpu_start = _cpu_seconds()
+    init_start = time.perf_counter()
+    provider = create_provider(name, base_url)
+    result: Dict[str, Any] = {"init_ms": round((time.perf_counter() - init_start) * 1000.0, 3), "levels": {}}
+
+    warmup = _timed_request(provider, SAMPLE_TEXTS[0])
+    if "error" in warmup:
+        result["error"] = warmup["error"]
+        return result
+
+    for level in concurrency_levels:
+        texts = [f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} Item {i}." for i in range(requests_per_level)]
+        level_cpu = _cpu_seconds()
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            samples = list(executor.map(lambda text: _timed_request(provider, text), texts))
+        wall = time.perf_counter() - wall_start
+
+        succeeded = [s for s in samples if "error" not in s]
+        errors = [s["error"] for s in samples if "error" in s]
+        result["levels"][str(level)] = {
+            "requests": len(samples),
+            "errors": len(errors),
+            "first_error": errors[0] if errors else None,
+            "ttfb": summarize([s["ttfb"] for s in succeeded if s["ttfb"] is not None]),
+            "latency": summarize([s["total"] for s in succeeded]),
+            "throughput_rps": round(len(succeeded) / wall, 3) if wall else None,
+            "audio_bytes_per_s": round(sum(s["bytes"] for s in succeeded) / wall, 1) if wall else None,
+            "cpu_seconds": round(_cpu_seconds() - level_cpu, 4),
+        }
+
+    result["cpu_seconds"] = round(_cpu_seconds() - cpu_start, 4)
+    result["peak_rss_kb"] = _peak_rss_kb()
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_backend(latency_ms: float, payload_kb: int, chunk_delay_ms: float, timeout: float = 15.0):
+    """
+    Start the fake backends in a subprocess and wait until it answers.
+
+    Returns:
+        Tuple[subprocess.Popen, str]: The server process and its base URL.
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "voice.text_to_speech.fakes", "--port", str(port),
+         "--latency-ms", str(latency_ms), "--payload-kb", str(payload_kb), "--chunk-delay-ms", str(chunk_delay_ms)],
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Fake backend exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1):
+                return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Fake backend did not start in time")
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=BENCHMARK_DIR).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Relative change of p50 latency, p50 TTFB and throughput for every provider and level in both runs.
+    """
+    lines = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name, {})
+        for level, stats in result.get("levels", {}).items():
+            old = base.get("levels", {}).get(level)
+            if not old:
+                continue
+            changes = []
+            for label, new_value, old_value in (
+                ("latency p50", stats["latency"]["p50_ms"], old["latency"]["p50_ms"]),
+                ("ttfb p50", stats["ttfb"]["p50_ms"], old["ttfb"]["p50_ms"]),
+                ("throughput", stats["throughput_rps"], old["throughput_rps"]),
+            ):
+                if new_value is not None and old_value:
+                    changes.append(f"{label} {(new_value - old_value) / old_value * 100.0:+.1f}%")
+            lines.append(f"{name} @ {level}: " + ", ".join(changes))
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the TTS providers against local fake backends.")
+    parser.add_argument("--providers", default=",".join(BENCHMARK_TARGETS),
+                        help=f"Comma-separated subset of: {', '.join(BENCHMARK_TARGETS)}")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake backend delay before the first byte")
+    parser.add_argument("--payload-kb", type=int, default=64, help="Fake audio size per response in KiB")
+    parser.add_argument("--chunk-delay-ms", type=float, default=0.0, help="Fake backend delay between 16 KiB body chunks")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/tts/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--baseline", default=None, help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    providers = [name.strip() for name in args.providers.split(",") if name.strip()]
+    unknown = [name for name in providers if name not in BENCHMARK_TARGETS]
+    if unknown:
+        parser.error(f"Unknown providers: {', '.join(unknown)}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    revision = _git_revision()
+    report: Dict[str, Any] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"concurrency": levels, "requests": args.requests, "latency_ms": args.latency_ms,
+                   "payload_kb": args.payload_kb, "chunk_delay_ms": args.chunk_delay_ms},
+        "results": {},
+    }
+
+    server, base_url = start_fake_backend(args.latency_ms, args.payload_kb, args.chunk_delay_ms)
+    try:
+        for name in providers:
+            print(f"Benchmarking {name}...", flush=True)
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                try:
+                    result = pool.submit(benchmark_provider, name, base_url, levels, args.requests).result()
+                except Exception as e:
+                    result = {"error": f"{type(e).__name__}: {e}", "levels": {}}
+            report["results"][name] = result
+            for level, stats in result["levels"].items():
+                print(f"  c={level:>3}  p50 {stats['latency']['p50_ms']} ms  p99 {stats['latency']['p99_ms']} ms  "
+                      f"ttfb p50 {stats['ttfb']['p50_ms']} ms  {stats['throughput_rps']} req/s  errors {stats['errors']}")
+            if "error" in result:
+                print(f"  failed: {result['error']}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline} ({baseline.get('commit', 'unknown')}):")
+        for line in compare(baseline, report):
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,37 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+_env_loaded = False
+
+
+def load_env() -> None:
+    """
+    Load variables from the project's .env file into os.environ, once.
+    Variables that are already set in the environment take precedence.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        _env_loaded = True
+        from dotenv import load_dotenv
+        load_dotenv()
+
+
+class _EnvSetting:
+    """
+    Class attribute read from the environment when accessed, so the .env file
+    is only loaded once a setting is actually needed.
+    """
+
+    def __init__(self, name: str, default=None):
+        self.name = name
+        self.default = default
+
+    def __get__(self, instance, owner):
+        load_env()
+        return os.getenv(self.name, self.default)
+
 
 class AppConfig:
-    PICOVOICE_API_KEY = os.getenv("PICOVOICE_API_KEY")
+    PICOVOICE_API_KEY = _EnvSetting("PICOVOICE_API_KEY")
     HOTWORD_KEYWORDS = ["jarvis"]
 
     _PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -13,5 +40,6 @@ class AppConfig:
 
     GEMINI_LIVE_MODEL_NAME = "models/gemini-2.5-flash-preview-native-audio-dialog"
     GEMINI_LIVE_SYSTEM_INSTRUCTION = "You are a helpful assistant. Be concise and friendly."
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-    GEMINI_LIVE_VIDEO_MODE = "none" # Options: "camera", "screen", "none"
\ No newline at end of file
+    GEMINI_API_KEY = _EnvSetting("GEMINI_API_KEY")
+    GEMINI_LIVE_VIDEO_MODE = "none" # Options: "camera", "screen", "none"
+    GEMINI_LIVE_OUTPUT_SAMPLE_RATE = None # Resample received audio for playback, e.g. 48000; None plays it as received
@@ -1,40 +1,177 @@
-import os
-import logging
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+"""
+Logging setup shared by the whole project.
+
+Log calls only put the record on a queue; a background QueueListener thread
+does the file and console I/O, so logging never blocks audio or network
+threads on disk writes or rotation. Nothing is configured at import time:
+the first get_logger() call sets up the root logger (unless the application
+already configured logging itself), and the log directory is created when the
+first record is written.
 
-# Create logs directory if it doesn't exist
-log_dir = os.path.join(os.getcwd(), "data", "logs")
-os.makedirs(log_dir, exist_ok=True)
+Per-chunk debug logs in hot loops can be rate limited per call site with
+JARVIS_LOG_RATE_LIMIT (records per second) or configure_logging(rate_limit=...).
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Tuple
 
-# Configure logging
-LOG_FILE = os.path.join(log_dir, "jarvis.log")
-print(f"Log directory: {log_dir}")  # Print log directory path
-print(f"Log file path: {LOG_FILE}")  # Print log file path
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_LEVEL = logging.INFO
+LOG_FILE_NAME = "jarvis.log"
+LOG_QUEUE_SIZE = 10000
+RATE_LIMIT_ENV = "JARVIS_LOG_RATE_LIMIT"
+
+_listener: Optional[QueueListener] = None
+_configured = False
+_config_lock = threading.Lock()
+
+
+class _LazyRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that creates its directory when the file is first opened."""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that drops records instead of blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most `rate` records per second from each call site, for
+    records at or below max_level. The next record let through notes how many
+    were suppressed in between.
+    """
+
+    def __init__(self, rate: float, max_level: int = logging.DEBUG):
+        """
+        Initialize the filter.
+
+        Args:
+            rate (float): Records per second allowed per call site.
+            max_level (int): Highest level that is rate limited; more severe records always pass.
+        """
+        super().__init__()
+        self.interval = 1.0 / rate
+        self.max_level = max_level
+        self._sites: Dict[Tuple[str, int], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        site = self._sites.get(key)
+        if site is None:
+            self._sites[key] = [now, 0]
+            return True
+        if now - site[0] < self.interval:
+            site[1] += 1
+            return False
+        if site[1]:
+            record.msg = f"{record.getMessage()} ({site[1]} similar suppressed)"
+            record.args = None
+        site[0], site[1] = now, 0
+        return True
+
+
+def configure_logging(level: int = LOG_LEVEL, log_dir: Optional[str] = None, console: bool = True,
+                      rate_limit: Optional[float] = None, force: bool = False) -> None:
+    """
+    Route the root logger through a queue to a rotating log file and the console.
+
+    Called automatically by get_logger(); call it yourself first to change the defaults.
+    Does nothing if the root logger already has handlers, unless force is True.
+
+    Args:
+        level (int): Root log level.
+        log_dir (Optional[str]): Directory of the log file; defaults to ./data/logs.
+        console (bool): Whether to also log to stderr.
+        rate_limit (Optional[float]): Debug records per second per call site; defaults to
+                                      $JARVIS_LOG_RATE_LIMIT, unlimited if unset.
+        force (bool): Replace handlers that are already installed.
+    """
+    global _listener, _configured
+    with _config_lock:
+        _configured = True
+        root = logging.getLogger()
+        if root.handlers and not force:
+            return
+        _stop_listener()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+            handler.close()
+
+        log_dir = log_dir or os.path.join(os.getcwd(), "data", "logs")
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = [_LazyRotatingFileHandler(os.path.join(log_dir, LOG_FILE_NAME), maxBytes=10485760,
+                                             backupCount=5, delay=True)]  # 10MB max file size
+        if console:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        queue_handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        if rate_limit is None and os.getenv(RATE_LIMIT_ENV):
+            rate_limit = float(os.environ[RATE_LIMIT_ENV])
+        if rate_limit:
+            queue_handler.addFilter(RateLimitFilter(rate_limit))
+
+        _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def shutdown_logging() -> None:
+    """
+    Write out queued records and stop the background writer. Runs at exit.
+    """
+    with _config_lock:
+        _stop_listener()
+
+
+atexit.register(shutdown_logging)
 
-# Configure the root logger
-try:
-    logging.basicConfig(
-        level=LOG_LEVEL,
-        format=LOG_FORMAT,
-        handlers=[
-            RotatingFileHandler(LOG_FILE, maxBytes=10485760, backupCount=5),  # 10MB max file size
-            logging.StreamHandler()  # Also log to console
-        ]
-    )
-except Exception as e:
-    print(f"Error configuring logger: {e}")
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """
     Get a logger configured with the standard settings.
-    
+
     Args:
         name (str, optional): Name for the logger, usually __name__.
-        
+
     Returns:
         logging.Logger: Configured logger instance.
     """
+    if not _configured:
+        configure_logging()
     return logging.getLogger(name)
@@ -0,0 +1,326 @@
+"""
+Lightweight tracing for the voice pipeline.
+
+Spans nest through a context variable, so they follow the code across
+asyncio tasks and asyncio.to_thread automatically; use wrap_context() for
+thread pools and other threads. While tracing is off, span() costs a single
+global check.
+
+    start_tracing("data/traces/session.json")
+    with span("tts.generate_speech", provider="deepgram") as s:
+        ...
+        s.set_attribute("bytes", len(data))
+
+Finished spans are written by a background thread in the Trace Event format,
+one event per line inside an open JSON array, which chrome://tracing and
+https://ui.perfetto.dev load directly. Tracing also starts on first use when
+the JARVIS_TRACE_FILE environment variable is set.
+"""
+import contextvars
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+TRACE_FILE_ENV = "JARVIS_TRACE_FILE"
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_ids = itertools.count(1)
+# Offset that turns perf_counter_ns() into wall-clock nanoseconds, so traces from several processes line up.
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+
+class Span:
+    """
+    One timed operation. Created by span(); attributes may be added until it ends.
+    """
+
+    __slots__ = ("name", "span_id", "trace_id", "parent_id", "start_ns", "end_ns", "thread_id", "attributes", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = next(_ids)
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.parent_id = parent.span_id if parent else None
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.end_ns: Optional[int] = None
+        self.start_ns = time.perf_counter_ns()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns is not None else None
+
+    def to_event(self, pid: int) -> Dict[str, Any]:
+        args = {"trace_id": self.trace_id, "span_id": self.span_id, **self.attributes}
+        if self.parent_id is not None:
+            args["parent_id"] = self.parent_id
+        if self.error is not None:
+            args["error"] = self.error
+        return {
+            "name": self.name,
+            "cat": self.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (self.start_ns + _EPOCH_OFFSET_NS) / 1000.0,
+            "dur": (self.end_ns - self.start_ns) / 1000.0,
+            "pid": pid,
+            "tid": self.thread_id,
+            "args": args,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is off; also serves as its own context manager."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class TraceFileExporter:
+    """
+    Writes finished spans to a trace file from a background thread.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.5):
+        """
+        Initialize the exporter and start its writer thread.
+
+        Args:
+            path (str): Trace file to create; an existing file is replaced.
+            flush_interval (float): Maximum seconds between file flushes.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.pid = os.getpid()
+        self.dropped = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread_names: Dict[int, str] = {}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._writer = threading.Thread(target=self._write_loop, name="TraceWriter", daemon=True)
+        self._writer.start()
+
+    def export(self, finished: Span) -> None:
+        self._queue.put(finished)
+
+    def _write_event(self, event: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(event, default=str, separators=(",", ":")) + ",\n")
+
+    def _write_loop(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                try:
+                    if item.thread_id not in self._thread_names:
+                        self._thread_names[item.thread_id] = _thread_name(item.thread_id)
+                        self._write_event({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": item.thread_id,
+                                           "args": {"name": self._thread_names[item.thread_id]}})
+                    self._write_event(item.to_event(self.pid))
+                except Exception:
+                    self.dropped += 1
+            if item is None or time.monotonic() - last_flush >= self.flush_interval:
+                self._file.flush()
+                last_flush = time.monotonic()
+        self._file.flush()
+        self._file.close()
+
+    def close(self) -> None:
+        """
+        Write the remaining spans and close the file.
+        """
+        self._queue.put(_STOP)
+        self._writer.join()
+
+
+_STOP = object()
+_exporter: Optional[TraceFileExporter] = None
+_env_checked = False
+_config_lock = threading.Lock()
+
+
+def _thread_name(thread_id: int) -> str:
+    for thread in threading.enumerate():
+        if thread.ident == thread_id:
+            return thread.name
+    return str(thread_id)
+
+
+def start_tracing(path: str) -> TraceFileExporter:
+    """
+    Start recording spans to path, replacing any active trace file.
+
+    Returns:
+        TraceFileExporter: The exporter now receiving spans.
+    """
+    global _exporter, _env_checked
+    with _config_lock:
+        previous, _exporter = _exporter, TraceFileExporter(path)
+        _env_checked = True
+    if previous is not None:
+        previous.close()
+    return _exporter
+
+
+def stop_tracing() -> None:
+    """
+    Stop recording spans and flush the trace file.
+    """
+    global _exporter, _env_checked
+    with _config_lock:
+        previous, _exporter = _exporter, None
+        _env_checked = True
+    if previous is not None:
+        previous.close()
+
+
+def tracing_enabled() -> bool:
+    return _get_exporter() is not None
+
+
+def _get_exporter() -> Optional[TraceFileExporter]:
+    global _env_checked
+    if not _env_checked:
+        _env_checked = True
+        path = os.getenv(TRACE_FILE_ENV)
+        if path:
+            start_tracing(path)
+    return _exporter
+
+
+def span(name: str, **attributes: Any):
+    """
+    Time a block as a span that is a child of the current span.
+
+    Usage:
+        with span("audio.play", path=file_path) as s:
+            ...
+
+    Exceptions leaving the block are recorded on the span and re-raised.
+    """
+    exporter = _get_exporter()
+    if exporter is None:
+        return _NOOP_SPAN
+    return _active_span(exporter, name, attributes)
+
+
+@contextmanager
+def _active_span(exporter: TraceFileExporter, name: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.perf_counter_ns()
+        _current_span.reset(token)
+        exporter.export(current)
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """
+    Begin a span without making it current, for work that spans several calls
+    such as a generator. Pair with use_span() and end_span().
+
+    Returns:
+        Optional[Span]: The new span, or None while tracing is off.
+    """
+    if _get_exporter() is None:
+        return None
+    return Span(name, _current_span.get(), attributes)
+
+
+def end_span(finished: Optional[Span], error: Optional[BaseException] = None) -> None:
+    """
+    Finish a span from start_span() and hand it to the exporter.
+    """
+    if finished is None:
+        return
+    finished.end_ns = time.perf_counter_ns()
+    if error is not None:
+        finished.error = f"{type(error).__name__}: {error}"
+    exporter = _exporter
+    if exporter is not None:
+        exporter.export(finished)
+
+
+@contextmanager
+def use_span(active: Optional[Span]) -> Iterator[None]:
+    """
+    Make a span from start_span() current for the duration of the block.
+    """
+    if active is None:
+        yield
+        return
+    token = _current_span.set(active)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+def current_span() -> Optional[Span]:
+    """
+    Get the innermost active span, if tracing is on.
+    """
+    return _current_span.get()
+
+
+def wrap_context(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Bind fn to the caller's context, so spans opened when it runs on another
+    thread (e.g. via ThreadPoolExecutor.submit) nest under the current span.
+    """
+    if _exporter is None:
+        return fn
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+def read_trace(path: str) -> List[Dict[str, Any]]:
+    """
+    Load the events of a trace file, including one that is still being written.
+    """
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip().rstrip(",")
+            if line and line not in ("[", "]"):
+                events.append(json.loads(line))
+    return events
@@ -1,6 +1,6 @@
 import os
-import pygame
 from core.logger import get_logger
+from core.tracing import span
 
 logger = get_logger(__name__)
 
@@ -18,20 +18,27 @@ def play_audio(file_path: str) -> None:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Audio file not found: {file_path}")
     
+    # pygame takes a noticeable time to import, so load it only when audio is played.
+    import pygame
+    
     try:
-        # Initialize pygame mixer
-        pygame.mixer.init()
-        
-        # Load and play the audio file
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play()
-        
-        # Wait for playback to finish
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-        
-        # Clean up pygame resources
-        pygame.mixer.quit()
+        with span("audio.play", path=file_path):
+            # Initialize pygame mixer
+            with span("audio.device_open"):
+                pygame.mixer.init()
+            
+            # Load and play the audio file
+            with span("audio.load", bytes=os.path.getsize(file_path)):
+                pygame.mixer.music.load(file_path)
+            with span("audio.playback"):
+                pygame.mixer.music.play()
+                
+                # Wait for playback to finish
+                while pygame.mixer.music.get_busy():
+                    pygame.time.Clock().tick(10)
+            
+            # Clean up pygame resources
+            pygame.mixer.quit()
     except Exception as e:
         logger.error(f"Error playing audio: {e}")
         raise Exception(f"Failed to play audio: {e}")
@@ -0,0 +1,5 @@
+# jarvis/voice/audio/__init__.py
+# Shared audio helpers used by the TTS and dialog pipelines
+from .processing import AudioPostProcessor, PCM16Stream, StreamResampler
+
+__all__ = ["AudioPostProcessor", "PCM16Stream", "StreamResampler"]
@@ -0,0 +1,225 @@
+import os
+import struct
+import subprocess
+import wave
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.logger import get_logger
+from voice.audio.processing import float_to_pcm16, pcm16_to_float
+
+logger = get_logger(__name__)
+
+FFMPEG_BINARY = "ffmpeg"
+
+
+class AudioCodecError(Exception):
+    """Exception raised when audio cannot be decoded or encoded."""
+    pass
+
+
+def _is_wav(data: bytes) -> bool:
+    return len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def _parse_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Parse a 16-bit PCM WAV held in memory.
+
+    Chunk sizes are not trusted for the data chunk because ffmpeg writes placeholder
+    sizes when it streams WAV to a pipe.
+    """
+    offset = 12
+    channels = sample_rate = bits = None
+    while offset + 8 <= len(data):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", data, offset)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            _, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+        elif chunk_id == b"data":
+            if channels is None:
+                break
+            if bits != 16:
+                raise AudioCodecError(f"Unsupported WAV sample width: {bits} bits")
+            end = min(len(data), body + chunk_size) if chunk_size not in (0, 0xFFFFFFFF) else len(data)
+            return pcm16_to_float(data[body:end], channels), sample_rate
+        offset = body + chunk_size + (chunk_size & 1)
+    raise AudioCodecError("Malformed WAV data: missing fmt or data chunk")
+
+
+def _run_ffmpeg(args: list, stdin_data: bytes = None) -> bytes:
+    command = [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", *args]
+    try:
+        result = subprocess.run(command, input=stdin_data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    except FileNotFoundError:
+        raise AudioCodecError(f"'{FFMPEG_BINARY}' not found. Install ffmpeg to decode or encode compressed audio.")
+    if result.returncode != 0:
+        raise AudioCodecError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def _output_format_args(audio_format: str) -> list:
+    if audio_format == "opus":
+        return ["-c:a", "libopus", "-f", "ogg"]
+    return ["-f", audio_format]
+
+
+def decode_bytes(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Decode audio held in memory into float samples.
+
+    WAV is parsed directly; every other container is decoded through ffmpeg.
+
+    Args:
+        data (bytes): Encoded audio (MP3, WAV, Opus, ...).
+
+    Returns:
+        Tuple[np.ndarray, int]: Samples with shape (frames, channels) and the sample rate.
+    """
+    if _is_wav(data):
+        return _parse_wav(data)
+    return _parse_wav(_run_ffmpeg(["-i", "pipe:0", "-f", "wav", "-acodec", "pcm_s16le", "pipe:1"], data))
+
+
+def decode_file(file_path: str) -> Tuple[np.ndarray, int]:
+    """
+    Decode an audio file into float samples.
+
+    Returns:
+        Tuple[np.ndarray, int]: Samples with shape (frames, channels) and the sample rate.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Audio file not found: {file_path}")
+    with open(file_path, "rb") as f:
+        header = f.read(12)
+    if _is_wav(header):
+        with wave.open(file_path, "rb") as wav_file:
+            if wav_file.getsampwidth() != 2:
+                raise AudioCodecError(f"Unsupported WAV sample width in {file_path}")
+            frames = wav_file.readframes(wav_file.getnframes())
+            return pcm16_to_float(frames, wav_file.getnchannels()), wav_file.getframerate()
+    return _parse_wav(_run_ffmpeg(["-i", file_path, "-f", "wav", "-acodec", "pcm_s16le", "pipe:1"]))
+
+
+def encode_bytes(samples: np.ndarray, sample_rate: int, audio_format: str = "wav") -> bytes:
+    """
+    Encode float samples into the given container.
+
+    Args:
+        samples (np.ndarray): Samples with shape (frames, channels).
+        sample_rate (int): Sample rate of the samples.
+        audio_format (str): Target format, e.g. "wav", "mp3" or "opus".
+
+    Returns:
+        bytes: The encoded audio.
+    """
+    samples = samples.reshape(-1, 1) if samples.ndim == 1 else samples
+    channels = samples.shape[1]
+    pcm = float_to_pcm16(samples)
+    if audio_format == "wav":
+        header = struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + len(pcm), b"WAVE",
+            b"fmt ", 16, 1, channels, sample_rate, sample_rate * channels * 2, channels * 2, 16,
+            b"data", len(pcm),
+        )
+        return header + pcm
+    return _run_ffmpeg([
+        "-f", "s16le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0",
+        *_output_format_args(audio_format), "pipe:1",
+    ], pcm)
+
+
+def transcode_bytes(data: bytes, audio_format: str, bitrate: Optional[str] = None,
+                    channels: Optional[int] = None) -> bytes:
+    """
+    Re-encode audio held in memory into another container in a single ffmpeg pass.
+
+    Args:
+        data (bytes): Encoded audio (MP3, WAV, Opus, ...).
+        audio_format (str): Target format, e.g. "opus", "mp3" or "wav".
+        bitrate (Optional[str]): Target bitrate such as "24k"; None keeps the encoder default.
+        channels (Optional[int]): Output channel count; None keeps the input layout.
+
+    Returns:
+        bytes: The re-encoded audio.
+    """
+    if audio_format == "wav":
+        samples, sample_rate = decode_bytes(data)
+        if channels == 1:
+            samples = samples.mean(axis=1, keepdims=True)
+        return encode_bytes(samples, sample_rate, "wav")
+    args = ["-i", "pipe:0", "-vn"]
+    if channels:
+        args += ["-ac", str(channels)]
+    if bitrate:
+        args += ["-b:a", bitrate]
+    return _run_ffmpeg([*args, *_output_format_args(audio_format), "pipe:1"], data)
+
+
+def encode_file(file_path: str, samples: np.ndarray, sample_rate: int) -> str:
+    """
+    Encode float samples to a file, choosing the container from the file extension.
+
+    Returns:
+        str: The path that was written.
+    """
+    audio_format = os.path.splitext(file_path)[1].lstrip(".").lower() or "wav"
+    data = encode_bytes(samples, sample_rate, audio_format)
+    with open(file_path, "wb") as f:
+        f.write(data)
+    return file_path
+
+
+class WavStreamWriter:
+    """Incrementally writes 16-bit PCM frames to a WAV file."""
+
+    def __init__(self, file_path: str, sample_rate: int, channels: int):
+        self._wav = wave.open(file_path, "wb")
+        self._wav.setnchannels(channels)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def write(self, samples: np.ndarray) -> None:
+        self._wav.writeframes(float_to_pcm16(samples))
+
+    def close(self) -> None:
+        self._wav.close()
+
+
+class FFmpegStreamWriter:
+    """Incrementally encodes 16-bit PCM frames to a compressed file through an ffmpeg pipe."""
+
+    def __init__(self, file_path: str, sample_rate: int, channels: int, audio_format: str):
+        command = [
+            FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "s16le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0",
+            *_output_format_args(audio_format), file_path,
+        ]
+        try:
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            raise AudioCodecError(f"'{FFMPEG_BINARY}' not found. Install ffmpeg to encode compressed audio.")
+
+    def write(self, samples: np.ndarray) -> None:
+        self._process.stdin.write(float_to_pcm16(samples))
+
+    def close(self) -> None:
+        self._process.stdin.close()
+        stderr = self._process.stderr.read()
+        if self._process.wait() != 0:
+            raise AudioCodecError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+
+
+def open_stream_writer(file_path: str, sample_rate: int, channels: int):
+    """
+    Open an incremental writer for file_path, choosing the container from the file extension.
+
+    Returns:
+        WavStreamWriter | FFmpegStreamWriter: Object with write(samples) and close().
+    """
+    audio_format = os.path.splitext(file_path)[1].lstrip(".").lower() or "wav"
+    if audio_format == "wav":
+        return WavStreamWriter(file_path, sample_rate, channels)
+    return FFmpegStreamWriter(file_path, sample_rate, channels, audio_format)
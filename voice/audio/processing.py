@@ -0,0 +1,412 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.logger import get_logger
+
+try:
+    from scipy.signal import resample_poly as _scipy_resample_poly
+except ImportError:
+    _scipy_resample_poly = None
+
+logger = get_logger(__name__)
+
+PCM16_SCALE = 32768.0
+RESAMPLE_BLOCK_FRAMES = 16384
+
+
+def pcm16_to_float(data: bytes, channels: int = 1) -> np.ndarray:
+    """
+    Convert interleaved 16-bit little-endian PCM into a float32 array.
+
+    Args:
+        data (bytes): Raw PCM bytes.
+        channels (int): Number of interleaved channels.
+
+    Returns:
+        np.ndarray: Samples in [-1.0, 1.0) with shape (frames, channels).
+    """
+    samples = np.frombuffer(data, dtype="<i2")
+    usable = len(samples) - (len(samples) % channels)
+    return (samples[:usable].astype(np.float32) / PCM16_SCALE).reshape(-1, channels)
+
+
+def float_to_pcm16(samples: np.ndarray) -> bytes:
+    """
+    Convert float samples of shape (frames, channels) into interleaved 16-bit PCM bytes.
+    """
+    clipped = np.clip(samples, -1.0, 32767.0 / PCM16_SCALE)
+    return (clipped * PCM16_SCALE).astype("<i2").tobytes()
+
+
+def _as_2d(samples: np.ndarray) -> np.ndarray:
+    return samples.reshape(-1, 1) if samples.ndim == 1 else samples
+
+
+def downmix_to_mono(samples: np.ndarray) -> np.ndarray:
+    """
+    Average all channels into a single one.
+
+    Returns:
+        np.ndarray: Samples with shape (frames, 1).
+    """
+    samples = _as_2d(samples)
+    if samples.shape[1] == 1:
+        return samples
+    return samples.mean(axis=1, keepdims=True, dtype=np.float32)
+
+
+def normalize_loudness(samples: np.ndarray, target_dbfs: float = -20.0, peak_dbfs: float = -1.0) -> np.ndarray:
+    """
+    Scale samples so their RMS level matches target_dbfs, without letting peaks exceed peak_dbfs.
+
+    Args:
+        samples (np.ndarray): Float samples with shape (frames, channels).
+        target_dbfs (float): Desired RMS level in dBFS.
+        peak_dbfs (float): Ceiling for the absolute peak after gain is applied.
+
+    Returns:
+        np.ndarray: The gain-adjusted samples.
+    """
+    samples = _as_2d(samples)
+    if samples.size == 0:
+        return samples
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    peak = float(np.max(np.abs(samples)))
+    if rms <= 0.0 or peak <= 0.0:
+        return samples
+    gain = (10.0 ** (target_dbfs / 20.0)) / rms
+    gain = min(gain, (10.0 ** (peak_dbfs / 20.0)) / peak)
+    return (samples * gain).astype(np.float32)
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, threshold_dbfs: float = -45.0,
+                 frame_ms: float = 10.0, padding_ms: float = 30.0) -> np.ndarray:
+    """
+    Remove leading and trailing silence.
+
+    The signal is split into frames of frame_ms and the RMS of every frame is computed
+    in one pass; everything before the first and after the last frame above
+    threshold_dbfs is dropped, keeping padding_ms on each side.
+
+    Returns:
+        np.ndarray: The trimmed samples. Fully silent input is returned unchanged.
+    """
+    samples = _as_2d(samples)
+    frame_len = max(1, int(sample_rate * frame_ms / 1000.0))
+    n_frames = math.ceil(len(samples) / frame_len)
+    if n_frames == 0:
+        return samples
+
+    padded = np.zeros((n_frames * frame_len, samples.shape[1]), dtype=np.float32)
+    padded[:len(samples)] = samples
+    frame_rms = np.sqrt(np.mean(np.square(padded.reshape(n_frames, -1)), axis=1))
+    active = np.flatnonzero(frame_rms >= 10.0 ** (threshold_dbfs / 20.0))
+    if active.size == 0:
+        return samples
+
+    padding = int(sample_rate * padding_ms / 1000.0)
+    start = max(0, active[0] * frame_len - padding)
+    end = min(len(samples), (active[-1] + 1) * frame_len + padding)
+    return samples[start:end]
+
+
+def _design_lowpass(up: int, down: int, zero_crossings: int = 10, beta: float = 5.0) -> np.ndarray:
+    """Kaiser-windowed sinc anti-aliasing filter for an up/down rational resampler."""
+    max_rate = max(up, down)
+    half_len = zero_crossings * max_rate
+    n = np.arange(-half_len, half_len + 1, dtype=np.float64)
+    taps = np.sinc(n / max_rate) / max_rate * np.kaiser(2 * half_len + 1, beta)
+    return taps * up
+
+
+def _polyphase_bank(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """
+    Split the anti-aliasing filter into its polyphase components.
+
+    Returns:
+        Tuple[np.ndarray, int]: The bank, where bank[p, i] holds the tap that lines up
+                                with input sample (t // up - i) when t % up == p, and the
+                                filter's half-length in upsampled samples.
+    """
+    taps = _design_lowpass(up, down)
+    half_len = (len(taps) - 1) // 2
+    n_phase_taps = math.ceil(len(taps) / up)
+    bank = np.zeros(n_phase_taps * up, dtype=np.float32)
+    bank[:len(taps)] = taps
+    return bank.reshape(n_phase_taps, up).T, half_len
+
+
+def _apply_bank(bank: np.ndarray, half_len: int, up: int, down: int, buffer: np.ndarray, base: int,
+                n_start: int, n_end: int) -> np.ndarray:
+    """
+    Compute output frames [n_start, n_end) from buffer, whose first row is input sample `base`.
+    """
+    output = np.empty((max(0, n_end - n_start), buffer.shape[1]), dtype=np.float32)
+    tap_offsets = np.arange(bank.shape[1])
+    for block_start in range(n_start, n_end, RESAMPLE_BLOCK_FRAMES):
+        n = np.arange(block_start, min(n_end, block_start + RESAMPLE_BLOCK_FRAMES))
+        t = n * down + half_len
+        phases = t % up
+        indices = (t // up - base)[:, None] - tap_offsets[None, :]
+        output[n - n_start] = np.einsum("bk,bkc->bc", bank[phases], buffer[indices])
+    return output
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample with a polyphase FIR filter.
+
+    Uses scipy.signal.resample_poly when scipy is installed; otherwise falls back to an
+    equivalent NumPy implementation that evaluates the filter bank block by block.
+
+    Args:
+        samples (np.ndarray): Float samples with shape (frames, channels).
+        source_rate (int): Sample rate of the input.
+        target_rate (int): Desired sample rate.
+
+    Returns:
+        np.ndarray: Resampled float32 samples with shape (frames, channels).
+    """
+    samples = _as_2d(samples)
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+
+    g = math.gcd(int(source_rate), int(target_rate))
+    up, down = target_rate // g, source_rate // g
+
+    if _scipy_resample_poly is not None:
+        return _scipy_resample_poly(samples, up, down, axis=0).astype(np.float32)
+
+    bank, half_len = _polyphase_bank(up, down)
+    n_phase_taps = bank.shape[1]
+    n_out = math.ceil(len(samples) * up / down)
+    lead = n_phase_taps - 1
+    tail = half_len // up + 2
+    padded = np.concatenate([
+        np.zeros((lead, samples.shape[1]), dtype=np.float32),
+        samples.astype(np.float32, copy=False),
+        np.zeros((tail, samples.shape[1]), dtype=np.float32),
+    ])
+    return _apply_bank(bank, half_len, up, down, padded, -lead, 0, n_out)
+
+
+class StreamResampler:
+    """
+    Polyphase resampler for audio that arrives in chunks.
+
+    Resampling every chunk on its own restarts the filter at each chunk
+    boundary, which is heard as a click every chunk. This keeps the input the
+    filter still needs and the output position between calls, so the chunks
+    come out exactly as if the whole stream had been resampled at once. Output
+    lags the input by the filter's half-length (under 1 ms for 24 kHz speech).
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, channels: int = 1):
+        """
+        Initialize the resampler.
+
+        Args:
+            source_rate (int): Sample rate of the input.
+            target_rate (int): Desired sample rate.
+            channels (int): Number of channels of every chunk.
+        """
+        g = math.gcd(int(source_rate), int(target_rate))
+        self.up, self.down = int(target_rate) // g, int(source_rate) // g
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.channels = channels
+        self._bank, self._half_len = _polyphase_bank(self.up, self.down)
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget all buffered input, e.g. before an unrelated stream starts.
+        """
+        lead = self._bank.shape[1] - 1
+        self._buffer = np.zeros((lead, self.channels), dtype=np.float32)
+        self._base = -lead  # Input index of _buffer[0]
+        self._received = 0
+        self._next_out = 0
+
+    def _emit(self, n_end: int) -> np.ndarray:
+        output = _apply_bank(self._bank, self._half_len, self.up, self.down, self._buffer, self._base,
+                             self._next_out, n_end)
+        self._next_out = max(self._next_out, n_end)
+        keep_from = (self._next_out * self.down + self._half_len) // self.up - (self._bank.shape[1] - 1)
+        drop = min(len(self._buffer), max(0, keep_from - self._base))
+        self._buffer = self._buffer[drop:]
+        self._base += drop
+        return output
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Resample the next chunk.
+
+        Args:
+            samples (np.ndarray): Float samples with shape (frames, channels) or (frames,).
+
+        Returns:
+            np.ndarray: Every output frame the input so far fully determines; may be empty.
+        """
+        samples = _as_2d(samples)
+        if self.up == self.down:
+            return samples
+        self._buffer = np.concatenate([self._buffer, samples.astype(np.float32, copy=False)])
+        self._received += len(samples)
+        # Output n needs input up to index (n * down + half_len) // up.
+        n_end = max(0, (self._received * self.up - 1 - self._half_len) // self.down + 1)
+        return self._emit(n_end)
+
+    def flush(self) -> np.ndarray:
+        """
+        Return the output still held back at the end of the stream and reset.
+        """
+        if self.up == self.down:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        tail = self._half_len // self.up + 2
+        self._buffer = np.concatenate([self._buffer, np.zeros((tail, self.channels), dtype=np.float32)])
+        output = self._emit(math.ceil(self._received * self.up / self.down))
+        self.reset()
+        return output
+
+
+class PCM16Stream:
+    """
+    Streaming form of AudioPostProcessor for raw 16-bit PCM chunks; see AudioPostProcessor.open_stream().
+    """
+
+    def __init__(self, processor: "AudioPostProcessor", sample_rate: int, channels: int = 1):
+        self.channels = channels
+        self.mono = processor.mono
+        out_channels = 1 if processor.mono else channels
+        self.sample_rate = processor.target_sample_rate or sample_rate
+        self._resampler = None
+        if self.sample_rate != sample_rate:
+            self._resampler = StreamResampler(sample_rate, self.sample_rate, out_channels)
+
+    def process_pcm16(self, data: bytes) -> bytes:
+        """
+        Process the next chunk.
+
+        Returns:
+            bytes: PCM at sample_rate; slightly shorter or longer than the input while resampling.
+        """
+        samples = pcm16_to_float(data, self.channels)
+        if self.mono:
+            samples = downmix_to_mono(samples)
+        if self._resampler:
+            samples = self._resampler.process(samples)
+        return float_to_pcm16(samples)
+
+    def flush_pcm16(self) -> bytes:
+        """
+        Return the audio still held back by the resampler, e.g. when playback ends.
+        """
+        return float_to_pcm16(self._resampler.flush()) if self._resampler else b""
+
+
+class AudioPostProcessor:
+    """
+    Optional post-processing stage applied between synthesis and output.
+
+    Every step operates on whole NumPy arrays, so the cost scales with the
+    vectorized kernels rather than per-sample Python code.
+    """
+
+    def __init__(self, normalize: bool = True, target_dbfs: float = -20.0, peak_dbfs: float = -1.0,
+                 trim: bool = True, silence_threshold_dbfs: float = -45.0, padding_ms: float = 30.0,
+                 target_sample_rate: Optional[int] = None, mono: bool = True):
+        """
+        Initialize the post-processor.
+
+        Args:
+            normalize (bool): Apply RMS loudness normalization.
+            target_dbfs (float): Target RMS level in dBFS.
+            peak_dbfs (float): Peak ceiling in dBFS.
+            trim (bool): Trim leading and trailing silence.
+            silence_threshold_dbfs (float): Frames quieter than this count as silence.
+            padding_ms (float): Silence to keep around speech when trimming.
+            target_sample_rate (Optional[int]): Resample to this rate; None keeps the source rate.
+            mono (bool): Downmix multi-channel audio to mono.
+        """
+        self.normalize = normalize
+        self.target_dbfs = target_dbfs
+        self.peak_dbfs = peak_dbfs
+        self.trim = trim
+        self.silence_threshold_dbfs = silence_threshold_dbfs
+        self.padding_ms = padding_ms
+        self.target_sample_rate = target_sample_rate
+        self.mono = mono
+
+    def process(self, samples: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+        """
+        Run the configured steps on float samples.
+
+        Args:
+            samples (np.ndarray): Float samples with shape (frames, channels) or (frames,).
+            sample_rate (int): Sample rate of the input.
+
+        Returns:
+            Tuple[np.ndarray, int]: Processed samples and their sample rate.
+        """
+        samples = _as_2d(samples)
+        if self.mono:
+            samples = downmix_to_mono(samples)
+        if self.trim:
+            samples = trim_silence(samples, sample_rate, self.silence_threshold_dbfs, padding_ms=self.padding_ms)
+        if self.target_sample_rate and self.target_sample_rate != sample_rate:
+            samples = resample(samples, sample_rate, self.target_sample_rate)
+            sample_rate = self.target_sample_rate
+        if self.normalize:
+            samples = normalize_loudness(samples, self.target_dbfs, self.peak_dbfs)
+        return samples, sample_rate
+
+    def process_pcm16(self, data: bytes, sample_rate: int, channels: int = 1) -> Tuple[bytes, int]:
+        """
+        Run the configured steps on raw interleaved 16-bit PCM.
+
+        Returns:
+            Tuple[bytes, int]: Processed PCM bytes and their sample rate.
+        """
+        samples, sample_rate = self.process(pcm16_to_float(data, channels), sample_rate)
+        return float_to_pcm16(samples), sample_rate
+
+    def open_stream(self, sample_rate: int, channels: int = 1) -> PCM16Stream:
+        """
+        Start processing a stream that arrives in chunks, such as live playback.
+
+        Only downmixing and resampling apply to streams, and the resampler keeps
+        its state across chunks. Trimming and loudness normalization need the
+        whole clip, so they are skipped.
+
+        Args:
+            sample_rate (int): Sample rate of the incoming PCM.
+            channels (int): Number of interleaved channels of the incoming PCM.
+
+        Returns:
+            PCM16Stream: Call process_pcm16() on every chunk, in order.
+        """
+        return PCM16Stream(self, sample_rate, channels)
+
+    def process_file(self, input_path: str, output_path: Optional[str] = None) -> str:
+        """
+        Decode an audio file, process it and write the result.
+
+        Args:
+            input_path (str): File produced by a TTS provider.
+            output_path (Optional[str]): Destination; defaults to overwriting input_path.
+                                         The container is chosen from the file extension.
+
+        Returns:
+            str: Path to the processed file.
+        """
+        from voice.audio.codec import decode_file, encode_file
+
+        samples, sample_rate = decode_file(input_path)
+        samples, sample_rate = self.process(samples, sample_rate)
+        file_path = output_path or input_path
+        encode_file(file_path, samples, sample_rate)
+        logger.debug(f"Post-processed audio written to: {file_path} ({len(samples)} frames @ {sample_rate} Hz)")
+        return file_path
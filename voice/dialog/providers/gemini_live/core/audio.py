@@ -1,6 +1,7 @@
 import asyncio
 import pyaudio
 from core.logger import get_logger
+from core.metrics import counter
 
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
@@ -10,9 +11,21 @@ CHUNK_SIZE = 1024
 
 logger = get_logger(__name__)
 
+AUDIO_CHUNKS = counter("gemini_live_audio_chunks_total", "Audio chunks captured (sent) or received from Gemini Live.", ("direction",))
+AUDIO_BYTES = counter("gemini_live_audio_bytes_total", "PCM bytes captured (sent) or received from Gemini Live.", ("direction",))
+TEXT_CHARS = counter("gemini_live_text_characters_total", "Characters of text received from Gemini Live.")
+
 class AudioHandler:
-    def __init__(self, pya=None):
+    def __init__(self, pya=None, postprocessor=None):
+        """
+        Args:
+            pya: Shared PyAudio instance.
+            postprocessor (Optional[AudioPostProcessor]): Applied to the received audio before
+                playback as one continuous stream (see AudioPostProcessor.open_stream), so only
+                its resampling and downmixing take effect.
+        """
         self.pya = pya
+        self.postprocessor = postprocessor
         self.audio_stream = None
         
     async def listen_audio(self, out_queue):
@@ -36,6 +49,7 @@ class AudioHandler:
             return
 
         logger.info(f"Listen audio task started.")
+        sent_chunks, sent_bytes = AUDIO_CHUNKS.labels("sent"), AUDIO_BYTES.labels("sent")
         try:
             while True:
                 read_kwargs = {}
@@ -43,6 +57,9 @@ class AudioHandler:
                     read_kwargs["exception_on_overflow"] = False
                 
                 data = await asyncio.to_thread(self.audio_stream.read, CHUNK_SIZE, **read_kwargs)
+                sent_chunks.inc()
+                sent_bytes.inc(len(data))
+                logger.debug("Captured %d bytes of microphone audio.", len(data))
                 await out_queue.put({"data": data, "mime_type": "audio/pcm"})
         except asyncio.CancelledError:
             logger.info("Listen audio task cancelled.")
@@ -60,6 +77,7 @@ class AudioHandler:
 
     async def receive_audio(self, session, audio_in_queue):
         logger.info("Receive audio task started.")
+        received_chunks, received_bytes = AUDIO_CHUNKS.labels("received"), AUDIO_BYTES.labels("received")
         try:
             while True:
                 if not session:
@@ -70,9 +88,12 @@ class AudioHandler:
                 turn = session.receive()
                 async for response in turn:
                     if data := response.data:
+                        received_chunks.inc()
+                        received_bytes.inc(len(data))
                         audio_in_queue.put_nowait(data)
                         continue
                     if text := response.text:
+                        TEXT_CHARS.inc(len(text))
                         print(text, end="", flush=True)
         except asyncio.CancelledError:
             logger.info("Receive audio task cancelled.")
@@ -81,35 +102,58 @@ class AudioHandler:
         finally:
             logger.info("Receive audio task finished.")
 
+    @staticmethod
+    def _play_chunk(stream, pcm_stream, bytestream: bytes) -> int:
+        if pcm_stream:
+            bytestream = pcm_stream.process_pcm16(bytestream)
+        stream.write(bytestream)
+        return len(bytestream)
+
     async def play_audio(self, audio_in_queue):
         if not self.pya:
             logger.error("PyAudio not initialized. Cannot play audio.")
             return
 
         stream = None
+        output_rate = RECEIVE_SAMPLE_RATE
+        if self.postprocessor and self.postprocessor.target_sample_rate:
+            output_rate = self.postprocessor.target_sample_rate
         try:
             stream = await asyncio.to_thread(
                 self.pya.open,
                 format=FORMAT,
                 channels=CHANNELS,
-                rate=RECEIVE_SAMPLE_RATE,
+                rate=output_rate,
                 output=True,
             )
         except Exception as e:
             logger.error(f"Failed to open audio stream for playing: {e}", exc_info=True)
             return
 
+        # One stream for the whole session: the resampler carries its filter state
+        # from chunk to chunk, so chunk boundaries don't click.
+        pcm_stream = self.postprocessor.open_stream(RECEIVE_SAMPLE_RATE, CHANNELS) if self.postprocessor else None
         logger.info("Play audio task started.")
         try:
             while True:
                 bytestream = await audio_in_queue.get()
-                await asyncio.to_thread(stream.write, bytestream)
+                # Processing and the blocking write share one worker thread hop, off the event loop.
+                played = await asyncio.to_thread(self._play_chunk, stream, pcm_stream, bytestream)
+                logger.debug("Played %d bytes of audio; %d chunks queued.", played, audio_in_queue.qsize())
                 audio_in_queue.task_done()
         except asyncio.CancelledError:
             logger.info("Play audio task cancelled.")
         except Exception as e:
             logger.error(f"Error in play_audio: {e}", exc_info=True)
         finally:
+            if pcm_stream:
+                try:
+                    # A few milliseconds of audio at most; written inline so it lands before the stream closes.
+                    tail = pcm_stream.flush_pcm16()
+                    if tail:
+                        stream.write(tail)
+                except Exception as e_flush:
+                    logger.error(f"Error flushing play_audio tail: {e_flush}")
             if stream and stream.is_active():
                 try:
                     stream.stop_stream()
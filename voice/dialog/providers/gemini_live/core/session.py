@@ -1,6 +1,8 @@
 import asyncio
+import time
 import pyaudio
 from core.logger import get_logger
+from core.metrics import counter, gauge, histogram
 from .audio import AudioHandler
 from .video import VideoHandler
 from .communication import CommunicationHandler
@@ -8,8 +10,15 @@ from .resources import ResourceManager
 
 logger = get_logger(__name__)
 
+SESSIONS = counter("gemini_live_sessions_total", "Gemini Live sessions started.")
+SESSION_ERRORS = counter("gemini_live_session_errors_total", "Gemini Live sessions that ended with an exception, by type.", ("error",))
+SESSION_DURATION = histogram("gemini_live_session_duration_seconds", "Length of Gemini Live sessions.",
+                             buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0))
+ACTIVE_SESSIONS = gauge("gemini_live_active_sessions", "Gemini Live sessions currently running.")
+QUEUE_DEPTH = gauge("gemini_live_queue_depth", "Items waiting in the Gemini Live session queues.", ("queue",))
+
 class GeminiLiveSession:
-    def __init__(self, client, connect_config, model_name: str, video_mode: str = "none"):
+    def __init__(self, client, connect_config, model_name: str, video_mode: str = "none", postprocessor=None):
         self.client = client
         self.connect_config = connect_config
         self.model_name = model_name
@@ -28,7 +37,7 @@ class GeminiLiveSession:
             self.pya = None
             raise
             
-        self.audio_handler = AudioHandler(self.pya)
+        self.audio_handler = AudioHandler(self.pya, postprocessor)
         self.video_handler = VideoHandler()
         self.comm_handler = CommunicationHandler()
         self.resource_manager = ResourceManager()
@@ -40,6 +49,9 @@ class GeminiLiveSession:
             return
             
         self.other_tasks_list = []
+        SESSIONS.inc()
+        ACTIVE_SESSIONS.inc()
+        started = time.perf_counter()
         try:
             async with self.client.aio.live.connect(model=self.model_name, config=self.connect_config) as session:
                 self.session = session
@@ -47,6 +59,8 @@ class GeminiLiveSession:
                 
                 self.audio_in_queue = asyncio.Queue()
                 self.out_queue = asyncio.Queue(maxsize=5)
+                QUEUE_DEPTH.labels("audio_in").set_function(self.audio_in_queue.qsize)
+                QUEUE_DEPTH.labels("out").set_function(self.out_queue.qsize)
                 
                 self.other_tasks_list.append(asyncio.create_task(
                     self.comm_handler.send_realtime(self.out_queue, self.session), 
@@ -81,8 +95,11 @@ class GeminiLiveSession:
         except asyncio.CancelledError:
             logger.info("GeminiLiveSession run method was cancelled.")
         except Exception as e:
+            SESSION_ERRORS.labels(type(e).__name__).inc()
             logger.error(f"Exception in GeminiLiveSession run's main block: {e}", exc_info=True)
         finally:
+            ACTIVE_SESSIONS.dec()
+            SESSION_DURATION.observe(time.perf_counter() - started)
             logger.info("GeminiLiveSession run method entering finally block for cleanup.")
             
             active_tasks_to_cancel = [t for t in self.other_tasks_list if t and not t.done()]
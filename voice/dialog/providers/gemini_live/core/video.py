@@ -1,18 +1,20 @@
 import asyncio
 import base64
 import io
-import cv2
-import PIL.Image
-import mss
 from core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# cv2, PIL and mss are imported inside the capture methods, so they are only
+# loaded when GEMINI_LIVE_VIDEO_MODE actually uses the camera or the screen.
+
 class VideoHandler:
     def __init__(self):
         pass
         
     def _get_frame(self, cap):
+        import cv2
+        import PIL.Image
         ret, frame = cap.read()
         if not ret:
             return None
@@ -33,6 +35,7 @@ class VideoHandler:
             logger.debug("Camera mode not active, get_frames will not run.")
             return
 
+        import cv2
         cap = await asyncio.to_thread(cv2.VideoCapture, 0)
         if not cap.isOpened():
             logger.error("Failed to open camera for get_frames.")
@@ -55,6 +58,9 @@ class VideoHandler:
             logger.info("Camera frames task finished.")
 
     def _get_screen(self):
+        import mss
+        import mss.tools
+        import PIL.Image
         sct = mss.mss()
         monitor = sct.monitors[0]
         i = sct.grab(monitor)
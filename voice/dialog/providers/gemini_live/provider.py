@@ -11,6 +11,7 @@ class GeminiLiveProvider(BaseDialogProvider):
     PROVIDER_NAME = "gemini_live"
 
     def __init__(self, **kwargs):
+        postprocessor = kwargs.pop("postprocessor", None)
         super().__init__(**kwargs)
         logger.info("Initializing GeminiLiveProvider...")
         
@@ -18,6 +19,7 @@ class GeminiLiveProvider(BaseDialogProvider):
         self.model_name = AppConfig.GEMINI_LIVE_MODEL_NAME
         self.system_instruction = AppConfig.GEMINI_LIVE_SYSTEM_INSTRUCTION
         self.video_mode = AppConfig.GEMINI_LIVE_VIDEO_MODE
+        self.postprocessor = postprocessor or self._default_postprocessor()
 
         if not self.api_key:
             msg = "GEMINI_API_KEY is not set in AppConfig. GeminiLiveProvider cannot be initialized."
@@ -37,13 +39,23 @@ class GeminiLiveProvider(BaseDialogProvider):
                 client=self.client,
                 connect_config=self.connect_config,
                 model_name=self.model_name,
-                video_mode=self.video_mode
+                video_mode=self.video_mode,
+                postprocessor=self.postprocessor
             )
             logger.info("GeminiLiveProvider initialized successfully with session handler.")
         except Exception as e:
             logger.error(f"Error during GeminiLiveProvider initialization: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def _default_postprocessor():
+        output_rate = AppConfig.GEMINI_LIVE_OUTPUT_SAMPLE_RATE
+        if not output_rate:
+            return None
+        from voice.audio.processing import AudioPostProcessor
+        # Only resample: loudness and silence trimming need the whole clip, not a live stream.
+        return AudioPostProcessor(normalize=False, trim=False, target_sample_rate=int(output_rate))
+
     async def run_session(self) -> None:
         logger.info(f"Starting Gemini Live session with provider: {self.PROVIDER_NAME}")
         try:
@@ -1,5 +1,7 @@
+import time
 from typing import Optional, Dict, Type
 from core.logger import get_logger
+from core.metrics import counter, histogram
 from voice.recognition.base import BaseRecognitionProvider
 
 from voice.recognition.providers.devsdocode_stt import SeleniumSTTProvider
@@ -7,6 +9,12 @@ from voice.recognition.providers.vosk_stt import VoskSTTProvider
 
 logger = get_logger(__name__)
 
+LISTENS = counter("stt_listen_total", "Speech recognition calls by result (text, empty or failed).", ("provider", "result"))
+LISTEN_ERRORS = counter("stt_errors_total", "Speech recognition calls that raised, by exception type.", ("provider", "error"))
+LISTEN_DURATION = histogram("stt_listen_duration_seconds", "Time from starting to listen until a transcript was returned.",
+                            ("provider",), buckets=(0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0, 60.0))
+TRANSCRIPT_CHARS = counter("stt_transcript_characters_total", "Characters of recognized text.", ("provider",))
+
 class RecognitionProviderManager:
     """
     Manages the active Speech Recognition provider.
@@ -107,7 +115,19 @@ class RecognitionProviderManager:
         if not provider:
             logger.error("Cannot listen: No active STT recognition provider.")
             return None
-        return provider.listen(prints)
+        name = provider.PROVIDER_NAME
+        start = time.perf_counter()
+        try:
+            text = provider.listen(prints)
+        except Exception as e:
+            LISTEN_ERRORS.labels(name, type(e).__name__).inc()
+            LISTENS.labels(name, "failed").inc()
+            raise
+        LISTEN_DURATION.labels(name).observe(time.perf_counter() - start)
+        LISTENS.labels(name, "failed" if text is None else "text" if text else "empty").inc()
+        if text:
+            TRANSCRIPT_CHARS.labels(name).inc(len(text))
+        return text
 
 recognition_manager = RecognitionProviderManager()
 
@@ -2,6 +2,7 @@ import os
 from typing import Optional, Dict, Any
 
 from core.logger import get_logger
+from core.tracing import span
 from voice.recognition.base import BaseRecognitionProvider
 from voice.recognition.providers.selenium_stt.driver_manager import DriverManager
 from voice.recognition.providers.selenium_stt.recognition import RecognitionHandler
@@ -33,7 +34,9 @@ class SeleniumSTTProvider(BaseRecognitionProvider):
         self.recognition_handler = RecognitionHandler(self)
 
     def listen(self, prints: bool = False) -> Optional[str]:
-        result = self.recognition_handler.main()
+        with span("stt.listen", provider=self.PROVIDER_NAME) as s:
+            result = self.recognition_handler.main()
+            s.set_attribute("chars", len(result) if result is not None else None)
 
         if result is None:
             logger.error("Speech recognition failed critically. WebDriver might be re-initialized on next call.")
@@ -1,9 +1,8 @@
 import os
-import pyaudio
 from typing import Optional, Dict, Any, Generator
-from vosk import Model, KaldiRecognizer
 import ast
 from core.logger import get_logger
+from core.tracing import span
 from voice.recognition.base import BaseRecognitionProvider
 
 logger = get_logger(__name__)
@@ -50,6 +49,10 @@ class VoskSTTProvider(BaseRecognitionProvider):
         # Validate and set model path
         self.model_path = self._resolve_model_path(model_name, model_path)
         
+        # Vosk and PyAudio are imported on first use so that importing this module stays cheap.
+        import pyaudio
+        from vosk import Model, KaldiRecognizer
+        
         # Initialize Vosk model
         try:
             self.model = Model(self.model_path)
@@ -110,6 +113,7 @@ class VoskSTTProvider(BaseRecognitionProvider):
     def _start_stream(self):
         """Start the audio stream if not already started."""
         if self.stream is None or not self.stream.is_active():
+            import pyaudio
             try:
                 self.stream = self.audio.open(
                     format=pyaudio.paInt16, 
@@ -175,21 +179,24 @@ class VoskSTTProvider(BaseRecognitionProvider):
                            or no speech detected, and None if a recognition error occurred.
         """
         recognized_text = None
-        try:
-            for text_segment in self._speech_to_text_generator(prints):
-                if text_segment:
-                    recognized_text = text_segment
-                    break
-            
-            if recognized_text is None:
-                 recognized_text = ""
+        with span("stt.listen", provider=self.PROVIDER_NAME) as s:
+            try:
+                for text_segment in self._speech_to_text_generator(prints):
+                    if text_segment:
+                        recognized_text = text_segment
+                        break
+                
+                if recognized_text is None:
+                     recognized_text = ""
 
-            return recognized_text
-        except Exception as e:
-            logger.error(f"Error during Vosk speech recognition: {e}")
-            return None
-        finally:
-            self._stop_listening_stream()
+                s.set_attribute("chars", len(recognized_text))
+                return recognized_text
+            except Exception as e:
+                logger.error(f"Error during Vosk speech recognition: {e}")
+                s.set_attribute("error", f"{type(e).__name__}: {e}")
+                return None
+            finally:
+                self._stop_listening_stream()
     
     def get_available_languages(self) -> Dict[str, Any]:
         """
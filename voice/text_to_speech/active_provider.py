@@ -1,18 +1,49 @@
-from typing import Optional, Dict, Type
+import os
+import asyncio
+import tempfile
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Any, Optional, Dict, Iterable, List, Type, Callable, Iterator, TYPE_CHECKING
 from core.logger import get_logger
-from voice.text_to_speech.base import BaseTTSProvider
+from voice.text_to_speech import metrics
+from voice.text_to_speech.base import BaseTTSProvider, detect_audio_format
+from voice.text_to_speech.cache import SynthesisCache, make_cache_key, hash_text
+from voice.text_to_speech.health import DEFAULT_TIMEOUT, ProviderHealth, probe_provider, run_concurrently
+from voice.text_to_speech.scheduler import DeadlineExceeded, Priority, SynthesisScheduler
+from voice.text_to_speech.singleflight import SingleFlight
+from voice.text_to_speech.warmup import CacheWarmer, DEFAULT_PHRASES_PATH, load_phrases
 
 from voice.text_to_speech.providers.deepgram import DeepgramTTSProvider
 from voice.text_to_speech.providers.hearling import HearlingTTSProvider
 from voice.text_to_speech.providers.speechify import SpeechifyTTSProvider
 from voice.text_to_speech.providers.tiktok_tts import TikTokTTSProvider
 from voice.text_to_speech.providers.edge_tts import EdgeTTSProvider
+from voice.text_to_speech.providers.espeak import EspeakTTSProvider
+
+if TYPE_CHECKING:
+    from voice.audio.processing import AudioPostProcessor
 
 logger = get_logger(__name__)
 
 class TTSProviderManager:
     """
-    Manages the active Text-to-Speech provider.
+    Manages the Text-to-Speech providers.
+    
+    The provider set with initialize() or set_provider() is the default. Every
+    synthesis method also takes provider= to use another one for that call
+    only; those come from a pool in which each provider is instantiated once,
+    on first use, and then shared by all threads.
+    
+    With a SynthesisScheduler set, provider calls are admitted by priority=
+    and deadline=; cache hits and coalesced duplicates never wait for a slot.
+    
+    A fallback provider (typically the local "espeak") serves requests whose
+    provider fails, and a short-text provider can take over prompts short
+    enough that a network round trip would dominate their latency. Both
+    return audio in their own AUDIO_FORMAT and use their own default voice.
+    
+    warmup() and probe_all() record the health of providers; while the last
+    probe of a provider says it is down, its calls go straight to the fallback.
     """
     
     PROVIDERS: Dict[str, Type[BaseTTSProvider]] = {
@@ -21,6 +52,7 @@ class TTSProviderManager:
         "speechify": SpeechifyTTSProvider,
         "tiktok": TikTokTTSProvider,
         "edge_tts": EdgeTTSProvider,
+        "espeak": EspeakTTSProvider,
     }
     
     _instance = None
@@ -30,6 +62,21 @@ class TTSProviderManager:
             cls._instance = super(TTSProviderManager, cls).__new__(cls)
             cls._instance._active_provider: Optional[BaseTTSProvider] = None
             cls._instance._initialized: bool = False
+            cls._instance._postprocessor: Optional["AudioPostProcessor"] = None
+            cls._instance._cache: Optional[SynthesisCache] = None
+            cls._instance._scheduler: Optional[SynthesisScheduler] = None
+            cls._instance._fallback_provider: Optional[str] = None
+            cls._instance._short_text_provider: Optional[str] = None
+            cls._instance._short_text_max_chars: int = 0
+            cls._instance._health = ProviderHealth()
+            cls._instance._inflight = SingleFlight()
+            cls._instance._providers: Dict[str, BaseTTSProvider] = {}
+            cls._instance._provider_kwargs: Dict[str, dict] = {}
+            cls._instance._provider_locks: Dict[str, threading.Lock] = {}
+            cls._instance._providers_lock = threading.Lock()
+            cls._instance._in_use: Dict[int, int] = {}
+            cls._instance._retired: Dict[int, BaseTTSProvider] = {}
+            metrics.PENDING_KEYS.set_function(lambda: cls._instance._inflight.pending)
         return cls._instance
     
     def initialize(self, provider_name: str = "deepgram", **kwargs) -> None:
@@ -38,73 +85,545 @@ class TTSProviderManager:
         """
         if self._initialized:
             current_provider_name = self._active_provider.PROVIDER_NAME if self._active_provider else 'None'
-            logger.info(f"TTSProviderManager already initialized (current TTS provider: {current_provider_name}). Call to initialize with '{provider_name}' skipped.")
+            if provider_name != current_provider_name:
+                logger.warning(f"TTSProviderManager already initialized (current TTS provider: {current_provider_name}). Call to initialize with '{provider_name}' skipped; pass provider='{provider_name}' per call or use set_provider().")
+            else:
+                logger.info(f"TTSProviderManager already initialized (current TTS provider: {current_provider_name}). Call to initialize with '{provider_name}' skipped.")
             return
-            
+        
+        logger.info(f"Initializing TTS with provider: {provider_name}")
+        self._active_provider = self.add_provider(provider_name, **kwargs)
+        self._initialized = True
+    
+    def _check_provider_name(self, provider_name: str) -> None:
         if provider_name not in self.PROVIDERS:
             available = ", ".join(self.PROVIDERS.keys())
             raise ValueError(f"Invalid provider '{provider_name}'. Available providers: {available}")
+    
+    def add_provider(self, provider_name: str, **kwargs) -> BaseTTSProvider:
+        """
+        Put a provider configured with kwargs in the pool without changing the
+        default provider. A loaded instance with the same kwargs is reused;
+        one with different kwargs is replaced, and closed once the calls still
+        running on it have finished. Later lazy loads of the provider reuse kwargs.
+        """
+        self._check_provider_name(provider_name)
+        with self._providers_lock:
+            load_lock = self._provider_locks.setdefault(provider_name, threading.Lock())
+        with load_lock:
+            previous = self._providers.get(provider_name)
+            if previous is not None and self._provider_kwargs.get(provider_name, {}) == kwargs:
+                return previous
+            provider = self.PROVIDERS[provider_name](**kwargs)
+            with self._providers_lock:
+                self._provider_kwargs[provider_name] = kwargs
+                self._providers[provider_name] = provider
+                if previous is not None and self._active_provider is previous:
+                    self._active_provider = provider
+                if previous is not None and self._in_use.get(id(previous)):
+                    # The last call still using it closes it; see _using().
+                    self._retired[id(previous)] = previous
+                    previous = None
+        if previous is not None:
+            self._close_replaced(previous)
+        return provider
+    
+    @staticmethod
+    def _close_replaced(provider: BaseTTSProvider) -> None:
+        try:
+            provider.close()
+        except Exception as e:
+            logger.warning(f"Could not close replaced TTS provider {provider.PROVIDER_NAME}: {e}")
+    
+    @contextmanager
+    def _using(self, provider: BaseTTSProvider) -> Iterator[BaseTTSProvider]:
+        """Count a call running on provider, so add_provider() doesn't close it underneath the call."""
+        with self._providers_lock:
+            self._in_use[id(provider)] = self._in_use.get(id(provider), 0) + 1
+        try:
+            yield provider
+        finally:
+            with self._providers_lock:
+                count = self._in_use.pop(id(provider)) - 1
+                if count:
+                    self._in_use[id(provider)] = count
+                retired = self._retired.pop(id(provider), None) if not count else None
+            if retired is not None:
+                self._close_replaced(retired)
+    
+    def _provider_synthesize(self, provider: BaseTTSProvider, text: str, voice: Optional[str]) -> bytes:
+        with self._using(provider):
+            return provider.synthesize(text, voice)
+    
+    def _probe(self, provider: BaseTTSProvider) -> Dict[str, Any]:
+        with self._using(provider):
+            return probe_provider(provider)
+    
+    def get_provider(self, provider_name: Optional[str] = None) -> Optional[BaseTTSProvider]:
+        """
+        Get a TTS provider: the default one, or provider_name from the pool,
+        instantiating it on first use.
+        """
+        if provider_name is None:
+            if not self._initialized:
+                logger.warning("TTS TTSProviderManager get_provider called before initialization.")
+            return self._active_provider
         
-        logger.info(f"Initializing TTS with provider: {provider_name}")
-        self._active_provider = self.PROVIDERS[provider_name](**kwargs)
-        self._initialized = True
+        provider = self._providers.get(provider_name)
+        if provider is not None:
+            return provider
+        self._check_provider_name(provider_name)
+        with self._providers_lock:
+            load_lock = self._provider_locks.setdefault(provider_name, threading.Lock())
+        # Loading holds a per-provider lock, so a slow constructor only blocks callers of that provider.
+        with load_lock:
+            provider = self._providers.get(provider_name)
+            if provider is None:
+                logger.info(f"Loading TTS provider: {provider_name}")
+                provider = self.PROVIDERS[provider_name](**self._provider_kwargs.get(provider_name, {}))
+                with self._providers_lock:
+                    self._providers[provider_name] = provider
+        return provider
     
-    def get_provider(self) -> Optional[BaseTTSProvider]:
+    def loaded_providers(self) -> List[str]:
         """
-        Get the currently active TTS provider.
+        Get the names of the providers instantiated so far.
         """
-        if not self._initialized:
-            logger.warning("TTS TTSProviderManager get_provider called before initialization.")
-        return self._active_provider
+        with self._providers_lock:
+            return list(self._providers)
     
     def set_provider(self, provider_name: str, **kwargs) -> None:
         """
-        Change the active TTS provider.
+        Change the default TTS provider. Calls that pass provider= are not affected.
+        The pooled instance is reused if kwargs match the ones it was created with.
         """
-        if provider_name not in self.PROVIDERS:
-            available = ", ".join(self.PROVIDERS.keys())
-            raise ValueError(f"Invalid provider '{provider_name}'. Available providers: {available}")
-            
         logger.info(f"Switching TTS provider to: {provider_name}")
-        self._active_provider = self.PROVIDERS[provider_name](**kwargs)
+        self._active_provider = self.add_provider(provider_name, **kwargs)
         self._initialized = True
     
+    def set_postprocessor(self, postprocessor: Optional["AudioPostProcessor"]) -> None:
+        """
+        Set the post-processing stage applied to generated audio, or None to disable it.
+        """
+        self._postprocessor = postprocessor
+    
+    def set_cache(self, cache: Optional[SynthesisCache]) -> None:
+        """
+        Set the synthesis cache consulted before calling the provider, or None to disable it.
+        Any object with SynthesisCache's interface works, e.g. a PackedSynthesisCache.
+        """
+        self._cache = cache
+    
+    def get_cache(self) -> Optional[SynthesisCache]:
+        """
+        Get the synthesis cache, if one is set.
+        """
+        return self._cache
+    
+    def set_scheduler(self, scheduler: Optional[SynthesisScheduler]) -> None:
+        """
+        Set the scheduler that admits provider calls by priority and deadline, or None to disable it.
+        """
+        self._scheduler = scheduler
+    
+    def get_scheduler(self) -> Optional[SynthesisScheduler]:
+        """
+        Get the scheduler, if one is set.
+        """
+        return self._scheduler
+    
+    def slot(self, provider_name: str, priority=Priority.INTERACTIVE, deadline: Optional[float] = None):
+        """
+        Context manager holding one of the scheduler's slots for provider_name, for
+        callers that use a provider directly. A no-op without a scheduler.
+        """
+        if self._scheduler is None:
+            return nullcontext()
+        return self._scheduler.slot(provider_name, priority, deadline)
+    
+    def set_fallback(self, provider_name: Optional[str]) -> None:
+        """
+        Set the provider that serves a request when its own provider fails, or None to disable failover.
+        Fallback audio is cached under the fallback provider, so the failed provider is tried again next time.
+        """
+        if provider_name is not None:
+            self._check_provider_name(provider_name)
+        self._fallback_provider = provider_name
+    
+    def set_short_text_provider(self, provider_name: Optional[str], max_chars: int = 24) -> None:
+        """
+        Send prompts of at most max_chars characters that don't name a provider to
+        provider_name instead of the default provider, or None to disable the route.
+        """
+        if provider_name is not None:
+            self._check_provider_name(provider_name)
+        self._short_text_provider = provider_name
+        self._short_text_max_chars = max_chars
+    
+    def _route(self, text: str, voice: Optional[str], provider: Optional[str],
+               count: bool = True) -> tuple:
+        """Return the (voice, provider) a call should use after short-text and health routing."""
+        default_name = self._active_provider.PROVIDER_NAME if self._active_provider else None
+        if (provider is None and self._short_text_provider and self._short_text_provider != default_name
+                and len(text.strip()) <= self._short_text_max_chars):
+            if count:
+                metrics.SHORT_TEXT_ROUTED.labels(self._short_text_provider).inc()
+            # The voice was chosen for the default provider.
+            return None, self._short_text_provider
+        name = provider or default_name
+        if name and self._fallback_provider not in (None, name) and self._health.is_down(name):
+            if count:
+                metrics.FALLBACKS.labels(name, self._fallback_provider).inc()
+            return None, self._fallback_provider
+        return voice, provider
+    
+    def _fallback_for(self, provider: BaseTTSProvider, error: Exception) -> Optional[BaseTTSProvider]:
+        if isinstance(error, DeadlineExceeded) or self._fallback_provider in (None, provider.PROVIDER_NAME):
+            return None
+        logger.warning(f"TTS provider {provider.PROVIDER_NAME} failed ({error}); falling back to {self._fallback_provider}.")
+        metrics.FALLBACKS.labels(provider.PROVIDER_NAME, self._fallback_provider).inc()
+        return self.get_provider(self._fallback_provider)
+    
+    def _configured_providers(self) -> List[str]:
+        names = [self._active_provider.PROVIDER_NAME] if self._active_provider else []
+        names += [name for name in (self._fallback_provider, self._short_text_provider) if name]
+        return list(dict.fromkeys(names + self.loaded_providers()))
+    
+    def warmup(self, providers: Optional[Iterable[str]] = None, probe: bool = True,
+               timeout: float = DEFAULT_TIMEOUT) -> threading.Thread:
+        """
+        Load providers, let them open pooled connections and fetch tokens, and
+        probe them, all in the background, so the first real request of each is fast.
+        
+        Args:
+            providers (Optional[Iterable[str]]): Providers to warm; None warms the default,
+                                                 fallback, short-text and already loaded providers.
+            probe (bool): Also synthesize a tiny prompt with each and record its health.
+            timeout (float): Seconds after which a provider still warming up is reported down.
+        
+        Returns:
+            threading.Thread: The background thread; join() it to wait for the warm-up.
+        """
+        names = list(providers) if providers is not None else self._configured_providers()
+        for name in names:
+            self._check_provider_name(name)
+        
+        def warm(name: str) -> Dict[str, Any]:
+            provider = self.get_provider(name)
+            try:
+                with self._using(provider):
+                    provider.warmup()
+            except Exception as e:
+                logger.warning(f"Warm-up of TTS provider {name} failed: {e}")
+            return self._probe(provider) if probe else {}
+        
+        def run() -> None:
+            results = run_concurrently(names, warm, timeout)
+            if probe:
+                for result in results.values():
+                    self._health.record(result)
+            logger.info(f"Warmed up TTS providers: {', '.join(names)}")
+        
+        thread = threading.Thread(target=run, name="tts-warmup", daemon=True)
+        thread.start()
+        return thread
+    
+    def probe_all(self, providers: Optional[Iterable[str]] = None,
+                  timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Dict[str, Any]]:
+        """
+        Probe providers concurrently, bypassing cache and scheduler, and record their health.
+        
+        Args:
+            providers (Optional[Iterable[str]]): Providers to probe; None probes every registered provider.
+            timeout (float): Seconds after which a provider that hasn't answered is reported down.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Per provider: healthy, latency_ms, bytes, error and checked_at.
+        """
+        names = list(providers) if providers else list(self.PROVIDERS)
+        for name in names:
+            self._check_provider_name(name)
+        results = run_concurrently(names, lambda name: self._probe(self.get_provider(name)), timeout)
+        for result in results.values():
+            self._health.record(result)
+        return results
+    
+    def provider_health(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the latest probe result of every probed provider.
+        """
+        return self._health.snapshot()
+    
     def list_providers(self) -> Dict[str, str]:
         """
         Get a list of all available TTS providers.
         """
         return {name: provider.__name__ for name, provider in self.PROVIDERS.items()}
     
-    def speak(self, text: str, voice: Optional[str] = None) -> None:
+    @staticmethod
+    def _resolve_voice(provider: BaseTTSProvider, voice: Optional[str]) -> str:
+        return voice or getattr(provider, "default_voice", None) or ""
+    
+    def _cache_key(self, provider: BaseTTSProvider, text: str, voice: Optional[str]) -> str:
+        return make_cache_key(provider.PROVIDER_NAME, self._resolve_voice(provider, voice), text)
+    
+    def is_cached(self, text: str, voice: Optional[str] = None, provider: Optional[str] = None) -> bool:
+        """
+        Check whether the audio for text and voice is in the cache.
+        """
+        voice, provider = self._route(text, voice, provider, count=False)
+        tts_provider = self.get_provider(provider)
+        return bool(self._cache and tts_provider and self._cache_key(tts_provider, text, voice) in self._cache)
+    
+    def _cache_metadata(self, provider: BaseTTSProvider, text: str, voice: Optional[str]) -> Dict[str, str]:
+        return {
+            "provider": provider.PROVIDER_NAME,
+            "voice": self._resolve_voice(provider, voice),
+            "text_sha256": hash_text(text),
+            "format": provider.AUDIO_FORMAT,
+        }
+    
+    def _cache_get(self, provider: BaseTTSProvider, key: str, view: bool = False) -> Optional[bytes]:
+        data = self._cache.get_view(key) if view else self._cache.get(key)
+        metrics.CACHE_LOOKUPS.labels(provider.PROVIDER_NAME, "miss" if data is None else "hit").inc()
+        return data
+    
+    def _synthesize_with(self, provider: BaseTTSProvider, key: str, text: str, voice: Optional[str],
+                         priority=Priority.INTERACTIVE, deadline: Optional[float] = None,
+                         fallback: bool = True) -> bytes:
+        if self._cache:
+            data = self._cache_get(provider, key)
+            if data is not None:
+                return data
+        try:
+            with self.slot(provider.PROVIDER_NAME, priority, deadline):
+                data = self._provider_synthesize(provider, text, voice)
+        except Exception as e:
+            if not fallback:
+                raise
+            fallback_provider = self._fallback_for(provider, e)
+            if fallback_provider is None:
+                raise
+            return self._synthesize_with(fallback_provider, self._cache_key(fallback_provider, text, None), text, None,
+                                         priority, deadline)
+        # Never cache an empty result; it would be served as a hit forever.
+        if self._cache and data:
+            self._cache.put(key, data, self._cache_metadata(provider, text, voice))
+        return data
+    
+    async def _asynthesize_with(self, provider: BaseTTSProvider, key: str, text: str, voice: Optional[str],
+                                priority, deadline: Optional[float], fallback: bool = True) -> bytes:
+        # Waits for the scheduler slot on the event loop; only the provider call and cache I/O use threads.
+        if self._cache:
+            data = await asyncio.to_thread(self._cache_get, provider, key)
+            if data is not None:
+                return data
+        try:
+            async with self._scheduler.aslot(provider.PROVIDER_NAME, priority, deadline):
+                data = await asyncio.to_thread(self._provider_synthesize, provider, text, voice)
+        except Exception as e:
+            if not fallback:
+                raise
+            fallback_provider = self._fallback_for(provider, e)
+            if fallback_provider is None:
+                raise
+            return await self._asynthesize_with(fallback_provider, self._cache_key(fallback_provider, text, None),
+                                                text, None, priority, deadline)
+        if self._cache and data:
+            await asyncio.to_thread(self._cache.put, key, data, self._cache_metadata(provider, text, voice))
+        return data
+    
+    def synthesize(self, text: str, voice: Optional[str] = None, provider: Optional[str] = None,
+                   priority=Priority.INTERACTIVE, deadline: Optional[float] = None,
+                   fallback: bool = True) -> Optional[bytes]:
+        """
+        Generate speech in memory, consulting the cache first.
+        
+        Concurrent requests for the same (provider, voice, text) are coalesced
+        into a single provider call whose result every caller shares; it runs
+        with the priority and deadline of the caller that started it.
+        
+        Args:
+            text (str): Text to synthesize.
+            voice (Optional[str]): Voice to use; None uses the provider default.
+            provider (Optional[str]): Provider for this call; None uses the default provider.
+            priority (Priority | str): Scheduling class: interactive, prefetch or batch.
+            deadline (Optional[float]): time.monotonic() value after which a still queued call is dropped.
+            fallback (bool): False to only accept audio from the requested provider: no short-text
+                             or health routing and no fallback provider, so a failure raises.
+        
+        Returns:
+            Optional[bytes]: Encoded audio, or None if no provider is active.
+        
+        Raises:
+            DeadlineExceeded: If the deadline passed before the scheduler admitted the call.
+        """
+        if fallback:
+            voice, provider = self._route(text, voice, provider)
+        tts_provider = self.get_provider(provider)
+        if not tts_provider:
+            logger.error("Cannot synthesize: No active TTS provider.")
+            return None
+        key = self._cache_key(tts_provider, text, voice)
+        # A call that may fall back must not share its result with one that may not.
+        flight = key if fallback else f"{key}:exact"
+        return self._inflight.do(flight, lambda: self._synthesize_with(tts_provider, key, text, voice, priority,
+                                                                       deadline, fallback))
+    
+    async def asynthesize(self, text: str, voice: Optional[str] = None, provider: Optional[str] = None,
+                          priority=Priority.INTERACTIVE, deadline: Optional[float] = None,
+                          fallback: bool = True) -> Optional[bytes]:
+        """
+        Async variant of synthesize(). Coalesces with both sync and async callers.
+        """
+        if fallback:
+            voice, provider = self._route(text, voice, provider)
+        tts_provider = self.get_provider(provider)
+        if not tts_provider:
+            logger.error("Cannot synthesize: No active TTS provider.")
+            return None
+        key = self._cache_key(tts_provider, text, voice)
+        flight = key if fallback else f"{key}:exact"
+        if self._scheduler is not None:
+            return await self._inflight.do_coroutine(
+                flight, lambda: self._asynthesize_with(tts_provider, key, text, voice, priority, deadline, fallback))
+        return await self._inflight.do_async(
+            flight, lambda: self._synthesize_with(tts_provider, key, text, voice, priority, deadline, fallback))
+    
+    def stream_speech(self, text: str, voice: Optional[str] = None, chunk_size: Optional[int] = None,
+                      provider: Optional[str] = None, priority=Priority.INTERACTIVE,
+                      deadline: Optional[float] = None) -> Iterator[bytes]:
         """
-        Convert text to speech using the active provider.
+        Yield encoded audio chunks for text as the provider produces them.
+        
+        Cache hits are streamed straight from the cache as memoryview slices, and
+        a fully streamed miss is stored afterwards. The post-processing stage is not applied,
+        since it needs the whole clip. With a scheduler, a miss holds a provider slot until
+        the stream ends or is closed. A provider that fails before its first chunk
+        is replaced by the fallback provider; after that the error is raised.
         """
-        provider = self.get_provider()
-        if not provider:
-            logger.error("Cannot speak: No active TTS provider.")
+        voice, provider = self._route(text, voice, provider)
+        tts_provider = self.get_provider(provider)
+        if not tts_provider:
+            logger.error("Cannot stream_speech: No active TTS provider.")
+            return
+        chunk_size = chunk_size or tts_provider.STREAM_CHUNK_SIZE
+        key = self._cache_key(tts_provider, text, voice)
+        if self._cache:
+            # Hits are sliced from a view, so a packed cache streams straight from its mapped segments.
+            data = self._cache_get(tts_provider, key, view=True)
+            if data is not None:
+                for offset in range(0, len(data), chunk_size):
+                    yield data[offset:offset + chunk_size]
+                return
+        
+        chunks = []
+        started = False
+        try:
+            with self.slot(tts_provider.PROVIDER_NAME, priority, deadline), self._using(tts_provider):
+                for chunk in tts_provider.stream_speech(text, voice, chunk_size):
+                    if self._cache:
+                        chunks.append(chunk)
+                    started = True
+                    yield chunk
+        except Exception as e:
+            fallback = None if started else self._fallback_for(tts_provider, e)
+            if fallback is None:
+                raise
+            yield from self.stream_speech(text, None, chunk_size, fallback.PROVIDER_NAME, priority, deadline)
             return
-        provider.speak(text, voice)
+        if self._cache and chunks:
+            self._cache.put(key, b"".join(chunks), self._cache_metadata(tts_provider, text, voice))
+    
+    def warm_cache(self, phrases_path: str = DEFAULT_PHRASES_PATH, voice: Optional[str] = None,
+                   max_concurrency: int = 2, on_progress: Optional[Callable[[CacheWarmer], None]] = None,
+                   provider: Optional[str] = None) -> Optional[CacheWarmer]:
+        """
+        Pre-synthesize every phrase in phrases_path that is not cached yet, in the background.
+        
+        Args:
+            phrases_path (str): Phrase list file, one phrase per line.
+            voice (Optional[str]): Voice to warm; None uses the provider default.
+            max_concurrency (int): Maximum number of concurrent provider requests.
+            on_progress (Optional[Callable]): Called with the warmer after every phrase.
+            provider (Optional[str]): Provider to warm; None uses the default provider.
+        
+        Returns:
+            Optional[CacheWarmer]: The started warmer, or None if there is no cache or phrase file.
+        """
+        if not self._cache:
+            logger.warning("warm_cache called without a synthesis cache. Call set_cache() first.")
+            return None
+        if not os.path.exists(phrases_path):
+            logger.warning(f"Phrase list not found, skipping cache warm-up: {phrases_path}")
+            return None
+        return CacheWarmer(self, load_phrases(phrases_path), voice, max_concurrency, on_progress, provider).start()
+    
+    def _write_output(self, data: bytes, output_path: Optional[str], provider: Optional[str] = None) -> str:
+        if output_path:
+            file_path = output_path
+        else:
+            audio_format = detect_audio_format(data, self.get_provider(provider).AUDIO_FORMAT)
+            fd, file_path = tempfile.mkstemp(suffix=f".{audio_format}", prefix="tts_")
+            os.close(fd)
+        with open(file_path, "wb") as audio_file:
+            audio_file.write(data)
+        if self._postprocessor:
+            file_path = self._postprocessor.process_file(file_path)
+        return file_path
+    
+    def speak(self, text: str, voice: Optional[str] = None, provider: Optional[str] = None) -> None:
+        """
+        Convert text to speech and play it.
+        """
+        try:
+            audio_path = self.generate_speech(text, voice, provider=provider)
+            if not audio_path:
+                return
+            from utils.helpers import play_audio
+            try:
+                play_audio(audio_path)
+            finally:
+                if os.path.exists(audio_path):
+                    os.remove(audio_path)
+        except Exception as e:
+            logger.error(f"Failed to speak text: {e}")
+    
+    def generate_speech(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None,
+                        provider: Optional[str] = None, priority=Priority.INTERACTIVE,
+                        deadline: Optional[float] = None) -> Optional[str]:
+        """
+        Generate speech with the default provider, or with provider if given.
+        
+        If output_path is None, the audio is written to a new temporary file.
+        """
+        data = self.synthesize(text, voice, provider, priority, deadline)
+        if data is None:
+            return None
+        return self._write_output(data, output_path, provider)
     
-    def generate_speech(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None) -> Optional[str]:
+    async def agenerate_speech(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None,
+                               provider: Optional[str] = None, priority=Priority.INTERACTIVE,
+                               deadline: Optional[float] = None) -> Optional[str]:
         """
-        Generate speech using the active provider.
+        Async variant of generate_speech().
         """
-        provider = self.get_provider()
-        if not provider:
-            logger.error("Cannot generate_speech: No active TTS provider.")
+        data = await self.asynthesize(text, voice, provider, priority, deadline)
+        if data is None:
             return None
-        return provider.generate_speech(text, voice, output_path)
+        return await asyncio.to_thread(self._write_output, data, output_path, provider)
 
 tts_manager = TTSProviderManager()
 
-def speak(text: str, voice: Optional[str] = None) -> None:
+def speak(text: str, voice: Optional[str] = None, provider: Optional[str] = None) -> None:
     """
-    Speak text using the active TTS provider.
+    Speak text using the active TTS provider, or provider if given.
     """
-    tts_manager.speak(text, voice)
+    tts_manager.speak(text, voice, provider)
 
-def generate_speech(text: str, voice: Optional[str] = None, output_path: Optional[str] = None) -> Optional[str]:
+def generate_speech(text: str, voice: Optional[str] = None, output_path: Optional[str] = None,
+                    provider: Optional[str] = None) -> Optional[str]:
     """
-    Generate speech using the active TTS provider.
+    Generate speech using the active TTS provider, or provider if given.
     """
-    return tts_manager.generate_speech(text, voice, output_path)
\ No newline at end of file
+    return tts_manager.generate_speech(text, voice, output_path, provider)
\ No newline at end of file
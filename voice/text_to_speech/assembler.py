@@ -0,0 +1,180 @@
+import os
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from core.logger import get_logger
+from voice.audio.codec import decode_bytes, decode_file, open_stream_writer
+from voice.audio.processing import downmix_to_mono, resample, trim_silence
+
+logger = get_logger(__name__)
+
+
+class AudioAssembler:
+    """
+    Joins audio segments into a single output file without gaps or clicks.
+
+    Each segment is decoded to PCM, stripped of encoder delay and padding, and
+    joined to the previous one with a short equal-power crossfade. Audio is
+    written as soon as it is final, so only the current segment and the
+    crossfade tail of the previous one are held in memory.
+
+    Silence can be inserted between segments with add_silence(); segments on
+    either side of it are not crossfaded.
+
+    Usage:
+        with AudioAssembler("output/book.mp3") as assembler:
+            for path in segment_paths:
+                assembler.add_segment(path)
+                assembler.add_silence(300)
+    """
+
+    def __init__(self, output_path: str, crossfade_ms: float = 15.0, trim_padding: bool = True,
+                 padding_threshold_dbfs: float = -60.0, sample_rate: Optional[int] = None,
+                 channels: Optional[int] = None):
+        """
+        Initialize the assembler.
+
+        Args:
+            output_path (str): Destination file; the container is chosen from its extension.
+            crossfade_ms (float): Length of the crossfade between consecutive segments.
+            trim_padding (bool): Strip near-silent encoder delay and padding from segment edges.
+            padding_threshold_dbfs (float): Level below which edge audio counts as padding.
+            sample_rate (Optional[int]): Output sample rate; defaults to that of the first segment.
+            channels (Optional[int]): Output channel count; defaults to that of the first segment.
+        """
+        self.output_path = output_path
+        self.crossfade_ms = crossfade_ms
+        self.trim_padding = trim_padding
+        self.padding_threshold_dbfs = padding_threshold_dbfs
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.segment_count = 0
+        self.frames_written = 0
+
+        self._writer = None
+        self._tail: Optional[np.ndarray] = None
+        self._crossfade_frames = 0
+        self._pending_silence_ms = 0.0
+        self._closed = False
+
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+
+    def _decode(self, segment: Union[str, bytes]) -> np.ndarray:
+        samples, rate = decode_file(segment) if isinstance(segment, str) else decode_bytes(segment)
+
+        if self._writer is None:
+            self.sample_rate = self.sample_rate or rate
+            self.channels = self.channels or samples.shape[1]
+            self._crossfade_frames = int(self.sample_rate * self.crossfade_ms / 1000.0)
+            self._writer = open_stream_writer(self.output_path, self.sample_rate, self.channels)
+
+        if rate != self.sample_rate:
+            samples = resample(samples, rate, self.sample_rate)
+        if samples.shape[1] != self.channels:
+            samples = downmix_to_mono(samples)
+            if self.channels > 1:
+                samples = np.repeat(samples, self.channels, axis=1)
+        if self.trim_padding:
+            samples = trim_silence(samples, self.sample_rate, self.padding_threshold_dbfs, frame_ms=2.0, padding_ms=0.0)
+        return samples
+
+    def _write(self, samples: np.ndarray) -> None:
+        if len(samples):
+            self._writer.write(samples)
+            self.frames_written += len(samples)
+
+    @property
+    def position(self) -> int:
+        """Length of the output so far in frames, including audio held back for the next crossfade."""
+        return self.frames_written + (len(self._tail) if self._tail is not None else 0)
+
+    def _write_silence(self, frames: int) -> None:
+        if self._tail is not None:
+            self._write(self._tail)
+            self._tail = None
+        self._write(np.zeros((frames, self.channels), dtype=np.float32))
+
+    def add_silence(self, duration_ms: float) -> Tuple[int, int]:
+        """
+        Append silence to the output. Before the first segment the duration is
+        kept until the sample rate is known.
+
+        Args:
+            duration_ms (float): Length of the silence.
+
+        Returns:
+            Tuple[int, int]: First and end frame of the silence in the output.
+        """
+        if self._closed:
+            raise ValueError("Cannot add silence to a closed AudioAssembler.")
+        if self._writer is None:
+            self._pending_silence_ms += duration_ms
+            return 0, 0
+        start = self.position
+        self._write_silence(int(self.sample_rate * duration_ms / 1000.0))
+        return start, self.position
+
+    def add_segment(self, segment: Union[str, bytes]) -> Tuple[int, int]:
+        """
+        Decode a segment and append it to the output.
+
+        Args:
+            segment (Union[str, bytes]): Path to an audio file or encoded audio bytes.
+
+        Returns:
+            Tuple[int, int]: First and end frame of the segment in the output; the
+                             first frame lies inside the crossfade with the previous segment.
+        """
+        if self._closed:
+            raise ValueError("Cannot add segments to a closed AudioAssembler.")
+
+        samples = self._decode(segment)
+        self.segment_count += 1
+        if self._pending_silence_ms:
+            self._write_silence(int(self.sample_rate * self._pending_silence_ms / 1000.0))
+            self._pending_silence_ms = 0.0
+        start = self.position
+        if len(samples) == 0:
+            return start, start
+
+        if self._tail is not None and len(self._tail):
+            n = min(len(self._tail), len(samples), self._crossfade_frames)
+            self._write(self._tail[:len(self._tail) - n])
+            if n:
+                ramp = np.linspace(0.0, np.pi / 2, n, dtype=np.float32)[:, None]
+                self._write(self._tail[len(self._tail) - n:] * np.cos(ramp) + samples[:n] * np.sin(ramp))
+            samples = samples[n:]
+            start -= n
+
+        keep = min(len(samples), self._crossfade_frames)
+        self._write(samples[:len(samples) - keep])
+        self._tail = samples[len(samples) - keep:].copy()
+        return start, self.position
+
+    def close(self) -> str:
+        """
+        Flush the remaining audio and finalize the output file.
+
+        Returns:
+            str: Path to the assembled file.
+        """
+        if self._closed:
+            return self.output_path
+        self._closed = True
+        if self._writer is None:
+            raise ValueError("No segments were added to the AudioAssembler.")
+        if self._tail is not None:
+            self._write(self._tail)
+            self._tail = None
+        self._writer.close()
+        logger.debug(f"Assembled {self.segment_count} segments into: {self.output_path} ({self.frames_written} frames)")
+        return self.output_path
+
+    def __enter__(self) -> "AudioAssembler":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._writer is not None:
+            self.close()
@@ -1,5 +1,32 @@
+import os
+import tempfile
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Iterator
+
+from core.tracing import end_span, span, start_span, use_span
+from voice.text_to_speech import metrics
+
+# Voice label of metrics for requests whose voice the provider doesn't list.
+METRIC_OTHER_VOICE = "other"
+
+# Leading bytes of the formats providers return.
+_FORMAT_SIGNATURES = ((b"RIFF", "wav"), (b"OggS", "opus"), (b"ID3", "mp3"),
+                      (b"\xff\xfb", "mp3"), (b"\xff\xf3", "mp3"), (b"\xff\xf2", "mp3"))
+
+def detect_audio_format(data, default: str = "mp3") -> str:
+    """
+    Tell the format of encoded audio from its first bytes. Needed where the audio
+    may come from another provider than the one asked for, e.g. a fallback.
+    
+    Returns:
+        str: "wav", "opus" or "mp3", or default if the signature is unknown.
+    """
+    head = bytes(data[:4])
+    for signature, audio_format in _FORMAT_SIGNATURES:
+        if head.startswith(signature):
+            return audio_format
+    return default
 
 class BaseTTSProvider(ABC):
     """
@@ -10,11 +37,73 @@ class BaseTTSProvider(ABC):
     """
     
     PROVIDER_NAME = "base"
+    AUDIO_FORMAT = "mp3"
+    STREAM_CHUNK_SIZE = 16384
+    
+    # Providers backed by an HTTP API set these so their endpoint can be overridden,
+    # e.g. to point them at the fakes in voice.text_to_speech.fakes.
+    DEFAULT_BASE_URL: Optional[str] = None
+    BASE_URL_ENV: Optional[str] = None
+    # Connections kept open per host by HTTP providers' sessions.
+    HTTP_POOL_SIZE = 32
     
     def __init__(self):
         """Initialize the TTS provider."""
         pass
     
+    def resolve_base_url(self, base_url: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve the API base URL: an explicit argument wins, then the BASE_URL_ENV
+        environment variable, then DEFAULT_BASE_URL.
+        
+        Args:
+            base_url (Optional[str]): Override passed to the provider's constructor.
+        
+        Returns:
+            Optional[str]: Base URL without a trailing slash.
+        """
+        url = base_url or (os.getenv(self.BASE_URL_ENV) if self.BASE_URL_ENV else None) or self.DEFAULT_BASE_URL
+        return url.rstrip("/") if url else url
+    
+    def warmup(self) -> None:
+        """
+        Prepare for the first request, e.g. open pooled connections or fetch tokens,
+        so it doesn't pay for DNS, TLS or account setup. Does nothing by default.
+        
+        Raises:
+            Exception: If the endpoint can't be reached.
+        """
+    
+    def close(self) -> None:
+        """
+        Release the provider's connections and threads. The manager calls this
+        when it replaces a pooled instance; the instance is unusable afterwards.
+        The default closes the requests session made by _new_session(), if any.
+        """
+        session = getattr(self, "session", None)
+        if session is not None:
+            session.close()
+    
+    def _new_session(self):
+        """
+        Create a requests session whose connection pool holds HTTP_POOL_SIZE
+        connections per host, so concurrent requests reuse open connections.
+        """
+        import requests
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.HTTP_POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def _warm_connection(self, session, url: str, timeout: float = 5.0) -> None:
+        """
+        Open a pooled connection to the host of url with a HEAD request. The
+        response status is ignored; only failing to connect raises.
+        """
+        with span("tts.warmup", provider=self.PROVIDER_NAME):
+            session.head(url, timeout=timeout, allow_redirects=False).close()
+    
     @abstractmethod
     def generate_speech(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None) -> str:
         """
@@ -30,6 +119,164 @@ class BaseTTSProvider(ABC):
         """
         pass
     
+    def synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        """
+        Convert text to speech and return the encoded audio in memory.
+        
+        Records request, latency, byte and error metrics; providers customize
+        _synthesize() rather than overriding this.
+        
+        Args:
+            text (str): The text to convert to speech.
+            voice (Optional[str]): The voice to use for speech generation.
+        
+        Returns:
+            bytes: Audio encoded as AUDIO_FORMAT.
+        
+        Raises:
+            Exception: If the provider fails or returns no audio.
+        """
+        labels = (self.PROVIDER_NAME, self._metric_voice(voice))
+        metrics.REQUESTS.labels(*labels, "synthesize").inc()
+        start = time.perf_counter()
+        try:
+            with span("tts.synthesize", provider=self.PROVIDER_NAME, voice=labels[1], chars=len(text)) as s, \
+                    metrics.IN_FLIGHT.labels(self.PROVIDER_NAME).track_inprogress():
+                data = self._synthesize(text, voice)
+                if not data:
+                    raise Exception(f"{self.PROVIDER_NAME} returned no audio.")
+                s.set_attribute("bytes", len(data))
+        except Exception as e:
+            metrics.ERRORS.labels(*labels, type(e).__name__).inc()
+            raise
+        elapsed = time.perf_counter() - start
+        metrics.LATENCY.labels(*labels).observe(elapsed)
+        metrics.AUDIO_BYTES.labels(*labels).inc(len(data))
+        return data
+    
+    def stream_speech(self, text: str, voice: Optional[str] = None, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Convert text to speech and yield the encoded audio in chunks as it becomes available.
+        
+        Records the same metrics as synthesize() plus time to the first chunk;
+        providers customize _stream_speech() rather than overriding this.
+        
+        Args:
+            text (str): The text to convert to speech.
+            voice (Optional[str]): The voice to use for speech generation.
+            chunk_size (Optional[int]): Maximum chunk size in bytes.
+        
+        Yields:
+            bytes: Consecutive pieces of audio encoded as AUDIO_FORMAT.
+        
+        Raises:
+            Exception: If the provider fails or returns no audio.
+        """
+        labels = (self.PROVIDER_NAME, self._metric_voice(voice))
+        metrics.REQUESTS.labels(*labels, "stream").inc()
+        in_flight = metrics.IN_FLIGHT.labels(self.PROVIDER_NAME)
+        start = time.perf_counter()
+        first_chunk = True
+        size = 0
+        error = None
+        # The span is current only while the provider produces a chunk, never across a yield.
+        stream_span = start_span("tts.stream", provider=self.PROVIDER_NAME, voice=labels[1], chars=len(text))
+        chunks = self._stream_speech(text, voice, chunk_size or self.STREAM_CHUNK_SIZE)
+        in_flight.inc()
+        try:
+            while True:
+                with use_span(stream_span):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    if size == 0:
+                        raise Exception(f"{self.PROVIDER_NAME} returned no audio.")
+                    break
+                if first_chunk:
+                    metrics.TTFB.labels(*labels).observe(time.perf_counter() - start)
+                    if stream_span is not None:
+                        stream_span.set_attribute("ttfb_ms", (time.perf_counter() - start) * 1000)
+                    first_chunk = False
+                size += len(chunk)
+                yield chunk
+        except Exception as e:
+            error = e
+            metrics.ERRORS.labels(*labels, type(e).__name__).inc()
+            raise
+        finally:
+            in_flight.dec()
+            metrics.AUDIO_BYTES.labels(*labels).inc(size)
+            if stream_span is not None:
+                stream_span.set_attribute("bytes", size)
+            end_span(stream_span, error)
+        metrics.LATENCY.labels(*labels).observe(time.perf_counter() - start)
+    
+    def _synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        """
+        Produce the encoded audio for synthesize().
+        
+        The default implementation runs generate_speech() into a temporary file;
+        providers that can return audio directly override this.
+        
+        Raises:
+            Exception: If generate_speech() left no audio in the file.
+        """
+        fd, file_path = tempfile.mkstemp(suffix=f".{self.AUDIO_FORMAT}", prefix=f"{self.PROVIDER_NAME}_")
+        os.close(fd)
+        try:
+            self.generate_speech(text, voice, file_path)
+            if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+                raise Exception(f"{self.PROVIDER_NAME} wrote no audio to {file_path}.")
+            with open(file_path, "rb") as audio_file:
+                return audio_file.read()
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+    
+    def _stream_speech(self, text: str, voice: Optional[str], chunk_size: int) -> Iterator[bytes]:
+        """
+        Produce the audio chunks for stream_speech().
+        
+        The default implementation synthesizes the whole clip first; providers that
+        can produce audio incrementally override this.
+        """
+        data = self._synthesize(text, voice)
+        for offset in range(0, len(data), chunk_size):
+            yield data[offset:offset + chunk_size]
+    
+    def _write_audio(self, blocks: Iterable[bytes], file_path: str) -> int:
+        """
+        Write audio blocks to file_path as they arrive, removing the partial
+        file if producing them fails.
+        
+        Returns:
+            int: Number of bytes written.
+        """
+        size = 0
+        try:
+            with open(file_path, "wb") as audio_file:
+                for block in blocks:
+                    audio_file.write(block)
+                    size += len(block)
+        except BaseException:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        return size
+    
+    def _metric_voice(self, voice: Optional[str]) -> str:
+        """
+        Label value for the voice a request is actually synthesized with.
+        
+        Providers replace unknown voices with their default, so the label does too;
+        anything outside list_available_voices() is reported as METRIC_OTHER_VOICE.
+        Clients choose the voice, and each distinct label value is a new time series.
+        """
+        known = self.list_available_voices()
+        if voice in known:
+            return voice
+        default = getattr(self, "default_voice", None) or next(iter(known), None)
+        return default if default in known else METRIC_OTHER_VOICE
+    
     @abstractmethod
     def speak(self, text: str, voice: Optional[str] = None) -> None:
         """
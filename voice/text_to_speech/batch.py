@@ -0,0 +1,331 @@
+"""
+Resumable bulk synthesis.
+
+Run with:
+    python -m voice.text_to_speech.batch jobs.jsonl --output-dir output/catalog --concurrency 16
+
+Job files are JSONL ({"id": ..., "text": ..., "provider": ..., "voice": ...} per line)
+or CSV with an id,text,provider,voice header; provider and voice are optional.
+Every finished job is appended to manifest.jsonl in the output directory, and
+rerunning the same command skips jobs already recorded as successful.
+
+With --workers N the job list is sharded across N processes, each running its
+own providers and thread pool; workers write audio straight to the output
+directory and their manifest shards are merged into manifest.jsonl at the end.
+"""
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from core.logger import get_logger
+from voice.text_to_speech.active_provider import TTSProviderManager, tts_manager
+from voice.text_to_speech.base import detect_audio_format
+from voice.text_to_speech.scheduler import Priority
+from voice.text_to_speech.cache import hash_text
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.jsonl"
+MANIFEST_SHARD_PATTERN = "manifest.part-*.jsonl"
+
+
+def _read_jsonl(lines: Iterable[str], jobs_path: str) -> Iterator[Dict[str, Any]]:
+    """Parse JSONL rows, skipping lines that are not a JSON object instead of aborting the run."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            logger.warning(f"Skipping line {line_number} in {jobs_path}: invalid JSON ({e}).")
+            continue
+        if not isinstance(row, dict):
+            logger.warning(f"Skipping line {line_number} in {jobs_path}: expected a JSON object.")
+            continue
+        yield row
+
+
+def load_jobs(jobs_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream jobs from a JSONL or CSV file, chosen by extension.
+
+    Malformed JSONL lines and jobs without an id or text are logged and skipped.
+
+    Yields:
+        Dict[str, Any]: Job with "id", "text" and optional "provider" and "voice".
+    """
+    with open(jobs_path, "r", encoding="utf-8", newline="") as f:
+        if jobs_path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = _read_jsonl(f, jobs_path)
+        for line_number, row in enumerate(rows, start=1):
+            # An id of 0 is valid; only a missing or empty one is not.
+            if row.get("id") in (None, "") or not row.get("text"):
+                logger.warning(f"Skipping job #{line_number} in {jobs_path}: 'id' and 'text' are required.")
+                continue
+            row["id"] = str(row["id"])
+            yield row
+
+
+def load_completed_ids(manifest_path: str) -> Set[str]:
+    """
+    Return the ids of jobs recorded as successful in a manifest whose output still exists.
+    """
+    completed = set()
+    if not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Truncated last line after a crash.
+            if record.get("status") == "ok" and os.path.exists(record.get("path", "")):
+                completed.add(record["id"])
+    return completed
+
+
+def safe_filename(job_id: str) -> str:
+    """
+    Map a job id to a file name; ids that had to be altered get a hash suffix to stay unique.
+    """
+    clean = re.sub(r"[^A-Za-z0-9._-]", "_", job_id)[:200]
+    if clean != job_id:
+        clean = f"{clean}-{hash_text(job_id)[:8]}"
+    return clean
+
+
+def shard_of(job_id: str, shard_count: int) -> int:
+    """
+    Assign a job to a shard by hashing its id, so the split is stable across reruns.
+    """
+    return int(hash_text(job_id)[:8], 16) % shard_count
+
+
+def merge_manifests(output_dir: str) -> int:
+    """
+    Append every manifest shard in output_dir to the main manifest and remove the shards.
+
+    Returns:
+        int: Number of records merged.
+    """
+    merged = 0
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    shard_paths = sorted(glob.glob(os.path.join(output_dir, MANIFEST_SHARD_PATTERN)))
+    if not shard_paths:
+        return merged
+    with open(manifest_path, "a", encoding="utf-8") as manifest:
+        for shard_path in shard_paths:
+            with open(shard_path, "r", encoding="utf-8") as shard:
+                for line in shard:
+                    if line.endswith("\n"):
+                        manifest.write(line)
+                        merged += 1
+            manifest.flush()
+            os.fsync(manifest.fileno())
+            os.remove(shard_path)
+    return merged
+
+
+class BatchRunner:
+    """
+    Synthesizes a job list with bounded concurrency and a crash-safe manifest.
+
+    Audio is written to a temporary file and renamed into place before the job
+    is appended to the manifest, so a manifest entry always refers to a
+    complete file. Jobs go through the manager at batch priority, so they use
+    its pooled provider instances, cache, request coalescing and fallback
+    provider like any other caller.
+    """
+
+    def __init__(self, output_dir: str, default_provider: str = "deepgram", concurrency: int = 8,
+                 manifest_path: Optional[str] = None):
+        """
+        Initialize the runner.
+
+        Args:
+            output_dir (str): Directory receiving the audio files and the manifest.
+            default_provider (str): Provider used by jobs that do not name one.
+            concurrency (int): Number of jobs synthesized concurrently.
+            manifest_path (Optional[str]): Manifest location; defaults to output_dir/manifest.jsonl.
+        """
+        if default_provider not in TTSProviderManager.PROVIDERS:
+            available = ", ".join(TTSProviderManager.PROVIDERS.keys())
+            raise ValueError(f"Invalid provider '{default_provider}'. Available providers: {available}")
+        self.output_dir = output_dir
+        self.default_provider = default_provider
+        self.concurrency = max(1, concurrency)
+        self.manifest_path = manifest_path or os.path.join(output_dir, MANIFEST_NAME)
+
+        self._manifest_lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._manifest_lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as manifest:
+                manifest.write(line)
+
+    def run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Synthesize a single job and append its outcome to the manifest.
+
+        Returns:
+            Dict[str, Any]: The manifest record.
+        """
+        provider_name = job.get("provider") or self.default_provider
+        voice = job.get("voice") or None
+        record = {"id": job["id"], "provider": provider_name, "voice": voice, "chars": len(job["text"])}
+        started = time.perf_counter()
+        try:
+            provider = tts_manager.get_provider(provider_name)
+            data = tts_manager.synthesize(job["text"], voice, provider.PROVIDER_NAME, Priority.BATCH)
+            if not data:
+                raise Exception("no audio was produced")
+            # A fallback provider may have answered, so the extension follows the audio itself.
+            audio_format = detect_audio_format(data, provider.AUDIO_FORMAT)
+            file_path = os.path.join(self.output_dir, f"{safe_filename(job['id'])}.{audio_format}")
+            tmp_path = f"{file_path}.part"
+            with open(tmp_path, "wb") as audio_file:
+                audio_file.write(data)
+            os.replace(tmp_path, file_path)
+            record.update(status="ok", path=file_path, bytes=len(data))
+        except Exception as e:
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+            logger.warning(f"Batch job '{job['id']}' failed: {e}")
+        record["seconds"] = round(time.perf_counter() - started, 4)
+        record["finished_at"] = time.time()
+        self._record(record)
+        return record
+
+    def run(self, jobs: Iterable[Dict[str, Any]], resume: bool = True) -> Dict[str, Any]:
+        """
+        Run all jobs, keeping at most twice the concurrency queued at a time.
+
+        Args:
+            jobs (Iterable[Dict[str, Any]]): Jobs, e.g. from load_jobs().
+            resume (bool): Skip jobs already recorded as successful in the manifest.
+
+        Returns:
+            Dict[str, Any]: Summary with counts and elapsed time.
+        """
+        completed = load_completed_ids(self.manifest_path) if resume else set()
+        summary = {"ok": 0, "error": 0, "skipped": 0}
+        started = time.perf_counter()
+        in_flight = set()
+
+        def collect(done) -> None:
+            for future in done:
+                summary[future.result()["status"]] += 1
+                finished = summary["ok"] + summary["error"]
+                if finished % 100 == 0:
+                    logger.info(f"Batch progress: {finished} done, {summary['error']} failed, {summary['skipped']} skipped.")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="TTSBatch") as executor:
+            for job in jobs:
+                if job["id"] in completed:
+                    summary["skipped"] += 1
+                    continue
+                if len(in_flight) >= self.concurrency * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(executor.submit(self.run_job, job))
+            done, _ = wait(in_flight)
+            collect(done)
+
+        summary["seconds"] = round(time.perf_counter() - started, 2)
+        logger.info(
+            f"Batch finished in {summary['seconds']}s: {summary['ok']} ok, "
+            f"{summary['error']} failed, {summary['skipped']} skipped (already done)."
+        )
+        return summary
+
+
+def _run_shard(jobs_path: str, shard_index: int, shard_count: int, output_dir: str,
+               default_provider: str, concurrency: int, resume: bool) -> Dict[str, Any]:
+    """Entry point of a worker process: run the jobs that hash to shard_index."""
+    completed = load_completed_ids(os.path.join(output_dir, MANIFEST_NAME)) if resume else set()
+    manifest_path = os.path.join(output_dir, MANIFEST_SHARD_PATTERN.replace("*", str(shard_index)))
+    runner = BatchRunner(output_dir, default_provider, concurrency, manifest_path=manifest_path)
+    jobs = (job for job in load_jobs(jobs_path)
+            if job["id"] not in completed and shard_of(job["id"], shard_count) == shard_index)
+    summary = runner.run(jobs, resume=resume)
+    summary["skipped"] = sum(1 for job_id in completed if shard_of(job_id, shard_count) == shard_index)
+    return summary
+
+
+def run_sharded(jobs_path: str, output_dir: str, default_provider: str = "deepgram", concurrency: int = 8,
+                workers: Optional[int] = None, resume: bool = True) -> Dict[str, Any]:
+    """
+    Run a job file across several worker processes.
+
+    Every worker parses the job file itself and keeps the jobs whose id hashes
+    to its shard, so no job data crosses process boundaries. Audio is written
+    directly to output_dir; only small summaries come back to the parent.
+
+    Args:
+        jobs_path (str): Path to a .jsonl or .csv job file.
+        output_dir (str): Directory receiving the audio files and the manifest.
+        default_provider (str): Provider used by jobs that do not name one.
+        concurrency (int): Concurrent jobs per worker process.
+        workers (Optional[int]): Number of processes; defaults to the CPU count.
+        resume (bool): Skip jobs already recorded as successful in the manifest.
+
+    Returns:
+        Dict[str, Any]: Combined summary of all shards.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    # Fold in shards left behind by an interrupted run so they count as completed.
+    merge_manifests(output_dir)
+
+    started = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [
+            executor.submit(_run_shard, jobs_path, index, workers, output_dir, default_provider, concurrency, resume)
+            for index in range(workers)
+        ]
+        shard_summaries: List[Dict[str, Any]] = []
+        try:
+            shard_summaries = [future.result() for future in futures]
+        finally:
+            merged = merge_manifests(output_dir)
+
+    summary = {key: sum(shard[key] for shard in shard_summaries) for key in ("ok", "error", "skipped")}
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    summary["workers"] = workers
+    logger.info(f"Sharded batch finished in {summary['seconds']}s across {workers} workers; merged {merged} manifest records.")
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthesize a JSONL/CSV job file in bulk.")
+    parser.add_argument("jobs", help="Path to a .jsonl or .csv job file")
+    parser.add_argument("--output-dir", default="output/batch")
+    parser.add_argument("--provider", default="deepgram", help="Provider for jobs without one")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent jobs per process")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = one per CPU core)")
+    parser.add_argument("--no-resume", action="store_true", help="Re-synthesize jobs already in the manifest")
+    args = parser.parse_args()
+
+    if args.workers == 1:
+        runner = BatchRunner(args.output_dir, args.provider, args.concurrency)
+        summary = runner.run(load_jobs(args.jobs), resume=not args.no_resume)
+    else:
+        summary = run_sharded(args.jobs, args.output_dir, args.provider, args.concurrency,
+                              args.workers or None, resume=not args.no_resume)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Portable synthesis-cache bundles.
+
+A bundle is an uncompressed tar archive (the audio is already compressed):
+
+    objects/<sha256>   audio of one or more entries, named by the SHA-256 of its bytes
+    manifest.json      {"version": 1, "entries": [{"key", "object", "size",
+                        "provider", "voice", "text_sha256", "format"}, ...]}
+
+Keys are the runtime cache keys from make_cache_key, so entries imported on
+another node are hits straight away. Identical audio is stored once.
+
+Entries a TranscodingCache re-encoded are exported as stored, with their
+stored_format, stored_bitrate, source_bytes and stored_bytes. Importing them
+into a TranscodingCache keeps them compact; importing them into a plain
+cache decodes them back to their original format first (needs ffmpeg).
+
+Render on one node, share the file, warm-start the others:
+    python -m voice.text_to_speech.bundle export catalog.tar --provider deepgram
+    python -m voice.text_to_speech.bundle export catalog.tar --cache-codec opus   # cache of a --cache-codec server
+    python -m voice.text_to_speech.bundle import catalog.tar
+    python -m voice.text_to_speech.bundle info catalog.tar
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from core.logger import get_logger
+from voice.audio.codec import AudioCodecError, transcode_bytes
+from voice.text_to_speech.cache import SynthesisCache
+from voice.text_to_speech.packed_cache import PackedSynthesisCache
+from voice.text_to_speech.transcoding_cache import DEFAULT_BITRATE, TranscodingCache
+
+logger = get_logger(__name__)
+
+BUNDLE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+METADATA_FIELDS = ("provider", "voice", "text_sha256", "format")
+# Written by TranscodingCache for re-encoded entries; only present on those.
+STORED_FIELDS = ("stored_format", "stored_bitrate", "source_bytes", "stored_bytes")
+_HEX_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+class CacheBundleError(Exception):
+    """Exception raised when a bundle is malformed or does not match its manifest."""
+    pass
+
+
+def _add_member(archive: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    archive.addfile(info, io.BytesIO(data))
+
+
+def _entry_metadata(source: Dict[str, Any]) -> Dict[str, Any]:
+    metadata = {field: source.get(field) for field in METADATA_FIELDS}
+    metadata.update({field: source[field] for field in STORED_FIELDS if source.get(field) is not None})
+    return metadata
+
+
+def export_bundle(cache, bundle_path: str, providers: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Write the entries of a cache to a bundle file.
+
+    The archive is written to a temporary file and moved into place, so an
+    interrupted export never leaves a truncated bundle behind.
+
+    Args:
+        cache (SynthesisCache | PackedSynthesisCache | TranscodingCache): Cache to export.
+        bundle_path (str): Destination path of the bundle.
+        providers (Optional[Iterable[str]]): Only export entries of these providers.
+
+    Returns:
+        Dict[str, int]: Number of entries, distinct audio objects and audio bytes written.
+    """
+    providers = set(providers) if providers else None
+    # Re-encoded entries are exported as stored, matching the stored_* fields of their metadata.
+    if isinstance(cache, TranscodingCache):
+        cache = cache.cache
+    entries: List[Dict[str, Any]] = []
+    objects = set()
+    written = 0
+    directory = os.path.dirname(os.path.abspath(bundle_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f, tarfile.open(fileobj=f, mode="w") as archive:
+            for key in cache.keys():
+                metadata = cache.get_metadata(key) or {}
+                if providers is not None and metadata.get("provider") not in providers:
+                    continue
+                data = cache.get(key)
+                if data is None:
+                    continue
+                digest = hashlib.sha256(data).hexdigest()
+                if digest not in objects:
+                    _add_member(archive, f"objects/{digest}", data)
+                    objects.add(digest)
+                    written += len(data)
+                entries.append({"key": key, "object": digest, "size": len(data), **_entry_metadata(metadata)})
+            manifest = {"version": BUNDLE_VERSION, "created": time.time(), "entries": entries}
+            _add_member(archive, MANIFEST_NAME, json.dumps(manifest).encode("utf-8"))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, bundle_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info(f"Exported {len(entries)} cache entries ({len(objects)} objects, {written} bytes) to {bundle_path}")
+    return {"entries": len(entries), "objects": len(objects), "bytes": written}
+
+
+def read_manifest(bundle_path: str) -> Dict[str, Any]:
+    """
+    Read and validate the manifest of a bundle.
+
+    Raises:
+        CacheBundleError: If the archive has no valid manifest.
+    """
+    try:
+        with tarfile.open(bundle_path, mode="r") as archive:
+            return _load_manifest(archive)
+    except tarfile.TarError as e:
+        raise CacheBundleError(f"Not a cache bundle: {bundle_path}: {e}") from e
+
+
+def _load_manifest(archive: tarfile.TarFile) -> Dict[str, Any]:
+    try:
+        manifest = json.loads(archive.extractfile(MANIFEST_NAME).read().decode("utf-8"))
+    except (KeyError, AttributeError, ValueError) as e:
+        raise CacheBundleError(f"Bundle has no readable {MANIFEST_NAME}: {e}") from e
+    if manifest.get("version") != BUNDLE_VERSION:
+        raise CacheBundleError(f"Unsupported bundle version: {manifest.get('version')}")
+    for entry in manifest.get("entries", []):
+        if not _HEX_DIGEST.match(str(entry.get("key"))) or not _HEX_DIGEST.match(str(entry.get("object"))):
+            raise CacheBundleError(f"Malformed manifest entry: {entry}")
+    return manifest
+
+
+def _read_object(archive: tarfile.TarFile, digest: str) -> bytes:
+    try:
+        data = archive.extractfile(f"objects/{digest}").read()
+    except (KeyError, AttributeError) as e:
+        raise CacheBundleError(f"Bundle is missing object {digest}") from e
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise CacheBundleError(f"Object {digest} does not match its hash")
+    return data
+
+
+def import_bundle(cache, bundle_path: str, overwrite: bool = False) -> Dict[str, int]:
+    """
+    Merge a bundle into a cache.
+
+    Every object the merge needs is checked against its hash before the first
+    entry is written, so a corrupt or truncated bundle leaves the cache
+    untouched. Each entry is then stored with the cache's own atomic put.
+    Re-encoded entries are kept as they are in a TranscodingCache and decoded
+    to their original format, before anything is written, for any other cache.
+
+    Args:
+        cache (SynthesisCache | PackedSynthesisCache | TranscodingCache): Cache to merge into.
+        bundle_path (str): Bundle to import.
+        overwrite (bool): Replace entries the cache already has instead of skipping them.
+
+    Returns:
+        Dict[str, int]: Number of entries imported and skipped as duplicates.
+
+    Raises:
+        CacheBundleError: If the bundle is malformed or re-encoded entries can't be decoded;
+                          nothing has been imported then.
+    """
+    keep_stored = isinstance(cache, TranscodingCache)
+    try:
+        with tarfile.open(bundle_path, mode="r") as archive:
+            manifest = _load_manifest(archive)
+            entries = [entry for entry in manifest["entries"] if overwrite or entry["key"] not in cache]
+            decoded: Dict[tuple, bytes] = {}
+            for digest in {entry["object"] for entry in entries}:
+                _read_object(archive, digest)
+            for entry in entries:
+                target = (entry["object"], entry.get("format") or "mp3")
+                if keep_stored or not entry.get("stored_format") or target in decoded:
+                    continue
+                try:
+                    decoded[target] = transcode_bytes(_read_object(archive, entry["object"]), target[1])
+                except AudioCodecError as e:
+                    raise CacheBundleError(f"Could not decode re-encoded entry {entry['key'][:12]}: {e}") from e
+
+            for entry in entries:
+                metadata = _entry_metadata(entry)
+                data = decoded.get((entry["object"], entry.get("format") or "mp3"))
+                if data is None or not metadata.get("stored_format"):
+                    data = _read_object(archive, entry["object"])
+                else:
+                    for field in STORED_FIELDS:
+                        metadata.pop(field, None)
+                cache.put(entry["key"], data, metadata)
+    except tarfile.TarError as e:
+        raise CacheBundleError(f"Not a cache bundle: {bundle_path}: {e}") from e
+    skipped = len(manifest["entries"]) - len(entries)
+    logger.info(f"Imported {len(entries)} cache entries from {bundle_path} ({skipped} already cached)")
+    return {"imported": len(entries), "skipped": skipped}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export or import synthesis-cache bundles.")
+    parser.add_argument("command", choices=("export", "import", "info"))
+    parser.add_argument("bundle", help="Path of the bundle file")
+    parser.add_argument("--cache-dir", default=None, help="Synthesis cache directory (default: the backend's default)")
+    parser.add_argument("--cache-backend", choices=("files", "packed"), default="files")
+    parser.add_argument("--cache-codec", choices=("opus", "mp3"), default=None,
+                        help="The cache is re-encoded to this codec, as with the server's --cache-codec")
+    parser.add_argument("--cache-bitrate", default=DEFAULT_BITRATE, help="Bitrate of re-encoded cached clips")
+    parser.add_argument("--provider", action="append", help="Only export this provider's entries (repeatable)")
+    parser.add_argument("--overwrite", action="store_true", help="Replace entries that are already cached on import")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        entries = read_manifest(args.bundle)["entries"]
+        providers: Dict[str, int] = {}
+        for entry in entries:
+            providers[entry.get("provider")] = providers.get(entry.get("provider"), 0) + 1
+        sizes = {entry["object"]: entry["size"] for entry in entries}
+        print(json.dumps({"entries": len(entries), "objects": len(sizes), "bytes": sum(sizes.values()),
+                          "providers": providers}))
+        return
+
+    if args.cache_backend == "packed":
+        readonly = True if args.command == "export" else False
+        cache = PackedSynthesisCache(args.cache_dir, readonly=readonly) if args.cache_dir \
+            else PackedSynthesisCache(readonly=readonly)
+    else:
+        cache = SynthesisCache(args.cache_dir) if args.cache_dir else SynthesisCache()
+    if args.cache_codec:
+        cache = TranscodingCache(cache, codec=args.cache_codec, bitrate=args.cache_bitrate)
+    try:
+        if args.command == "export":
+            summary = export_bundle(cache, args.bundle, args.provider)
+        else:
+            summary = import_bundle(cache, args.bundle, args.overwrite)
+    finally:
+        if hasattr(cache, "close"):
+            cache.close()
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterator, Optional
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "tts"))
+
+
+def hash_text(text: str) -> str:
+    """Return the SHA-256 hex digest of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_cache_key(provider_name: str, voice: Optional[str], text: str) -> str:
+    """
+    Build the cache key for a synthesis request.
+
+    Args:
+        provider_name (str): PROVIDER_NAME of the provider.
+        voice (Optional[str]): Resolved voice identifier.
+        text (str): Text being synthesized.
+
+    Returns:
+        str: Hex digest identifying the (provider, voice, text) triple.
+    """
+    return hashlib.sha256(f"{provider_name}\x00{voice or ''}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class SynthesisCache:
+    """
+    File-backed cache of synthesized audio.
+
+    Every entry is stored as "<key>.audio" with a "<key>.json" sidecar holding
+    the provider, voice, text hash and audio format. Writes go through a
+    temporary file and os.replace, so readers never see partial entries.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Directory holding the cache entries.
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _audio_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.audio")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._audio_path(key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return the cached audio for key, or None on a miss.
+        """
+        try:
+            with open(self._audio_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def get_view(self, key: str) -> Optional[memoryview]:
+        """
+        Return the cached audio for key as a memoryview, or None on a miss.
+        """
+        data = self.get(key)
+        return None if data is None else memoryview(data)
+
+    def get_metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the metadata stored alongside key, or None if the entry does not exist.
+        """
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store audio under key.
+
+        Args:
+            key (str): Cache key from make_cache_key.
+            data (bytes): Encoded audio.
+            metadata (Optional[Dict[str, Any]]): Provider, voice, text_sha256 and format of the entry.
+        """
+        self._atomic_write(self._meta_path(key), json.dumps(metadata or {}).encode("utf-8"))
+        self._atomic_write(self._audio_path(key), data)
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry if present.
+        """
+        for path in (self._audio_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def keys(self) -> Iterator[str]:
+        """
+        Iterate over the keys of all complete entries.
+        """
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".audio"):
+                yield name[:-len(".audio")]
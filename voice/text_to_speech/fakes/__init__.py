@@ -0,0 +1,6 @@
+# jarvis/voice/text_to_speech/fakes/__init__.py
+# Local stand-ins for the TTS provider APIs, for offline tests and benchmarks
+from .backend import FakeTTSBackend, FaultConfig
+from .runner import FakeTTSServer, fake_provider_kwargs
+
+__all__ = ["FakeTTSBackend", "FaultConfig", "FakeTTSServer", "fake_provider_kwargs"]
@@ -0,0 +1,3 @@
+from voice.text_to_speech.fakes.backend import main
+
+main()
@@ -0,0 +1,343 @@
+"""
+Local fake backends for every TTS provider API.
+
+Run with:
+    python -m voice.text_to_speech.fakes --port 8799 --latency-ms 50 --payload-kb 64
+
+A single aiohttp app serves every provider under its own prefix, which is the
+base_url to hand to that provider (e.g. DeepgramTTSProvider(base_url=f"{root}/deepgram")):
+    POST /deepgram/api/ttsAudioGeneration          {"text", "model"}        -> {"data": <base64>}
+    POST /speechify/generateAudioFiles             {"paragraphChunks", ...} -> {"audioStream": <base64>}
+    POST /gesserit/api/tiktok-tts                  {"text", "voice"}        -> {"base64": <base64>}
+    POST /weilbyte/api/generation                  {"text", "voice"}        -> {"data": <base64>}
+    POST /hearling/accounts                        {"email", "password"}    -> {"token": ...}
+    POST /hearling/clips     (Bearer token)        {"text", "voice"}        -> {"clip": {"location": <url>}}
+    GET  /hearling/download/{clip_id}                                       -> raw audio
+    GET  /edge/consumer/speech/synthesize/readaloud/edge/v1                 Edge read-aloud WebSocket
+
+Requests that do not match the real API's schema get a 400. Faults are
+injected per endpoint, either at random (FaultConfig rates, seeded) or from a
+script of outcomes consumed in order, so retry and hedging logic can be
+exercised deterministically:
+    ok          normal response
+    error       500 with a JSON error body
+    rate_limit  429 with a Retry-After header
+    slow        normal response after an extra slow_ms
+    malformed   200 with a body that is not valid JSON
+    truncated   connection dropped halfway through the body
+
+Control endpoints:
+    POST /_fake/faults   {"error_rate": ..., "script": {"deepgram": ["rate_limit", "ok"]}, ...}
+    GET  /_fake/stats    request and outcome counters per endpoint
+    POST /_fake/reset    clear counters and scripts
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional
+
+from aiohttp import WSMsgType, web
+
+EDGE_PATH = "/edge/consumer/speech/synthesize/readaloud/edge/v1"
+EDGE_FRAME_BYTES = 4096
+
+OUTCOMES = ("ok", "error", "rate_limit", "slow", "malformed", "truncated")
+
+
+class FaultConfig:
+    """
+    Probabilities of each injected fault, applied independently per request.
+    """
+
+    def __init__(self, error_rate: float = 0.0, rate_limit_rate: float = 0.0, slow_rate: float = 0.0,
+                 malformed_rate: float = 0.0, truncated_rate: float = 0.0, slow_ms: float = 2000.0,
+                 retry_after: int = 1):
+        """
+        Initialize the fault configuration.
+
+        Args:
+            error_rate (float): Fraction of requests answered with a 500.
+            rate_limit_rate (float): Fraction of requests answered with a 429.
+            slow_rate (float): Fraction of requests delayed by an extra slow_ms.
+            malformed_rate (float): Fraction of requests answered with invalid JSON.
+            truncated_rate (float): Fraction of responses cut off halfway.
+            slow_ms (float): Extra delay of a slow response.
+            retry_after (int): Retry-After value, in seconds, sent with a 429.
+        """
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.slow_rate = slow_rate
+        self.malformed_rate = malformed_rate
+        self.truncated_rate = truncated_rate
+        self.slow_ms = slow_ms
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FaultConfig":
+        fields = ("error_rate", "rate_limit_rate", "slow_rate", "malformed_rate", "truncated_rate",
+                  "slow_ms", "retry_after")
+        return cls(**{key: data[key] for key in fields if key in data})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+class FakeTTSBackend:
+    """
+    Reproduces the request and response schemas of every supported TTS backend,
+    with configurable latency, payload size and fault injection.
+    """
+
+    def __init__(self, latency_ms: float = 50.0, payload_kb: int = 64, chunk_kb: int = 16,
+                 chunk_delay_ms: float = 0.0, faults: Optional[FaultConfig] = None, seed: int = 0):
+        """
+        Initialize the backend.
+
+        Args:
+            latency_ms (float): Delay before the first byte of every synthesis response.
+            payload_kb (int): Size of the generated audio in KiB.
+            chunk_kb (int): Size of each body chunk written to the socket.
+            chunk_delay_ms (float): Delay between body chunks, to emulate limited bandwidth.
+            faults (Optional[FaultConfig]): Random fault rates; no faults by default.
+            seed (int): Seed for the generated audio and the fault draws.
+        """
+        self.latency = latency_ms / 1000.0
+        self.chunk_size = max(1, chunk_kb) * 1024
+        self.chunk_delay = chunk_delay_ms / 1000.0
+        self.faults = faults or FaultConfig()
+        self._seed = seed
+        self._rng = random.Random(seed)
+        self._scripts: Dict[str, Deque[str]] = {}
+        self.requests: Dict[str, int] = {}
+        self.outcomes: Dict[str, Dict[str, int]] = {}
+        self.set_payload_size(payload_kb)
+
+    def set_payload_size(self, payload_kb: int) -> None:
+        """
+        Change the size of the generated audio.
+        """
+        # An MPEG frame sync header followed by noise: opaque to every provider, like real mp3 data.
+        rng = random.Random(self._seed)
+        self.audio = b"\xff\xfb\x90\x64" + rng.randbytes(max(0, payload_kb * 1024 - 4))
+        self._encoded = base64.b64encode(self.audio).decode("ascii")
+
+    def script(self, endpoint: str, outcomes: Iterable[str]) -> None:
+        """
+        Queue outcomes for the next requests to an endpoint, ahead of the random faults.
+
+        Args:
+            endpoint (str): One of deepgram, speechify, gesserit, weilbyte, hearling_accounts,
+                            hearling_clips, hearling_download or edge.
+            outcomes (Iterable[str]): Outcomes from OUTCOMES, consumed one per request.
+        """
+        outcomes = list(outcomes)
+        unknown = [outcome for outcome in outcomes if outcome not in OUTCOMES]
+        if unknown:
+            raise ValueError(f"Unknown outcomes {unknown}. Expected one of: {', '.join(OUTCOMES)}")
+        self._scripts.setdefault(endpoint, deque()).extend(outcomes)
+
+    def reset(self) -> None:
+        """
+        Clear counters and pending scripts.
+        """
+        self._scripts.clear()
+        self.requests.clear()
+        self.outcomes.clear()
+        self._rng = random.Random(self._seed)
+
+    def _next_outcome(self, endpoint: str) -> str:
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        script = self._scripts.get(endpoint)
+        if script:
+            outcome = script.popleft()
+        else:
+            outcome = "ok"
+            for name, rate in (("rate_limit", self.faults.rate_limit_rate), ("error", self.faults.error_rate),
+                               ("malformed", self.faults.malformed_rate), ("truncated", self.faults.truncated_rate),
+                               ("slow", self.faults.slow_rate)):
+                if rate and self._rng.random() < rate:
+                    outcome = name
+                    break
+        counts = self.outcomes.setdefault(endpoint, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+        return outcome
+
+    async def _respond(self, request: web.Request, endpoint: str, make_body, content_type: str) -> web.StreamResponse:
+        outcome = self._next_outcome(endpoint)
+        await asyncio.sleep(self.latency + (self.faults.slow_ms / 1000.0 if outcome == "slow" else 0.0))
+        if outcome == "rate_limit":
+            return web.json_response({"error": "Too Many Requests"}, status=429,
+                                     headers={"Retry-After": str(self.faults.retry_after)})
+        if outcome == "error":
+            return web.json_response({"error": "Internal Server Error"}, status=500)
+        body = b'{"error": "unterminated' if outcome == "malformed" else make_body()
+
+        response = web.StreamResponse(headers={"Content-Type": content_type})
+        response.content_length = len(body)
+        await response.prepare(request)
+        end = len(body) // 2 if outcome == "truncated" else len(body)
+        for offset in range(0, end, self.chunk_size):
+            if offset and self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            await response.write(body[offset:min(offset + self.chunk_size, end)])
+        if outcome == "truncated":
+            request.transport.close()
+            return response
+        await response.write_eof()
+        return response
+
+    async def _json_payload(self, request: web.Request, required: Iterable[str]) -> Dict[str, Any]:
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text=json.dumps({"error": "Body is not valid JSON"}), content_type="application/json")
+        missing = [key for key in required if not isinstance(payload, dict) or not payload.get(key)]
+        if missing:
+            raise web.HTTPBadRequest(text=json.dumps({"error": f"Missing fields: {', '.join(missing)}"}),
+                                     content_type="application/json")
+        return payload
+
+    def _json_audio(self, key: str):
+        return lambda: json.dumps({key: self._encoded}).encode("utf-8")
+
+    async def handle_deepgram(self, request: web.Request) -> web.StreamResponse:
+        await self._json_payload(request, ("text", "model"))
+        return await self._respond(request, "deepgram", self._json_audio("data"), "application/json")
+
+    async def handle_speechify(self, request: web.Request) -> web.StreamResponse:
+        payload = await self._json_payload(request, ("paragraphChunks", "voiceParams"))
+        if not payload["voiceParams"].get("name"):
+            raise web.HTTPBadRequest(text=json.dumps({"error": "Missing voiceParams.name"}), content_type="application/json")
+        return await self._respond(request, "speechify", self._json_audio("audioStream"), "application/json")
+
+    async def handle_gesserit(self, request: web.Request) -> web.StreamResponse:
+        await self._json_payload(request, ("text", "voice"))
+        return await self._respond(request, "gesserit", self._json_audio("base64"), "application/json")
+
+    async def handle_weilbyte(self, request: web.Request) -> web.StreamResponse:
+        await self._json_payload(request, ("text", "voice"))
+        return await self._respond(request, "weilbyte", self._json_audio("data"), "application/json")
+
+    async def handle_hearling_accounts(self, request: web.Request) -> web.StreamResponse:
+        await self._json_payload(request, ("email", "password"))
+        token = uuid.uuid4().hex
+        return await self._respond(request, "hearling_accounts",
+                                   lambda: json.dumps({"token": token}).encode("utf-8"), "application/json")
+
+    async def handle_hearling_clips(self, request: web.Request) -> web.StreamResponse:
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            raise web.HTTPUnauthorized(text=json.dumps({"error": "Missing bearer token"}), content_type="application/json")
+        await self._json_payload(request, ("text", "voice"))
+        location = str(request.url.with_path(f"/hearling/download/{uuid.uuid4().hex}").with_query(None))
+        return await self._respond(request, "hearling_clips",
+                                   lambda: json.dumps({"clip": {"location": location}}).encode("utf-8"),
+                                   "application/json")
+
+    async def handle_hearling_download(self, request: web.Request) -> web.StreamResponse:
+        return await self._respond(request, "hearling_download", lambda: self.audio, "audio/mpeg")
+
+    async def handle_edge(self, request: web.Request) -> web.WebSocketResponse:
+        """
+        Speak the subset of the Edge read-aloud protocol the edge-tts client uses:
+        a speech.config and an ssml text message in, then turn.start, binary
+        "Path:audio" frames and turn.end out. Errors and 429s are sent as HTTP
+        responses to the WebSocket upgrade, as the real service does.
+        """
+        outcome = self._next_outcome("edge")
+        await asyncio.sleep(self.faults.slow_ms / 1000.0 if outcome == "slow" else 0.0)
+        if outcome == "rate_limit":
+            return web.Response(status=429, headers={"Retry-After": str(self.faults.retry_after)})
+        if outcome in ("error", "malformed"):
+            return web.Response(status=500)
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            if message.type != WSMsgType.TEXT or "Path:ssml" not in message.data:
+                continue
+            request_id = message.data.split("X-RequestId:", 1)[-1].split("\r\n", 1)[0]
+            prefix = f"X-RequestId:{request_id}\r\n"
+            await asyncio.sleep(self.latency)
+            await ws.send_str(f"{prefix}Content-Type:application/json; charset=utf-8\r\nPath:turn.start\r\n\r\n{{}}")
+            header = f"{prefix}Content-Type:audio/mpeg\r\nPath:audio".encode("ascii")
+            end = len(self.audio) // 2 if outcome == "truncated" else len(self.audio)
+            for offset in range(0, end, EDGE_FRAME_BYTES):
+                if offset and self.chunk_delay:
+                    await asyncio.sleep(self.chunk_delay * EDGE_FRAME_BYTES / self.chunk_size)
+                frame = self.audio[offset:min(offset + EDGE_FRAME_BYTES, end)]
+                await ws.send_bytes(len(header).to_bytes(2, "big") + header + b"\r\n" + frame)
+            if outcome == "truncated":
+                await ws.close()
+                break
+            await ws.send_str(f"{prefix}Content-Type:application/json; charset=utf-8\r\nPath:turn.end\r\n\r\n{{}}")
+        return ws
+
+    async def handle_set_faults(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        self.faults = FaultConfig.from_dict(data)
+        if "payload_kb" in data:
+            self.set_payload_size(int(data["payload_kb"]))
+        if "latency_ms" in data:
+            self.latency = float(data["latency_ms"]) / 1000.0
+        try:
+            for endpoint, outcomes in data.get("script", {}).items():
+                self.script(endpoint, outcomes)
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=str(e))
+        return web.json_response(self.faults.to_dict())
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self.requests, "outcomes": self.outcomes,
+                                  "faults": self.faults.to_dict()})
+
+    async def handle_reset(self, request: web.Request) -> web.Response:
+        self.reset()
+        return web.json_response({"status": "reset"})
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/deepgram/api/ttsAudioGeneration", self.handle_deepgram)
+        app.router.add_post("/speechify/generateAudioFiles", self.handle_speechify)
+        app.router.add_post("/gesserit/api/tiktok-tts", self.handle_gesserit)
+        app.router.add_post("/weilbyte/api/generation", self.handle_weilbyte)
+        app.router.add_post("/hearling/accounts", self.handle_hearling_accounts)
+        app.router.add_post("/hearling/clips", self.handle_hearling_clips)
+        app.router.add_get("/hearling/download/{clip_id}", self.handle_hearling_download)
+        app.router.add_get(EDGE_PATH, self.handle_edge)
+        app.router.add_post("/_fake/faults", self.handle_set_faults)
+        app.router.add_get("/_fake/stats", self.handle_stats)
+        app.router.add_post("/_fake/reset", self.handle_reset)
+        app.router.add_get("/health", self.handle_health)
+        return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve local fakes of the TTS provider backends.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Delay before the first response byte")
+    parser.add_argument("--payload-kb", type=int, default=64, help="Audio size per response in KiB")
+    parser.add_argument("--chunk-kb", type=int, default=16, help="Body chunk size in KiB")
+    parser.add_argument("--chunk-delay-ms", type=float, default=0.0, help="Delay between body chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests failing with 429")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=2000.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    faults = FaultConfig(error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                         slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+    backend = FakeTTSBackend(args.latency_ms, args.payload_kb, args.chunk_kb, args.chunk_delay_ms, faults, args.seed)
+    web.run_app(backend.create_app(), host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Minimal stand-in for the edge-tts command-line client.
+
+Accepts the arguments EdgeTTSProvider passes to edge-tts and speaks the same
+WebSocket protocol, but connects to --endpoint (the fake backend) instead of
+the Microsoft service. Use FakeTTSServer.edge_executable() to build the
+command for EdgeTTSProvider(executable=...).
+"""
+import argparse
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import aiohttp
+
+
+def _headers_and_data(message: bytes, header_length: int):
+    headers = dict(line.split(b":", 1) for line in message[:header_length].split(b"\r\n"))
+    return headers, message[header_length + 2:]
+
+
+async def synthesize(url: str, text: str, voice: str) -> bytes:
+    request_id = uuid.uuid4().hex
+    timestamp = datetime.now(timezone.utc).strftime("%a %b %d %Y %H:%M:%S GMT+0000")
+    ssml = (
+        "<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xml:lang='en-US'>"
+        f"<voice name='{voice}'>{text}</voice></speak>"
+    )
+    audio = bytearray()
+    finished = False
+    async with aiohttp.ClientSession() as session, session.ws_connect(url) as ws:
+        await ws.send_str(
+            f"X-Timestamp:{timestamp}\r\nContent-Type:application/json; charset=utf-8\r\n"
+            "Path:speech.config\r\n\r\n"
+            '{"context":{"synthesis":{"audio":{"outputFormat":"audio-24khz-48kbitrate-mono-mp3"}}}}\r\n'
+        )
+        await ws.send_str(
+            f"X-RequestId:{request_id}\r\nContent-Type:application/ssml+xml\r\n"
+            f"X-Timestamp:{timestamp}Z\r\nPath:ssml\r\n\r\n{ssml}"
+        )
+        async for message in ws:
+            if message.type == aiohttp.WSMsgType.TEXT:
+                if "Path:turn.end" in message.data:
+                    finished = True
+                    break
+            elif message.type == aiohttp.WSMsgType.BINARY:
+                header_length = int.from_bytes(message.data[:2], "big")
+                headers, data = _headers_and_data(message.data[2:], header_length)
+                if headers.get(b"Path") == b"audio":
+                    audio.extend(data)
+            else:
+                raise RuntimeError(f"Unexpected WebSocket message: {message.type}")
+    if not finished or not audio:
+        raise RuntimeError("Connection closed before the turn ended")
+    return bytes(audio)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="edge-tts stand-in that talks to the fake backend.")
+    parser.add_argument("--endpoint", required=True, help="WebSocket URL of the fake Edge endpoint")
+    parser.add_argument("--voice", default="en-US-JennyNeural")
+    parser.add_argument("--text", required=True)
+    parser.add_argument("--write-media", required=True)
+    parser.add_argument("--write-subtitles", default=None)
+    args = parser.parse_args()
+
+    audio = asyncio.run(synthesize(args.endpoint, args.text, args.voice))
+    with open(args.write_media, "wb") as f:
+        f.write(audio)
+    if args.write_subtitles:
+        with open(args.write_subtitles, "w", encoding="utf-8") as f:
+            f.write("")
+
+
+if __name__ == "__main__":
+    main()
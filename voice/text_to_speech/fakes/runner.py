@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+from voice.text_to_speech.fakes.backend import EDGE_PATH, FakeTTSBackend
+
+EDGE_CLIENT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "edge_client.py")
+
+
+def fake_provider_kwargs(base_url: str, provider_name: str, variant: str = "gesserit") -> Dict[str, Any]:
+    """
+    Constructor arguments that point a provider at a fake backend served at base_url.
+
+    Args:
+        base_url (str): Root URL of the fake backend, e.g. http://127.0.0.1:8799.
+        provider_name (str): Key in TTSProviderManager.PROVIDERS.
+        variant (str): TikTok API variant.
+    """
+    if provider_name == "edge_tts":
+        endpoint = "ws" + base_url[len("http"):] + EDGE_PATH
+        return {"executable": f'"{sys.executable}" "{EDGE_CLIENT}" --endpoint "{endpoint}"'}
+    if provider_name == "tiktok":
+        return {"variant": variant, "base_url": f"{base_url}/{variant}"}
+    return {"base_url": f"{base_url}/{provider_name}"}
+
+
+class FakeTTSServer:
+    """
+    Runs a FakeTTSBackend on a background event loop, for tests and benchmarks.
+
+    Usage:
+        with FakeTTSServer(FakeTTSBackend(latency_ms=0)) as fake:
+            fake.backend.script("deepgram", ["rate_limit", "ok"])
+            provider = DeepgramTTSProvider(**fake.provider_kwargs("deepgram"))
+    """
+
+    def __init__(self, backend: Optional[FakeTTSBackend] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server.
+
+        Args:
+            backend (Optional[FakeTTSBackend]): Backend to serve; a default one if None.
+            host (str): Interface to bind.
+            port (int): Port to bind; 0 picks a free one.
+        """
+        self.backend = backend or FakeTTSBackend()
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def url(self, prefix: str) -> str:
+        """
+        Base URL of one fake API, e.g. url("deepgram") or url("gesserit").
+        """
+        return f"{self.base_url}/{prefix}"
+
+    def provider_kwargs(self, provider_name: str, variant: str = "gesserit") -> Dict[str, Any]:
+        """
+        Constructor arguments that point a provider at this server; see fake_provider_kwargs.
+        """
+        return fake_provider_kwargs(self.base_url, provider_name, variant)
+
+    def start(self) -> "FakeTTSServer":
+        """
+        Start serving and block until the socket is bound.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="FakeTTSServer", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._serve(), self._loop).result()
+        return self
+
+    async def _serve(self) -> None:
+        self._runner = web.AppRunner(self.backend.create_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def stop(self) -> None:
+        """
+        Stop serving and shut down the background loop.
+        """
+        if self._loop is None:
+            return
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self) -> "FakeTTSServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
@@ -0,0 +1,166 @@
+"""
+Provider health probes.
+
+A probe synthesizes a tiny prompt with a provider, bypassing the cache and
+the scheduler, and records whether it worked and how long it took. The
+manager keeps the latest result per provider: /health reports it, and a
+provider whose last probe failed is routed to the fallback provider until
+the result goes stale.
+
+Check which of the free endpoints are up right now:
+    python -m voice.text_to_speech.health
+    python -m voice.text_to_speech.health --provider deepgram --provider tiktok --json
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from core.logger import get_logger
+from voice.text_to_speech import metrics
+
+logger = get_logger(__name__)
+
+PROBE_TEXT = "Hi."
+DEFAULT_TIMEOUT = 15.0
+
+
+def probe_provider(provider, text: str = PROBE_TEXT) -> Dict[str, Any]:
+    """
+    Synthesize text with provider and report the outcome.
+
+    Args:
+        provider (BaseTTSProvider): Provider to probe.
+        text (str): Prompt to synthesize; keep it short.
+
+    Returns:
+        Dict[str, Any]: provider, healthy, latency_ms, bytes, error and checked_at (a time.time() value).
+    """
+    start = time.perf_counter()
+    try:
+        size = len(provider.synthesize(text))
+        error = None if size else "empty audio"
+    except Exception as e:
+        size, error = 0, f"{type(e).__name__}: {e}"
+    return {
+        "provider": provider.PROVIDER_NAME,
+        "healthy": error is None,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "bytes": size,
+        "error": error,
+        "checked_at": time.time(),
+    }
+
+
+def run_concurrently(names: Iterable[str], check: Callable[[str], Dict[str, Any]],
+                     timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Dict[str, Any]]:
+    """
+    Run check(name) for every name on its own daemon thread and collect the results.
+
+    A check that hasn't returned after timeout is reported as unhealthy; its
+    thread is left to finish on its own, so a hung endpoint can't block the caller.
+    """
+    names = list(dict.fromkeys(names))
+    results: Dict[str, Dict[str, Any]] = {}
+    lock = threading.Lock()
+
+    def run(name: str) -> None:
+        try:
+            result = check(name)
+        except Exception as e:
+            result = {"provider": name, "healthy": False, "latency_ms": None, "bytes": 0,
+                      "error": f"{type(e).__name__}: {e}", "checked_at": time.time()}
+        with lock:
+            results[name] = result
+
+    threads = [threading.Thread(target=run, args=(name,), name=f"tts-probe-{name}", daemon=True) for name in names]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    with lock:
+        for name in names:
+            results.setdefault(name, {"provider": name, "healthy": False, "latency_ms": None, "bytes": 0,
+                                      "error": f"timed out after {timeout:g}s", "checked_at": time.time()})
+        return {name: results[name] for name in names}
+
+
+class ProviderHealth:
+    """
+    Latest probe result of each provider. Thread-safe.
+
+    A failed result marks the provider as down for `ttl` seconds; after that
+    it counts as unknown again, so a recovered provider gets traffic back
+    even if nobody probes it.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        """
+        Initialize the store.
+
+        Args:
+            ttl (float): Seconds a probe result is trusted for routing.
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, result: Dict[str, Any]) -> None:
+        """
+        Store a probe result and export it as metrics.
+        """
+        name = result["provider"]
+        with self._lock:
+            self._results[name] = result
+        metrics.PROVIDER_UP.labels(name).set(1 if result["healthy"] else 0)
+        if result.get("latency_ms") is not None:
+            metrics.PROVIDER_PROBE_LATENCY.labels(name).set(result["latency_ms"] / 1000)
+
+    def is_down(self, provider_name: str) -> bool:
+        """
+        Check whether the provider's last probe failed less than ttl seconds ago.
+        """
+        with self._lock:
+            result = self._results.get(provider_name)
+        return bool(result and not result["healthy"] and time.time() - result["checked_at"] < self.ttl)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a copy of the latest result of every probed provider.
+        """
+        with self._lock:
+            return {name: dict(result) for name, result in self._results.items()}
+
+
+def format_table(results: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Render probe results as a fixed-width table, fastest healthy provider first.
+    """
+    rows = sorted(results.values(), key=lambda r: (not r["healthy"], r["latency_ms"] or float("inf")))
+    lines = [f"{'provider':<12} {'status':<6} {'latency':>10}  error"]
+    for r in rows:
+        latency = f"{r['latency_ms']:.0f} ms" if r["latency_ms"] is not None else "-"
+        lines.append(f"{r['provider']:<12} {'up' if r['healthy'] else 'DOWN':<6} {latency:>10}  {r['error'] or ''}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from voice.text_to_speech.active_provider import TTSProviderManager, tts_manager
+
+    parser = argparse.ArgumentParser(description="Probe TTS providers and show which ones are up.")
+    parser.add_argument("--provider", action="append", choices=list(TTSProviderManager.PROVIDERS),
+                        help="Provider to probe (repeatable; default: all)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds to wait for all probes")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = tts_manager.probe_all(args.provider, timeout=args.timeout)
+    print(json.dumps(results, indent=2) if args.json else format_table(results))
+    return 0 if all(r["healthy"] for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
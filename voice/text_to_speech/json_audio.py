@@ -0,0 +1,200 @@
+"""
+Incremental extraction of base64 audio from JSON responses.
+
+Several providers answer with a JSON object such as {"data": "<base64 mp3>"}.
+Parsing that with response.json() and base64.b64decode() holds the raw body,
+the decoded string and the audio in memory at once. iter_base64_field() scans
+the body as it arrives instead, finds the field and decodes it in fixed-size
+blocks, so memory stays at a few blocks per request regardless of clip length.
+
+    response = requests.post(url, json=payload, stream=True)
+    for block in iter_base64_field(response.iter_content(65536), "data"):
+        sink.write(block)
+"""
+import binascii
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_BLOCK_SIZE = 48 * 1024  # Decoded bytes per yielded block; a multiple of 3.
+RESPONSE_CHUNK_SIZE = 64 * 1024  # Bytes read from the response at a time.
+
+_STRUCTURAL = re.compile(rb'[{}\[\]",:]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_WHITESPACE = b" \t\r\n"
+# Escapes that can appear in a JSON-encoded base64 string (escaped slashes, wrapped lines).
+_VALUE_ESCAPES = {b"/": b"/", b"n": b"", b"r": b""}
+
+_OUTSIDE, _STRING, _AFTER_KEY, _VALUE = range(4)
+
+
+class _Base64Decoder:
+    """Decodes base64 text fed in arbitrary pieces into blocks of block_size bytes."""
+
+    def __init__(self, block_size: int):
+        self.encoded_block = max(block_size // 3, 1) * 4
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+
+    def feed(self, text: bytes) -> Iterator[bytes]:
+        text = text.translate(None, _WHITESPACE)
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size < self.encoded_block:
+            return
+        buffered = b"".join(self._pending)
+        usable = len(buffered) - len(buffered) % self.encoded_block
+        for offset in range(0, usable, self.encoded_block):
+            yield binascii.a2b_base64(buffered[offset:offset + self.encoded_block])
+        self._pending = [buffered[usable:]]
+        self._pending_size = len(buffered) - usable
+
+    def finish(self) -> Iterator[bytes]:
+        tail = b"".join(self._pending)
+        self._pending, self._pending_size = [], 0
+        if tail:
+            yield binascii.a2b_base64(tail)
+
+
+class _FieldScanner:
+    """
+    Finds the string value of one top-level key in a JSON object fed in pieces
+    and returns the raw text of that value as it goes. Only the structure of
+    the document is tracked; other values are skipped without being parsed.
+    """
+
+    def __init__(self, key: bytes):
+        self.key = key
+        self.state = _OUTSIDE
+        self.depth = 0
+        self.key_position = False   # The next string in the top-level object is a key.
+        self.escaped = False        # The previous byte inside a string was a backslash.
+        self.candidate: Optional[List[bytes]] = None  # The top-level key being read.
+        self.candidate_size = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> Iterator[Tuple[bytes, bool]]:
+        """
+        Yields (value text, finished) pairs for the parts of the value in chunk.
+        """
+        position = 0
+        while position < len(chunk) and not self.done:
+            if self.state == _VALUE:
+                end = chunk.find(b'"', position)
+                text = chunk[position:] if end < 0 else chunk[position:end]
+                if self.escaped or b"\\" in text:
+                    text = self._unescape(text, final=end >= 0)
+                self.done = end >= 0
+                yield text, self.done
+                return
+            if self.state == _STRING:
+                position = self._scan_string(chunk, position)
+            elif self.state == _AFTER_KEY:
+                while position < len(chunk) and chunk[position:position + 1] in (b" ", b"\t", b"\r", b"\n", b":"):
+                    position += 1
+                if position < len(chunk):
+                    if chunk[position:position + 1] != b'"':
+                        raise ValueError(f"Field '{self.key.decode()}' is not a string.")
+                    self.state = _VALUE
+                    position += 1
+            else:
+                position = self._scan_structure(chunk, position)
+
+    def _scan_structure(self, chunk: bytes, position: int) -> int:
+        match = _STRUCTURAL.search(chunk, position)
+        if not match:
+            return len(chunk)
+        token = match.group()
+        if self.depth == 0 and token != b"{":
+            raise ValueError("Response body is not a JSON object.")
+        if token in (b"{", b"["):
+            self.depth += 1
+            self.key_position = token == b"{" and self.depth == 1
+        elif token in (b"}", b"]"):
+            self.depth -= 1
+            self.key_position = False
+            if self.depth == 0:
+                raise KeyError(self.key.decode())
+        elif token == b",":
+            self.key_position = self.depth == 1
+        elif token == b":":
+            self.key_position = False
+        else:
+            self.state = _STRING
+            self.candidate = [] if self.key_position else None
+            self.candidate_size = 0
+            self.key_position = False
+        return match.end()
+
+    def _scan_string(self, chunk: bytes, position: int) -> int:
+        if self.escaped:
+            self.escaped = False
+            self._collect(chunk[position:position + 1])
+            return position + 1
+        match = _STRING_SPECIAL.search(chunk, position)
+        end = match.start() if match else len(chunk)
+        self._collect(chunk[position:end])
+        if not match:
+            return len(chunk)
+        if match.group() == b"\\":
+            self.escaped = True
+            return end + 1
+        self.state = _OUTSIDE
+        if self.candidate is not None and b"".join(self.candidate) == self.key:
+            self.state = _AFTER_KEY
+        self.candidate = None
+        return end + 1
+
+    def _collect(self, text: bytes) -> None:
+        # Only keys are kept, and only as long as they can still equal the one we want.
+        if self.candidate is not None and self.candidate_size <= len(self.key):
+            self.candidate.append(text)
+            self.candidate_size += len(text)
+
+    def _unescape(self, text: bytes, final: bool) -> bytes:
+        if self.escaped:
+            text = b"\\" + text
+            self.escaped = False
+        if not final and text.endswith(b"\\") and (len(text) - len(text.rstrip(b"\\"))) % 2:
+            text = text[:-1]
+            self.escaped = True
+        parts = text.split(b"\\")
+        out = [parts[0]]
+        for part in parts[1:]:
+            replacement = _VALUE_ESCAPES.get(part[:1])
+            if replacement is None:
+                raise ValueError(f"Unexpected escape sequence in field '{self.key.decode()}'.")
+            out.append(replacement + part[1:])
+        return b"".join(out)
+
+
+def iter_base64_field(chunks: Iterable[bytes], key: str, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Decode the base64 string stored under key in a top-level JSON object.
+
+    Args:
+        chunks (Iterable[bytes]): The JSON body in pieces, e.g. response.iter_content().
+        key (str): Name of the top-level field that holds the base64 string.
+        block_size (int): Maximum size of each yielded block of decoded bytes.
+
+    Yields:
+        bytes: Consecutive blocks of the decoded field.
+
+    Raises:
+        KeyError: If the body is a JSON object without the field.
+        ValueError: If the body is not a JSON object, the field is not a string,
+                    or it does not hold valid base64.
+    """
+    scanner = _FieldScanner(key.encode("utf-8"))
+    decoder = _Base64Decoder(block_size)
+    try:
+        for chunk in chunks:
+            for text, finished in scanner.feed(chunk):
+                yield from decoder.feed(text)
+                if finished:
+                    yield from decoder.finish()
+                    return
+    except binascii.Error as e:
+        raise ValueError(f"Field '{key}' does not hold valid base64: {e}") from e
+    if scanner.state == _VALUE:
+        raise ValueError(f"Response body ended inside field '{key}'.")
+    raise KeyError(key)
@@ -0,0 +1,345 @@
+"""
+Checkpointed long-form rendering.
+
+Run with:
+    python -m voice.text_to_speech.longform book.md output/book.mp3 --provider deepgram --voice aura_luna
+
+The document is split into chapters at Markdown headings and lines such as
+"Chapter 12", and each chapter into segments of whole sentences. Work is
+kept in a work directory (<output>.work by default):
+
+    segments/<key>       audio of one segment; key = hash of provider, voice and text
+    chapters/<key>.wav   one assembled chapter; key = hash of its segment keys and pauses
+    manifest.json        chapters and segments of the last render, with their offsets
+
+A segment file only appears once its audio is complete, so it doubles as the
+checkpoint: a rerun synthesizes only segments whose file is missing, i.e.
+new or edited text, rebuilds only chapters whose segment list changed, and
+streams the book together from the chapter files. Editing one chapter costs
+its changed segments plus one chapter assembly.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from core.logger import get_logger
+from voice.text_to_speech.active_provider import TTSProviderManager, tts_manager
+from voice.text_to_speech.assembler import AudioAssembler
+from voice.text_to_speech.cache import make_cache_key
+from voice.text_to_speech.scheduler import Priority
+from voice.text_to_speech.segmenter import SentenceSegmenter
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+# Markdown headings, and short lines like "Chapter 12" or "CHAPTER IV: The Storm" that don't end a sentence.
+_CHAPTER_HEADING = re.compile(r"^(?:#{1,6}[ \t]+(?P<markdown>[^\n]+?)[ \t#]*|(?P<plain>chapter[ \t]+[^\n]{0,72}?[^\s.!?]))[ \t]*$",
+                              re.IGNORECASE | re.MULTILINE)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+class LongFormRenderError(Exception):
+    """Exception raised when segments fail to synthesize or the document has no text."""
+    pass
+
+
+def split_chapters(text: str) -> List[Dict[str, str]]:
+    """
+    Split a document at chapter headings.
+
+    Returns:
+        List[Dict[str, str]]: Chapters with "title" (empty for text before the first heading) and "text".
+    """
+    chapters = []
+    headings = list(_CHAPTER_HEADING.finditer(text))
+    preface = text[:headings[0].start()] if headings else text
+    if preface.strip():
+        chapters.append({"title": "", "text": preface.strip()})
+    for heading, following in zip(headings, headings[1:] + [None]):
+        body = text[heading.end():following.start() if following else len(text)]
+        title = (heading.group("markdown") or heading.group("plain")).strip()
+        chapters.append({"title": title, "text": body.strip()})
+    return chapters
+
+
+def split_segments(text: str, max_chars: int = 600) -> List[List[str]]:
+    """
+    Split chapter text into paragraphs of segments, each made of whole
+    sentences and at most max_chars long unless one sentence is longer.
+
+    Returns:
+        List[List[str]]: Segments of every non-empty paragraph.
+    """
+    paragraphs = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        segmenter = SentenceSegmenter(max_chars=max_chars)
+        sentences = segmenter.feed(paragraph + " ") + segmenter.flush()
+        segments = []
+        for sentence in sentences:
+            if segments and len(segments[-1]) + 1 + len(sentence) <= max_chars:
+                segments[-1] += " " + sentence
+            else:
+                segments.append(sentence)
+        paragraphs.append(segments)
+    return paragraphs
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _write_json(path: str, value: Any) -> None:
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(value, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class LongFormRenderer:
+    """
+    Renders a long document into one audio file, resumably and incrementally.
+
+    Segments are synthesized concurrently at batch priority and checkpointed
+    one by one; a failed or interrupted render keeps every finished segment,
+    and the next run picks up from there. Assembly is streamed, so memory use
+    does not grow with the length of the book.
+    """
+
+    def __init__(self, work_dir: str, provider: Optional[str] = None, voice: Optional[str] = None,
+                 manager: TTSProviderManager = tts_manager, max_chars: int = 600, concurrency: int = 8,
+                 paragraph_pause_ms: float = 500.0, chapter_pause_ms: float = 1500.0, prune: bool = True):
+        """
+        Initialize the renderer.
+
+        Args:
+            work_dir (str): Directory holding segment and chapter files and the manifest.
+            provider (Optional[str]): Provider to narrate with; None uses the manager's default.
+            voice (Optional[str]): Voice to narrate with; None uses the provider default.
+            manager (TTSProviderManager): Manager whose providers and cache are used.
+            max_chars (int): Maximum length of a segment.
+            concurrency (int): Number of segments synthesized at once.
+            paragraph_pause_ms (float): Silence after every paragraph and chapter title.
+            chapter_pause_ms (float): Silence between chapters.
+            prune (bool): Remove segment and chapter files the document no longer uses.
+        """
+        self.work_dir = work_dir
+        self.provider = provider
+        self.voice = voice
+        self.manager = manager
+        self.max_chars = max_chars
+        self.concurrency = max(1, concurrency)
+        self.paragraph_pause_ms = paragraph_pause_ms
+        self.chapter_pause_ms = chapter_pause_ms
+        self.prune = prune
+        self.segments_dir = os.path.join(work_dir, "segments")
+        self.chapters_dir = os.path.join(work_dir, "chapters")
+        self.manifest_path = os.path.join(work_dir, MANIFEST_NAME)
+        os.makedirs(self.segments_dir, exist_ok=True)
+        os.makedirs(self.chapters_dir, exist_ok=True)
+
+    def plan(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Split text into chapters and segments and key them, without synthesizing anything.
+
+        Returns:
+            List[Dict[str, Any]]: Chapters with title, key and segments (key, text, pause_ms).
+        """
+        tts_provider = self.manager.get_provider(self.provider)
+        if tts_provider is None:
+            raise LongFormRenderError("No active TTS provider.")
+        voice = self.voice or getattr(tts_provider, "default_voice", None) or ""
+        chapters = []
+        for chapter in split_chapters(text):
+            paragraphs = split_segments(chapter["text"], self.max_chars)
+            if chapter["title"]:
+                paragraphs.insert(0, [chapter["title"]])
+            segments = []
+            for paragraph in paragraphs:
+                for position, segment_text in enumerate(paragraph):
+                    segments.append({
+                        "key": make_cache_key(tts_provider.PROVIDER_NAME, voice, segment_text),
+                        "text": segment_text,
+                        "pause_ms": self.paragraph_pause_ms if position == len(paragraph) - 1 else 0.0,
+                    })
+            if not segments:
+                continue
+            segments[-1]["pause_ms"] = 0.0
+            chapters.append({
+                "title": chapter["title"],
+                "key": _digest([[segment["key"], segment["pause_ms"]] for segment in segments]),
+                "segments": segments,
+            })
+        if not chapters:
+            raise LongFormRenderError("Document has no text to render.")
+        return chapters
+
+    def _segment_path(self, key: str) -> str:
+        return os.path.join(self.segments_dir, key)
+
+    def _chapter_path(self, key: str) -> str:
+        return os.path.join(self.chapters_dir, f"{key}.wav")
+
+    def _synthesize_segment(self, segment: Dict[str, Any]) -> int:
+        # Segment keys name the narrating provider, so audio from a fallback provider must not be kept.
+        provider_name = self.manager.get_provider(self.provider).PROVIDER_NAME
+        data = self.manager.synthesize(segment["text"], self.voice, provider_name, Priority.BATCH, fallback=False)
+        if not data:
+            raise LongFormRenderError("Provider returned no audio.")
+        path = self._segment_path(segment["key"])
+        with open(f"{path}.part", "wb") as audio_file:
+            audio_file.write(data)
+        os.replace(f"{path}.part", path)
+        return len(data)
+
+    def _synthesize_missing(self, chapters: List[Dict[str, Any]]) -> Dict[str, int]:
+        pending = {}
+        total = 0
+        for chapter in chapters:
+            for segment in chapter["segments"]:
+                total += 1
+                if not os.path.exists(self._segment_path(segment["key"])):
+                    pending.setdefault(segment["key"], segment)
+        logger.info(f"{len(pending)} of {total} segments need synthesis")
+
+        failures = []
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="LongForm") as executor:
+            futures = {executor.submit(self._synthesize_segment, segment): segment for segment in pending.values()}
+            for future in as_completed(futures):
+                segment = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failures.append(segment)
+                    logger.warning(f"Segment '{segment['text'][:40]}' failed: {e}")
+                done += 1
+                if done % 50 == 0:
+                    logger.info(f"Synthesized {done}/{len(pending)} segments")
+        if failures:
+            raise LongFormRenderError(f"{len(failures)} of {len(pending)} segments failed; "
+                                      f"rerun to retry them, finished segments are kept.")
+        return {"segments": total, "synthesized": len(pending)}
+
+    def _assemble_chapter(self, chapter: Dict[str, Any]) -> bool:
+        """Build the chapter file unless it exists. Returns whether it was built."""
+        path = self._chapter_path(chapter["key"])
+        if os.path.exists(path):
+            return False
+        tmp_path = f"{path[:-len('.wav')]}.part.wav"
+        try:
+            with AudioAssembler(tmp_path) as assembler:
+                for segment in chapter["segments"]:
+                    assembler.add_segment(self._segment_path(segment["key"]))
+                    if segment["pause_ms"]:
+                        assembler.add_silence(segment["pause_ms"])
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        return True
+
+    def _assemble_book(self, chapters: List[Dict[str, Any]], output_path: str) -> float:
+        root, extension = os.path.splitext(output_path)
+        tmp_path = f"{root}.part{extension}"
+        try:
+            with AudioAssembler(tmp_path) as assembler:
+                for index, chapter in enumerate(chapters):
+                    if index:
+                        assembler.add_silence(self.chapter_pause_ms)
+                    start, end = assembler.add_segment(self._chapter_path(chapter["key"]))
+                    chapter["start_ms"] = round(start * 1000 / assembler.sample_rate, 1)
+                    chapter["duration_ms"] = round((end - start) * 1000 / assembler.sample_rate, 1)
+                duration_ms = round(assembler.position * 1000 / assembler.sample_rate, 1)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, output_path)
+        return duration_ms
+
+    def _prune(self, chapters: List[Dict[str, Any]]) -> int:
+        keep = {segment["key"] for chapter in chapters for segment in chapter["segments"]}
+        keep.update(f"{chapter['key']}.wav" for chapter in chapters)
+        removed = 0
+        for directory in (self.segments_dir, self.chapters_dir):
+            for name in os.listdir(directory):
+                if name not in keep:
+                    os.remove(os.path.join(directory, name))
+                    removed += 1
+        return removed
+
+    def render(self, text: str, output_path: str) -> Dict[str, Any]:
+        """
+        Render text into output_path, reusing every segment and chapter that is still valid.
+
+        Args:
+            text (str): The whole document.
+            output_path (str): Destination file; the container is chosen from its extension.
+
+        Returns:
+            Dict[str, Any]: The manifest: output, duration_ms, summary counts and chapters
+                            with their start_ms, duration_ms and segments.
+
+        Raises:
+            LongFormRenderError: If segments failed to synthesize; the finished ones are kept.
+        """
+        started = time.perf_counter()
+        chapters = self.plan(text)
+        summary = self._synthesize_missing(chapters)
+        summary["chapters"] = len(chapters)
+        summary["chapters_rebuilt"] = sum(self._assemble_chapter(chapter) for chapter in chapters)
+        duration_ms = self._assemble_book(chapters, output_path)
+        if self.prune:
+            summary["pruned_files"] = self._prune(chapters)
+        summary["render_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        manifest = {
+            "output": output_path,
+            "provider": self.manager.get_provider(self.provider).PROVIDER_NAME,
+            "voice": self.voice,
+            "duration_ms": duration_ms,
+            "summary": summary,
+            "chapters": chapters,
+        }
+        _write_json(self.manifest_path, manifest)
+        logger.info(f"Rendered {output_path}: {summary['synthesized']}/{summary['segments']} segments synthesized, "
+                    f"{summary['chapters_rebuilt']}/{summary['chapters']} chapters rebuilt in {summary['render_ms']} ms")
+        return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render a long document, resynthesizing only what changed.")
+    parser.add_argument("document", help="UTF-8 text or Markdown file")
+    parser.add_argument("output", help="Output audio file (.mp3 or .wav)")
+    parser.add_argument("--work-dir", default=None, help="Checkpoint directory (default: <output>.work)")
+    parser.add_argument("--provider", default="deepgram", help="Provider to narrate with")
+    parser.add_argument("--voice", default=None)
+    parser.add_argument("--concurrency", type=int, default=8, help="Segments synthesized at once")
+    parser.add_argument("--max-chars", type=int, default=600, help="Maximum segment length")
+    parser.add_argument("--paragraph-pause-ms", type=float, default=500.0)
+    parser.add_argument("--chapter-pause-ms", type=float, default=1500.0)
+    parser.add_argument("--keep-unused", action="store_true", help="Keep segments the document no longer uses")
+    args = parser.parse_args()
+
+    tts_manager.initialize(args.provider)
+    with open(args.document, "r", encoding="utf-8") as f:
+        text = f.read()
+    renderer = LongFormRenderer(args.work_dir or os.path.splitext(args.output)[0] + ".work", args.provider,
+                                args.voice, max_chars=args.max_chars, concurrency=args.concurrency,
+                                paragraph_pause_ms=args.paragraph_pause_ms, chapter_pause_ms=args.chapter_pause_ms,
+                                prune=not args.keep_unused)
+    manifest = renderer.render(text, args.output)
+    print(json.dumps({"output": manifest["output"], "duration_ms": manifest["duration_ms"], **manifest["summary"]}))
+
+
+if __name__ == "__main__":
+    main()
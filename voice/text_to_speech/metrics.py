@@ -0,0 +1,48 @@
+from core.metrics import counter, gauge, histogram
+
+# Provider calls, recorded by BaseTTSProvider for every provider.
+REQUESTS = counter("tts_requests_total", "Provider synthesis requests.", ("provider", "voice", "operation"))
+ERRORS = counter("tts_errors_total", "Failed provider synthesis requests by exception type.",
+                 ("provider", "voice", "error"))
+LATENCY = histogram("tts_request_duration_seconds", "Time until a provider request returned all audio.",
+                    ("provider", "voice"))
+TTFB = histogram("tts_time_to_first_byte_seconds",
+                 "Time until a streaming provider request produced its first audio bytes.", ("provider", "voice"))
+AUDIO_BYTES = counter("tts_audio_bytes_total", "Encoded audio bytes returned by providers.", ("provider", "voice"))
+IN_FLIGHT = gauge("tts_requests_in_flight", "Provider requests currently running.", ("provider",))
+
+# TTSProviderManager.
+CACHE_LOOKUPS = counter("tts_cache_lookups_total", "Synthesis cache lookups by result (hit or miss).",
+                        ("provider", "result"))
+COALESCED = counter("tts_coalesced_requests_total", "Requests that joined an identical in-flight request.")
+PENDING_KEYS = gauge("tts_pending_requests", "Distinct synthesis requests in flight in the manager.")
+FALLBACKS = counter("tts_fallbacks_total", "Requests served by the fallback provider after the provider failed.",
+                    ("provider", "fallback"))
+SHORT_TEXT_ROUTED = counter("tts_short_text_routed_total", "Short prompts routed to the short-text provider.",
+                            ("provider",))
+
+# ProviderHealth.
+PROVIDER_UP = gauge("tts_provider_up", "Whether the last health probe of a provider succeeded (1) or failed (0).",
+                    ("provider",))
+PROVIDER_PROBE_LATENCY = gauge("tts_provider_probe_seconds", "Latency of the last health probe of a provider.",
+                               ("provider",))
+
+# TranscodingCache.
+CACHE_TRANSCODES = counter("tts_cache_transcodes_total",
+                           "Cache entries re-encoded in the background by result (stored, skipped or failed).",
+                           ("result",))
+CACHE_BYTES_SAVED = counter("tts_cache_transcode_saved_bytes_total", "Bytes saved by re-encoding cache entries.")
+CACHE_TRANSCODE_QUEUE = gauge("tts_cache_transcode_queue", "Cache entries waiting to be re-encoded.")
+
+# SynthesisScheduler.
+SCHEDULER_WAIT = histogram("tts_scheduler_wait_seconds", "Time requests waited for a provider slot.",
+                           ("provider", "priority"))
+SCHEDULER_EXPIRED = counter("tts_scheduler_expired_total", "Requests dropped because their deadline passed.",
+                            ("provider", "priority"))
+SCHEDULER_QUEUED = gauge("tts_scheduler_queued_requests", "Requests waiting for a provider slot.",
+                         ("provider", "priority"))
+
+# SynthesisServer.
+SERVER_ACTIVE = gauge("tts_server_active_requests", "Requests currently being synthesized by the HTTP service.")
+SERVER_WAITING = gauge("tts_server_waiting_requests", "Requests queued for a concurrency slot in the HTTP service.")
+SERVER_STREAMS = gauge("tts_server_stream_connections", "Open /stream WebSocket connections.")
@@ -0,0 +1,544 @@
+"""
+Packed synthesis cache: clips appended to large segment files and found
+through a memory-mapped hash index, for caches too big to keep as one file
+per clip.
+
+Layout of cache_dir:
+    index.bin         open-addressing hash table: a header plus 32-byte slots
+    seg-000001.dat    append-only segment files of records
+    writer.lock       held by the one process allowed to write
+
+Records are written to the end of the active segment before their index slot
+is published, and every lookup checks the record header against the key, so
+any number of reader processes can share a cache with one writer. Overwritten
+and deleted clips leave dead bytes behind that compact() reclaims by copying
+the live records out of sparse segments; with max_bytes set, the oldest
+segment is dropped when the cache grows past it, and segments are kept to at
+most a quarter of max_bytes so there is always a sealed one to drop. Growing the index writes a
+new index file and marks the old one retired, which tells readers to reopen.
+
+A hit is one index probe plus a slice of the mapped segment: get_view()
+returns that memoryview without copying, get() copies it into bytes.
+Only POSIX systems allow segments to be replaced while other processes map them.
+"""
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from core.logger import get_logger
+from voice.text_to_speech.cache import DEFAULT_CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process writer lock.
+    fcntl = None
+
+logger = get_logger(__name__)
+
+DEFAULT_PACKED_CACHE_DIR = os.path.join(os.path.dirname(DEFAULT_CACHE_DIR), "tts_packed")
+DEFAULT_SEGMENT_SIZE = 256 * 1024 * 1024
+
+INDEX_MAGIC = b"TTSPIDX1"
+RECORD_MAGIC = b"TTSR"
+_INDEX_HEADER = struct.Struct("<8sIIII")  # magic, capacity, live entries, tombstones, retired flag
+_SLOT = struct.Struct("<16sIIIHxx")      # key prefix, segment, offset, audio length, metadata length
+_RECORD = struct.Struct("<4s32sHI")      # magic, key, metadata length, audio length
+_U32 = struct.Struct("<I")
+_RETIRED_OFFSET = 20
+_SEGMENT_FIELD = 16                      # Offset of the segment id within a slot; written last.
+_EMPTY = 0
+_TOMBSTONE = 0xFFFFFFFF
+_MIN_CAPACITY = 1024
+_MAX_LOAD = 0.7
+_MIN_EVICTABLE_SEGMENTS = 4              # With max_bytes set, segments are at most max_bytes / this.
+_SEGMENT_NAME = re.compile(r"^seg-(\d{6})\.dat$")
+_PRUNE_INTERVAL = 1.0                    # Seconds between a reader's checks for deleted segments.
+
+
+class PackedSynthesisCache:
+    """
+    Synthesis cache stored in segment files with a memory-mapped index.
+
+    Has the same interface as SynthesisCache (get, get_metadata, put, delete,
+    keys, `in`); keys must be the SHA-256 hex digests from make_cache_key.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_PACKED_CACHE_DIR, readonly: Optional[bool] = None,
+                 segment_size: int = DEFAULT_SEGMENT_SIZE, max_bytes: Optional[int] = None,
+                 compact_ratio: float = 0.5):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Directory holding the index and segment files.
+            readonly (Optional[bool]): True to only read; False to require the writer lock;
+                                       None to write if no other process holds the lock.
+            segment_size (int): Size at which a new segment file is started; lowered to
+                                max_bytes / 4 when max_bytes is smaller.
+            max_bytes (Optional[int]): Drop the oldest segment once all segments exceed this size.
+            compact_ratio (float): Compact segments whose live fraction drops below this after
+                                   deletes and overwrites; 0 disables automatic compaction.
+        """
+        self.cache_dir = cache_dir
+        if max_bytes is not None:
+            # Eviction drops whole sealed segments, so one segment must never hold the whole budget.
+            segment_size = max(1, min(segment_size, max_bytes // _MIN_EVICTABLE_SEGMENTS))
+        self.segment_size = segment_size
+        self.max_bytes = max_bytes
+        self.compact_ratio = compact_ratio
+        self.index_path = os.path.join(cache_dir, "index.bin")
+        self._lock = threading.RLock()
+        # (index map, capacity), replaced as a unit so lookups never mix an old map with a new size.
+        self._table: Tuple[Optional[mmap.mmap], int] = (None, 0)
+        self._index_file = None
+        self._segments: Dict[int, mmap.mmap] = {}
+        self._lock_file = None
+        self._active_file = None
+        self._active_segment = 0
+        self._segment_live: Dict[int, int] = {}
+        self._segment_size: Dict[int, int] = {}
+        self._pruned_at = 0.0
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.writable = False if readonly else self._acquire_writer_lock()
+        if readonly is False and not self.writable:
+            raise RuntimeError(f"Another process is writing the packed cache in {cache_dir}")
+        if self.writable:
+            self._open_writer()
+        else:
+            self._open_index()
+
+
+    def _acquire_writer_lock(self) -> bool:
+        self._lock_file = open(os.path.join(self.cache_dir, "writer.lock"), "a+b")
+        if fcntl is None:
+            return True
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            logger.info(f"Packed cache {self.cache_dir} is being written by another process; opening read-only.")
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+
+    def _open_index(self) -> bool:
+        """Map the current index file; returns False if there is none yet."""
+        try:
+            with open(self.index_path, "rb") as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return False
+        magic, capacity = _INDEX_HEADER.unpack_from(index, 0)[:2]
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{self.index_path} is not a packed cache index.")
+        self._table = (index, capacity)
+        return True
+
+    def _open_writer(self) -> None:
+        tmp_path = self.index_path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if not os.path.exists(self.index_path):
+            self._write_index_file(self.index_path, _MIN_CAPACITY, [])
+        self._map_writable_index()
+
+        for name in os.listdir(self.cache_dir):
+            match = _SEGMENT_NAME.match(name)
+            if match:
+                segment = int(match.group(1))
+                self._segment_size[segment] = os.path.getsize(self._segment_path(segment))
+                self._segment_live.setdefault(segment, 0)
+        for _, segment, _, audio_length, meta_length in self._live_slots():
+            self._segment_live[segment] = self._segment_live.get(segment, 0) + _RECORD.size + meta_length + audio_length
+        self._open_segment(max(self._segment_size, default=1))
+
+    def _map_writable_index(self) -> None:
+        self._index_file = open(self.index_path, "r+b")
+        index = mmap.mmap(self._index_file.fileno(), 0)
+        self._table = (index, _INDEX_HEADER.unpack_from(index, 0)[1])
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.cache_dir, f"seg-{segment:06d}.dat")
+
+    def _open_segment(self, segment: int) -> None:
+        if self._active_file is not None:
+            self._active_file.close()
+        self._active_file = open(self._segment_path(segment), "ab")
+        self._active_segment = segment
+        self._segment_size[segment] = self._active_file.tell()
+        self._segment_live.setdefault(segment, 0)
+
+
+    @staticmethod
+    def _key_bytes(key: str) -> bytes:
+        try:
+            raw = bytes.fromhex(key)
+        except ValueError:
+            raw = b""
+        if len(raw) != 32:
+            raise ValueError(f"Packed cache keys must be SHA-256 hex digests, got {key!r}")
+        return raw
+
+    @property
+    def _index(self) -> Optional[mmap.mmap]:
+        return self._table[0]
+
+    def _refresh_index(self) -> None:
+        # The writer marks an index retired after replacing it with a bigger one. It swaps
+        # its own writable map in _rebuild_index, so only readers ever reopen the file.
+        if self.writable:
+            return
+        now = time.monotonic()
+        if now - self._pruned_at >= _PRUNE_INTERVAL:
+            self._pruned_at = now
+            self._prune_segments()
+        index = self._table[0]
+        if index is None or _U32.unpack_from(index, _RETIRED_OFFSET)[0]:
+            with self._lock:
+                index = self._table[0]
+                if index is None or _U32.unpack_from(index, _RETIRED_OFFSET)[0]:
+                    self._open_index()
+
+    def _prune_segments(self) -> None:
+        # Evicted and compacted segments are tombstoned in the index, so no lookup touches
+        # them again; a reader's mapping would keep their disk space allocated until it exits.
+        with self._lock:
+            for segment in [segment for segment in self._segments if not os.path.exists(self._segment_path(segment))]:
+                del self._segments[segment]
+
+    def _probe(self, prefix: bytes) -> Tuple[Optional[int], Optional[Tuple]]:
+        """
+        Find the slot holding prefix.
+
+        Returns:
+            Tuple: (slot position, slot fields) on a hit, or (first reusable position, None) on a miss.
+        """
+        index, capacity = self._table
+        mask = capacity - 1
+        position = int.from_bytes(prefix[:8], "little") & mask
+        reusable = None
+        for _ in range(capacity):
+            offset = _INDEX_HEADER.size + position * _SLOT.size
+            fields = _SLOT.unpack_from(index, offset)
+            segment = fields[1]
+            if segment == _EMPTY:
+                return (reusable if reusable is not None else offset), None
+            if segment == _TOMBSTONE:
+                if reusable is None:
+                    reusable = offset
+            elif fields[0] == prefix:
+                return offset, fields
+            position = (position + 1) & mask
+        return reusable, None
+
+    def _live_slots(self) -> Iterator[Tuple]:
+        index, capacity = self._table
+        for position in range(capacity):
+            fields = _SLOT.unpack_from(index, _INDEX_HEADER.size + position * _SLOT.size)
+            if fields[1] not in (_EMPTY, _TOMBSTONE):
+                yield fields
+
+    def _publish(self, offset: int, prefix: bytes, segment: int, record_offset: int, audio_length: int,
+                 meta_length: int) -> None:
+        # Fill the slot while it still reads as empty or deleted, then make it visible with one aligned write.
+        previous = _U32.unpack_from(self._index, offset + _SEGMENT_FIELD)[0]
+        hidden = previous if previous in (_EMPTY, _TOMBSTONE) else _TOMBSTONE
+        _U32.pack_into(self._index, offset + _SEGMENT_FIELD, hidden)
+        _SLOT.pack_into(self._index, offset, prefix, hidden, record_offset, audio_length, meta_length)
+        _U32.pack_into(self._index, offset + _SEGMENT_FIELD, segment)
+
+    def _set_counts(self, live_delta: int = 0, tombstone_delta: int = 0) -> None:
+        _, capacity, live, tombstones, retired = _INDEX_HEADER.unpack_from(self._index, 0)
+        _INDEX_HEADER.pack_into(self._index, 0, INDEX_MAGIC, capacity, live + live_delta,
+                                tombstones + tombstone_delta, retired)
+
+    def _write_index_file(self, path: str, capacity: int, slots) -> None:
+        table = bytearray(_INDEX_HEADER.size + capacity * _SLOT.size)
+        mask, count = capacity - 1, 0
+        for prefix, segment, record_offset, audio_length, meta_length in slots:
+            position = int.from_bytes(prefix[:8], "little") & mask
+            while _U32.unpack_from(table, _INDEX_HEADER.size + position * _SLOT.size + _SEGMENT_FIELD)[0]:
+                position = (position + 1) & mask
+            _SLOT.pack_into(table, _INDEX_HEADER.size + position * _SLOT.size,
+                            prefix, segment, record_offset, audio_length, meta_length)
+            count += 1
+        _INDEX_HEADER.pack_into(table, 0, INDEX_MAGIC, capacity, count, 0, 0)
+        with open(path, "wb") as f:
+            f.write(table)
+
+    def _rebuild_index(self) -> None:
+        live = _INDEX_HEADER.unpack_from(self._index, 0)[2]
+        capacity = _MIN_CAPACITY
+        while live + 1 > capacity * _MAX_LOAD / 2:
+            capacity *= 2
+        tmp_path = self.index_path + ".tmp"
+        self._write_index_file(tmp_path, capacity, list(self._live_slots()))
+        os.replace(tmp_path, self.index_path)
+        # Lookups still running on the old map finish there; it is unmapped once they drop it.
+        old_index = self._index
+        self._index_file.close()
+        self._map_writable_index()
+        _U32.pack_into(old_index, _RETIRED_OFFSET, 1)
+        logger.debug(f"Rebuilt packed cache index with {capacity} slots for {live} entries.")
+
+
+    def _segment_map(self, segment: int, end: int) -> Optional[mmap.mmap]:
+        mapped = self._segments.get(segment)
+        if mapped is not None and len(mapped) >= end:
+            return mapped
+        with self._lock:
+            mapped = self._segments.get(segment)
+            if mapped is None or len(mapped) < end:
+                if segment == self._active_segment and self._active_file is not None:
+                    self._active_file.flush()
+                try:
+                    with open(self._segment_path(segment), "rb") as f:
+                        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (FileNotFoundError, ValueError):
+                    return None
+                # Views handed out earlier keep the previous mapping alive.
+                self._segments[segment] = mapped
+        return mapped if len(mapped) >= end else None
+
+    def _record(self, fields: Tuple, key_bytes: Optional[bytes] = None) -> Optional[Tuple[mmap.mmap, int, int, int]]:
+        """
+        Locate a record and check its header against the slot.
+
+        Returns:
+            Optional[Tuple]: (segment map, metadata start, audio start, audio end), or None if the
+                             slot no longer matches what is on disk.
+        """
+        _, segment, record_offset, audio_length, meta_length = fields
+        meta_start = record_offset + _RECORD.size
+        audio_start = meta_start + meta_length
+        audio_end = audio_start + audio_length
+        mapped = self._segment_map(segment, audio_end)
+        if mapped is None:
+            return None
+        magic, stored_key, stored_meta, stored_audio = _RECORD.unpack_from(mapped, record_offset)
+        if magic != RECORD_MAGIC or stored_meta != meta_length or stored_audio != audio_length:
+            return None
+        if key_bytes is not None and stored_key != key_bytes:
+            return None
+        return mapped, meta_start, audio_start, audio_end
+
+    def _lookup(self, key: str) -> Optional[Tuple[mmap.mmap, int, int, int]]:
+        try:
+            key_bytes = self._key_bytes(key)
+        except ValueError:
+            return None
+        # A second attempt covers a slot that changed while it was being read.
+        for _ in range(2):
+            self._refresh_index()
+            if self._index is None:
+                return None
+            fields = self._probe(key_bytes[:16])[1]
+            if fields is None:
+                return None
+            record = self._record(fields, key_bytes)
+            if record is not None:
+                return record
+        return None
+
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key) is not None
+
+    def get_view(self, key: str) -> Optional[memoryview]:
+        """
+        Return the cached audio for key as a read-only view of the segment, or None on a miss.
+        """
+        record = self._lookup(key)
+        if record is None:
+            return None
+        mapped, _, audio_start, audio_end = record
+        return memoryview(mapped)[audio_start:audio_end]
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return the cached audio for key, or None on a miss.
+        """
+        view = self.get_view(key)
+        return None if view is None else view.tobytes()
+
+    def get_metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the metadata stored alongside key, or None if the entry does not exist.
+        """
+        record = self._lookup(key)
+        if record is None:
+            return None
+        mapped, meta_start, audio_start, _ = record
+        return json.loads(mapped[meta_start:audio_start].decode("utf-8")) if audio_start > meta_start else {}
+
+    def put(self, key: str, data: bytes, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store audio under key. Read-only instances ignore the call.
+
+        Args:
+            key (str): Cache key from make_cache_key.
+            data (bytes): Encoded audio.
+            metadata (Optional[Dict[str, Any]]): Provider, voice, text_sha256 and format of the entry.
+        """
+        if not self.writable:
+            logger.debug("Packed cache is read-only in this process; entry not stored.")
+            return
+        key_bytes = self._key_bytes(key)
+        meta = json.dumps(metadata or {}).encode("utf-8")
+        with self._lock:
+            self._append(key_bytes, meta, data)
+            self._maintain()
+
+    def _append(self, key_bytes: bytes, meta: bytes, data) -> None:
+        record_size = _RECORD.size + len(meta) + len(data)
+        if self._segment_size[self._active_segment] and \
+                self._segment_size[self._active_segment] + record_size > self.segment_size:
+            self._open_segment(max(self._segment_size) + 1)
+        record_offset = self._segment_size[self._active_segment]
+        self._active_file.write(_RECORD.pack(RECORD_MAGIC, key_bytes, len(meta), len(data)))
+        self._active_file.write(meta)
+        self._active_file.write(data)
+        self._active_file.flush()
+        self._segment_size[self._active_segment] += record_size
+        self._segment_live[self._active_segment] += record_size
+
+        slot_offset, fields = self._probe(key_bytes[:16])
+        if fields is not None:
+            self._segment_live[fields[1]] -= _RECORD.size + fields[4] + fields[3]
+        else:
+            reused = _U32.unpack_from(self._index, slot_offset + _SEGMENT_FIELD)[0] == _TOMBSTONE
+            self._set_counts(live_delta=1, tombstone_delta=-1 if reused else 0)
+        self._publish(slot_offset, key_bytes[:16], self._active_segment, record_offset, len(data), len(meta))
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry if present. Its bytes are reclaimed by compaction.
+        """
+        if not self.writable:
+            return
+        try:
+            prefix = self._key_bytes(key)[:16]
+        except ValueError:
+            return
+        with self._lock:
+            slot_offset, fields = self._probe(prefix)
+            if fields is None:
+                return
+            _U32.pack_into(self._index, slot_offset + _SEGMENT_FIELD, _TOMBSTONE)
+            self._set_counts(live_delta=-1, tombstone_delta=1)
+            self._segment_live[fields[1]] -= _RECORD.size + fields[4] + fields[3]
+            self._maintain()
+
+    def keys(self) -> Iterator[str]:
+        """
+        Iterate over the keys of all entries.
+        """
+        self._refresh_index()
+        if self._index is None:
+            return
+        for fields in list(self._live_slots()):
+            mapped = self._segment_map(fields[1], fields[2] + _RECORD.size)
+            if mapped is not None:
+                yield _RECORD.unpack_from(mapped, fields[2])[1].hex()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Entry count, segment count and live and total segment bytes (writer only).
+        """
+        self._refresh_index()
+        return {
+            "entries": _INDEX_HEADER.unpack_from(self._index, 0)[2] if self._index is not None else 0,
+            "segments": len(self._segment_size),
+            "live_bytes": sum(self._segment_live.values()),
+            "total_bytes": sum(self._segment_size.values()),
+        }
+
+    def _maintain(self) -> None:
+        _, capacity, live, tombstones, _ = _INDEX_HEADER.unpack_from(self._index, 0)
+        if live + tombstones + 1 > capacity * _MAX_LOAD:
+            self._rebuild_index()
+        if self.max_bytes is not None:
+            while sum(self._segment_size.values()) > self.max_bytes and len(self._segment_size) > 1:
+                self._evict_oldest()
+        if self.compact_ratio:
+            self._compact(self.compact_ratio)
+
+    def _evict_oldest(self) -> None:
+        oldest = min(self._segment_size)
+        if oldest == self._active_segment:
+            self._open_segment(max(self._segment_size) + 1)
+        for position in range(self._table[1]):
+            offset = _INDEX_HEADER.size + position * _SLOT.size
+            if _U32.unpack_from(self._index, offset + _SEGMENT_FIELD)[0] == oldest:
+                _U32.pack_into(self._index, offset + _SEGMENT_FIELD, _TOMBSTONE)
+                self._set_counts(live_delta=-1, tombstone_delta=1)
+        logger.info(f"Evicted packed cache segment {oldest} ({self._segment_size[oldest]} bytes).")
+        self._drop_segment(oldest)
+
+    def _drop_segment(self, segment: int) -> None:
+        del self._segment_size[segment]
+        self._segment_live.pop(segment, None)
+        self._segments.pop(segment, None)
+        try:
+            os.remove(self._segment_path(segment))
+        except OSError as e:
+            logger.warning(f"Could not remove packed cache segment {segment}: {e}")
+
+    def compact(self, min_live_ratio: float = 0.5) -> int:
+        """
+        Copy the live records out of sealed segments that are less than
+        min_live_ratio live, then delete those segments.
+
+        Returns:
+            int: Bytes reclaimed.
+        """
+        if not self.writable:
+            return 0
+        with self._lock:
+            return self._compact(min_live_ratio)
+
+    def _compact(self, min_live_ratio: float) -> int:
+        victims = [segment for segment, size in self._segment_size.items()
+                   if segment != self._active_segment and size
+                   and self._segment_live.get(segment, 0) < size * min_live_ratio]
+        if not victims:
+            return 0
+        moving = [fields for fields in self._live_slots() if fields[1] in victims]
+        reclaimed = 0
+        for victim in victims:
+            reclaimed += self._segment_size[victim] - self._segment_live.get(victim, 0)
+            for fields in moving:
+                if fields[1] != victim:
+                    continue
+                record = self._record(fields)
+                if record is None:
+                    continue
+                mapped, meta_start, audio_start, audio_end = record
+                key_bytes = _RECORD.unpack_from(mapped, fields[2])[1]
+                self._append(key_bytes, mapped[meta_start:audio_start], memoryview(mapped)[audio_start:audio_end])
+            self._drop_segment(victim)
+        logger.debug(f"Compacted {len(victims)} packed cache segments, reclaiming {reclaimed} bytes.")
+        return reclaimed
+
+    def close(self) -> None:
+        """
+        Flush and release files. Views from get_view() stay valid.
+        """
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+            if self._index_file is not None:
+                self._index.flush()
+                self._index_file.close()
+                self._index_file = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            self.writable = False
@@ -1,10 +1,11 @@
 import os
-import base64
 import requests
-from typing import Optional
+from typing import Iterator, Optional
 
 from core.logger import get_logger
+from core.tracing import span
 from voice.text_to_speech.base import BaseTTSProvider
+from voice.text_to_speech.json_audio import RESPONSE_CHUNK_SIZE, iter_base64_field
 
 logger = get_logger(__name__)
 
@@ -17,6 +18,8 @@ class DeepgramTTSProvider(BaseTTSProvider):
     """
     
     PROVIDER_NAME = "deepgram"
+    DEFAULT_BASE_URL = "https://deepgram.com"
+    BASE_URL_ENV = "DEEPGRAM_TTS_BASE_URL"
     
     # Available voice models
     VOICE_MODELS = {
@@ -26,16 +29,19 @@ class DeepgramTTSProvider(BaseTTSProvider):
         "aura_zeus": "aura-zeus-en"
     }
     
-    def __init__(self, default_voice: str = "aura_arcas"):
+    def __init__(self, default_voice: str = "aura_arcas", base_url: Optional[str] = None):
         """
         Initialize the Deepgram TTS provider.
         
         Args:
             default_voice (str): The default voice model to use.
                                  Must be one of the keys in VOICE_MODELS.
+            base_url (str, optional): API base URL override; defaults to
+                                      $DEEPGRAM_TTS_BASE_URL or https://deepgram.com.
         """
         super().__init__()
-        self.api_url = "https://deepgram.com/api/ttsAudioGeneration"
+        self.api_url = f"{self.resolve_base_url(base_url)}/api/ttsAudioGeneration"
+        self.session = self._new_session()
         
         if default_voice not in self.VOICE_MODELS:
             logger.warning(f"Invalid voice model '{default_voice}'. Using default 'aura_arcas' instead.")
@@ -50,6 +56,12 @@ class DeepgramTTSProvider(BaseTTSProvider):
         
         logger.info(f"Initialized Deepgram TTS provider with default voice: {self.VOICE_MODELS[default_voice]}")
     
+    def warmup(self) -> None:
+        """
+        Open a pooled connection to the API so the first request skips DNS and TLS.
+        """
+        self._warm_connection(self.session, self.api_url)
+    
     def _get_headers(self) -> dict:
         """
         Generate the headers required for the Deepgram API request.
@@ -97,7 +109,6 @@ class DeepgramTTSProvider(BaseTTSProvider):
         """
         # Use default voice if none specified
         voice_key = voice if voice in self.VOICE_MODELS else self.default_voice
-        voice_model = self.VOICE_MODELS[voice_key]
         
         # Determine output file path
         file_path = output_path if output_path else self.temp_audio_path
@@ -109,26 +120,45 @@ class DeepgramTTSProvider(BaseTTSProvider):
         except Exception as e:
             logger.warning(f"Failed to remove existing audio file: {e}")
         
-        # Prepare the request
+        # Save the audio file as the response arrives
+        with span("tts.generate_speech", provider=self.PROVIDER_NAME, voice=voice_key, chars=len(text)):
+            self._write_audio(self._request_audio(text, voice_key), file_path)
+        
+        logger.debug(f"Successfully generated speech, saved to: {file_path}")
+        return file_path
+    
+    def _request_audio(self, text: str, voice_key: str, block_size: int = RESPONSE_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Send the request and yield the audio as it is decoded from the response,
+        without holding the whole JSON body or base64 string in memory.
+        
+        Raises:
+            Exception: If the API request fails.
+        """
+        voice_model = self.VOICE_MODELS[voice_key]
         headers = self._get_headers()
         payload = {"text": text, "model": voice_model}
         
         try:
             logger.debug(f"Sending request to Deepgram TTS API with voice model: {voice_model}")
-            response = requests.post(self.api_url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            # Save the audio file
-            with open(file_path, 'wb') as audio_file:
-                audio_file.write(base64.b64decode(response.json()['data']))
-            
-            logger.debug(f"Successfully generated speech, saved to: {file_path}")
-            return file_path
-            
+            with span("tts.http") as s:
+                response = self.session.post(self.api_url, headers=headers, json=payload, stream=True)
+                s.set_attributes(status=response.status_code, ttfb_ms=response.elapsed.total_seconds() * 1000)
+            with response:
+                response.raise_for_status()
+                yield from iter_base64_field(response.iter_content(RESPONSE_CHUNK_SIZE), 'data', block_size)
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to generate speech with Deepgram: {e}")
             raise Exception(f"Deepgram TTS API request failed: {e}")
     
+    def _synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        voice_key = voice if voice in self.VOICE_MODELS else self.default_voice
+        return b"".join(self._request_audio(text, voice_key))
+    
+    def _stream_speech(self, text: str, voice: Optional[str], chunk_size: int) -> Iterator[bytes]:
+        voice_key = voice if voice in self.VOICE_MODELS else self.default_voice
+        return self._request_audio(text, voice_key, chunk_size)
+    
     def speak(self, text: str, voice: Optional[str] = None) -> None:
         """
         Convert text to speech and play it.
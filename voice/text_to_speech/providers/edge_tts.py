@@ -1,5 +1,8 @@
 import os
+import shlex
+import subprocess
 from core.logger import get_logger
+from core.tracing import span
 from voice.text_to_speech.base import BaseTTSProvider
 from typing import Optional, Dict, Any
 from utils.helpers import play_audio
@@ -28,25 +31,25 @@ class EdgeTTSProvider(BaseTTSProvider):
         "en-CA-LiamNeural": "en-CA-LiamNeural",
     }
 
-    def __init__(self, default_voice: str = "en-US-JennyNeural"):
+    def __init__(self, default_voice: str = "en-US-JennyNeural", executable: Optional[str] = None):
         """
         Initialize the EdgeTTSProvider.
         
         Args:
             default_voice (str): The default voice to use.
+            executable (Optional[str]): Command used to run the edge-tts client, split like a
+                                        shell command line; defaults to $EDGE_TTS_EXECUTABLE or "edge-tts".
         """
         super().__init__()
         if default_voice not in self.VOICE_OPTIONS:
             logger.warning(f"Default voice '{default_voice}' not available; reverting to 'en-US-JennyNeural'.")
             default_voice = "en-US-JennyNeural"
         self.default_voice = default_voice
+        self.executable = executable or os.getenv("EDGE_TTS_EXECUTABLE") or "edge-tts"
         
         # Create cache directory with absolute path
         self.cache_dir = os.path.abspath(os.path.join("data", "cache"))
         os.makedirs(self.cache_dir, exist_ok=True)
-        
-        # Create paths for audio and subtitle files
-        self.subtitle_file = os.path.join(self.cache_dir, "subtitles.srt")
 
     def generate_speech(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None) -> str:
         """
@@ -59,17 +62,33 @@ class EdgeTTSProvider(BaseTTSProvider):
             
         Returns:
             str: The path to the generated audio file.
+        
+        Raises:
+            Exception: If edge-tts can't be started or exits with an error.
         """
         voice = voice if (voice and voice in self.VOICE_OPTIONS) else self.default_voice
         
         # Create output file in cache directory
         output_file = os.path.join(self.cache_dir, f"{voice}.mp3") if not output_path else output_path
         
-        # Create a simple command just like the sample code
-        command = f'edge-tts --voice "{voice}" --text "{text}" --write-media "{output_file}" --write-subtitles "{self.subtitle_file}"'
+        # Arguments are passed as a list, never through a shell, so text can't inject commands.
+        # "--text=" keeps text that starts with "-" from being parsed as an option. No subtitles are
+        # written: nothing reads them, and a shared subtitle path would race between concurrent calls.
+        command = shlex.split(self.executable) + [
+            "--voice", voice, f"--text={text}", "--write-media", output_file,
+        ]
         
-        logger.debug(f"Executing command: {command}")
-        os.system(command)
+        logger.debug(f"Executing edge-tts for {len(text)} characters with voice {voice}")
+        with span("tts.generate_speech", provider=self.PROVIDER_NAME, voice=voice, chars=len(text)):
+            with span("tts.edge_cli") as s:
+                try:
+                    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                except OSError as e:
+                    raise Exception(f"edge-tts is not available ({self.executable}): {e}")
+                s.set_attribute("exit_status", result.returncode)
+        if result.returncode != 0:
+            stderr = result.stderr.decode("utf-8", "replace").strip()
+            raise Exception(f"edge-tts exited with status {result.returncode}: {stderr}")
         return output_file
 
     def speak(self, text: str, voice: Optional[str] = None) -> None:
@@ -85,9 +104,7 @@ class EdgeTTSProvider(BaseTTSProvider):
             # Use the play_audio helper function
             play_audio(audio_path)
             
-            # Cleanup: remove the subtitle file and audio file after playing
-            if os.path.exists(self.subtitle_file):
-                os.remove(self.subtitle_file)
+            # Cleanup: remove the audio file after playing
             if os.path.exists(audio_path):
                 os.remove(audio_path)
         except Exception as e:
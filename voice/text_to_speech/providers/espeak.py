@@ -0,0 +1,148 @@
+import os
+import subprocess
+from typing import Iterator, Optional
+
+from core.logger import get_logger
+from core.tracing import span
+from voice.text_to_speech.base import BaseTTSProvider
+
+logger = get_logger(__name__)
+
+class EspeakTTSProvider(BaseTTSProvider):
+    """
+    Text-to-Speech provider using a locally installed espeak-ng.
+
+    No network is involved, so latency depends on the local CPU alone: a short
+    prompt takes a few milliseconds plus the process start. The voice is robotic,
+    which makes this provider most useful as the fallback when a remote provider
+    fails and as the instant path for short system prompts ("Yes?", "Done.").
+    Audio is 22.05 kHz mono WAV.
+    """
+
+    PROVIDER_NAME = "espeak"
+    AUDIO_FORMAT = "wav"
+    # Speech is produced faster than real time; small chunks get the header out at once.
+    STREAM_CHUNK_SIZE = 4096
+
+    # Available voices, mapped to espeak-ng voice names
+    VOICE_OPTIONS = {
+        "en-us": "en-us",
+        "en-gb": "en-gb",
+        "en-us_female": "en-us+f3",
+        "en-gb_female": "en-gb+f3",
+    }
+
+    def __init__(self, default_voice: str = "en-us", speed: int = 175, executable: Optional[str] = None):
+        """
+        Initialize the espeak-ng TTS provider.
+
+        Args:
+            default_voice (str): The default voice to use (one of the keys in VOICE_OPTIONS).
+            speed (int): Speaking rate in words per minute.
+            executable (Optional[str]): Command used to run espeak-ng; defaults to
+                                        $ESPEAK_EXECUTABLE or "espeak-ng".
+        """
+        super().__init__()
+        if default_voice not in self.VOICE_OPTIONS:
+            logger.warning(f"Invalid voice '{default_voice}'. Using default 'en-us' instead.")
+            default_voice = "en-us"
+        self.default_voice = default_voice
+        self.speed = speed
+        self.executable = executable or os.getenv("ESPEAK_EXECUTABLE") or "espeak-ng"
+        self.temp_audio_path = os.path.abspath(os.path.join("data", "cache", "espeak_audio.wav"))
+        os.makedirs(os.path.dirname(self.temp_audio_path), exist_ok=True)
+
+    def _command(self, voice_key: str) -> list:
+        # Text is passed on stdin so it never needs quoting and can't be mistaken for an option.
+        return [self.executable, "-v", self.VOICE_OPTIONS[voice_key], "-s", str(self.speed), "-b", "1", "--stdout"]
+
+    def _run(self, text: str, voice: Optional[str], chunk_size: int) -> Iterator[bytes]:
+        """
+        Run espeak-ng and yield its WAV output as it is written.
+
+        Raises:
+            Exception: If espeak-ng is not installed or fails.
+        """
+        voice_key = voice if voice in self.VOICE_OPTIONS else self.default_voice
+        try:
+            process = subprocess.Popen(self._command(voice_key), stdin=subprocess.PIPE,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            logger.error(f"Could not start espeak-ng: {e}")
+            raise Exception(f"espeak-ng is not available ({self.executable}): {e}")
+        try:
+            with span("tts.espeak", voice=voice_key, chars=len(text)):
+                process.stdin.write(text.encode("utf-8"))
+                process.stdin.close()
+                while True:
+                    chunk = process.stdout.read1(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+                stderr = process.stderr.read()
+                if process.wait() != 0:
+                    raise Exception(f"espeak-ng exited with status {process.returncode}: "
+                                    f"{stderr.decode('utf-8', 'replace').strip()}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+
+    def _synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        return b"".join(self._run(text, voice, 1 << 16))
+
+    def _stream_speech(self, text: str, voice: Optional[str], chunk_size: int) -> Iterator[bytes]:
+        return self._run(text, voice, chunk_size)
+
+    def generate_speech(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None) -> str:
+        """
+        Convert text to speech with espeak-ng.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (str, optional): Voice to use (one of the keys in VOICE_OPTIONS).
+                                  If None, uses the default voice.
+            output_path (str, optional): Path to save the audio file.
+                                        If None, uses a temporary file.
+
+        Returns:
+            str: Path to the generated audio file.
+
+        Raises:
+            Exception: If espeak-ng is not installed or fails.
+        """
+        file_path = output_path if output_path else self.temp_audio_path
+        with span("tts.generate_speech", provider=self.PROVIDER_NAME, voice=voice or self.default_voice,
+                  chars=len(text)):
+            self._write_audio(self._run(text, voice, self.STREAM_CHUNK_SIZE), file_path)
+        logger.debug(f"Successfully generated speech, saved to: {file_path}")
+        return file_path
+
+    def speak(self, text: str, voice: Optional[str] = None) -> None:
+        """
+        Convert text to speech and play it.
+
+        Args:
+            text (str): The text to speak.
+            voice (str, optional): Voice to use.
+                                  If None, uses the default voice.
+        """
+        try:
+            audio_path = self.generate_speech(text, voice)
+            from utils.helpers import play_audio
+            play_audio(audio_path)
+            if os.path.exists(audio_path) and audio_path == self.temp_audio_path:
+                os.remove(audio_path)
+        except Exception as e:
+            logger.error(f"Failed to speak text: {e}")
+
+    def list_available_voices(self) -> dict:
+        """
+        Return a dictionary of available voices.
+
+        Returns:
+            dict: Available voices.
+        """
+        return self.VOICE_OPTIONS
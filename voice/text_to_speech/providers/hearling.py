@@ -1,12 +1,11 @@
-import aiohttp
 import asyncio
-import aiofiles
 import os
 import random
 import threading
 from typing import Optional, List
 
 from core.logger import get_logger
+from core.tracing import current_span, span, use_span
 from voice.text_to_speech.base import BaseTTSProvider
 from utils.helpers import play_audio
 
@@ -15,6 +14,8 @@ logger = get_logger(__name__)
 
 class HearlingTTSProvider(BaseTTSProvider):
     PROVIDER_NAME = "hearling"
+    DEFAULT_BASE_URL = "https://api.hearling.com"
+    BASE_URL_ENV = "HEARLING_TTS_BASE_URL"
 
     # New voice list for Hearling
     AVAILABLE_VOICES: List[str] = [
@@ -24,11 +25,12 @@ class HearlingTTSProvider(BaseTTSProvider):
         'hi-IN-Wavenet-D', 'hi-IN-Wavenet-E', 'hi-IN-Wavenet-F'
     ]
 
-    def __init__(self, email_prefix: str = "devsdocode", max_pool_size: int = 5):
+    def __init__(self, email_prefix: str = "devsdocode", max_pool_size: int = 5, base_url: Optional[str] = None):
         super().__init__()
         self.email_prefix = email_prefix
-        self.url_accounts = "https://api.hearling.com/accounts"
-        self.url_clips = "https://api.hearling.com/clips"
+        base_url = self.resolve_base_url(base_url)
+        self.url_accounts = f"{base_url}/accounts"
+        self.url_clips = f"{base_url}/clips"
         self.token_pool = []
         self.max_pool_size = max_pool_size
         self.is_closing = False
@@ -59,17 +61,31 @@ class HearlingTTSProvider(BaseTTSProvider):
 
     async def initialize(self) -> None:
         """Initialize the async session and prefill the token pool."""
+        import aiohttp  # Deferred: only needed once a Hearling provider is created.
         self.session = aiohttp.ClientSession()
         await self.refill_token_pool()
 
+    def warmup(self) -> None:
+        """
+        Top up the token pool, so the next requests don't wait for account creation.
+        """
+        asyncio.run_coroutine_threadsafe(self.refill_token_pool(), self.loop).result()
+
     async def cleanup(self) -> None:
         """Cleanup asynchronous resources and stop the dedicated event loop."""
         self.is_closing = True
         if self.session and not self.session.closed:
             await self.session.close()
-        # Stop the loop and wait for the thread to finish.
+        # Stop the loop; close() waits for its thread from outside the loop.
         self.loop.call_soon_threadsafe(self.loop.stop)
-        self.loop_thread.join()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Close the aiohttp session and stop the provider's event-loop thread."""
+        if not self.loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self.cleanup(), self.loop).result(timeout)
+        if threading.current_thread() is not self.loop_thread:
+            self.loop_thread.join(timeout)
 
     async def refill_token_pool(self) -> None:
         """Asynchronously prefill the token pool with account tokens."""
@@ -107,28 +123,37 @@ class HearlingTTSProvider(BaseTTSProvider):
 
     async def download_audio(self, url: str, filename: str) -> None:
         """Download an audio file from the URL asynchronously."""
+        import aiofiles
         async with self.session.get(url) as response:
             async with aiofiles.open(filename, 'wb') as f:
                 await f.write(await response.read())
 
-    async def _async_generate_speech(self, text: str, voice: Optional[str], output_path: str) -> None:
-        """The asynchronous implementation of speech generation via Hearling API."""
+    async def _async_generate_speech(self, text: str, voice: Optional[str], output_path: str, parent=None) -> None:
+        """
+        The asynchronous implementation of speech generation via Hearling API.
+        parent is the caller's tracing span, since the coroutine runs on the provider's own loop.
+        """
         try:
-            token = await self.get_token()
-            if not token:
-                raise Exception("Failed to get token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-            # Choose the provided voice if valid; otherwise, use the first voice.
-            selected_voice = voice if (voice in self.AVAILABLE_VOICES) else self.AVAILABLE_VOICES[0]
-            payload = {"text": text, "voice": selected_voice}
-
-            async with self.session.post(self.url_clips, headers=headers, json=payload) as response:
-                response.raise_for_status()
-                data = await response.json()
-                audio_url = data['clip']['location']
-
-            await self.download_audio(audio_url, output_path)
+            with use_span(parent):
+                with span("tts.get_token"):
+                    token = await self.get_token()
+                if not token:
+                    raise Exception("Failed to get token")
+                headers = {"Authorization": f"Bearer {token}"}
+
+                # Choose the provided voice if valid; otherwise, use the first voice.
+                selected_voice = voice if (voice in self.AVAILABLE_VOICES) else self.AVAILABLE_VOICES[0]
+                payload = {"text": text, "voice": selected_voice}
+
+                with span("tts.create_clip") as s:
+                    async with self.session.post(self.url_clips, headers=headers, json=payload) as response:
+                        s.set_attribute("status", response.status)
+                        response.raise_for_status()
+                        data = await response.json()
+                        audio_url = data['clip']['location']
+
+                with span("tts.download"):
+                    await self.download_audio(audio_url, output_path)
 
             # Refill token pool asynchronously.
             if not self.is_closing:
@@ -143,14 +168,15 @@ class HearlingTTSProvider(BaseTTSProvider):
         Returns the path to the generated audio file.
         """
         file_path = output_path if output_path else self.temp_audio_path
-        future = asyncio.run_coroutine_threadsafe(
-            self._async_generate_speech(text, voice, file_path), self.loop
-        )
-        try:
-            future.result()  # Block until the coroutine completes.
-        except Exception as e:
-            logger.error(f"Error in generate_speech: {e}")
-            raise
+        with span("tts.generate_speech", provider=self.PROVIDER_NAME, voice=voice or "", chars=len(text)):
+            future = asyncio.run_coroutine_threadsafe(
+                self._async_generate_speech(text, voice, file_path, current_span()), self.loop
+            )
+            try:
+                future.result()  # Block until the coroutine completes.
+            except Exception as e:
+                logger.error(f"Error in generate_speech: {e}")
+                raise
         return file_path
 
     def speak(self, text: str, voice: Optional[str] = None) -> None:
@@ -178,7 +204,7 @@ class HearlingTTSProvider(BaseTTSProvider):
         Note that errors during __del__ are logged.
         """
         try:
-            if hasattr(self, 'loop') and self.loop.is_running():
-                asyncio.run_coroutine_threadsafe(self.cleanup(), self.loop).result()
+            if hasattr(self, 'loop') and threading.current_thread() is not self.loop_thread:
+                self.close()
         except Exception as e:
             logger.error(f"Error during cleanup in __del__: {e}")
@@ -1,10 +1,10 @@
 import os
-import requests
-import base64
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 from core.logger import get_logger
+from core.tracing import span
 from voice.text_to_speech.base import BaseTTSProvider
+from voice.text_to_speech.json_audio import RESPONSE_CHUNK_SIZE, iter_base64_field
 from utils.helpers import play_audio
 
 logger = get_logger(__name__)
@@ -17,6 +17,8 @@ class SpeechifyTTSProvider(BaseTTSProvider):
     """
     
     PROVIDER_NAME = "speechify"
+    DEFAULT_BASE_URL = "https://audio.api.speechify.com"
+    BASE_URL_ENV = "SPEECHIFY_TTS_BASE_URL"
     
     # Available voice models
     VOICE_MODELS = {
@@ -29,15 +31,18 @@ class SpeechifyTTSProvider(BaseTTSProvider):
         "narrator": "narrator"
     }
     
-    def __init__(self, default_voice: str = "mrbeast"):
+    def __init__(self, default_voice: str = "mrbeast", base_url: Optional[str] = None):
         """
         Initialize the Speechify TTS provider.
         
         Args:
             default_voice (str): Default voice to use
+            base_url (Optional[str]): API base URL override; defaults to $SPEECHIFY_TTS_BASE_URL
+                                      or https://audio.api.speechify.com
         """
         super().__init__()
-        self.api_url = "https://audio.api.speechify.com/generateAudioFiles"
+        self.api_url = f"{self.resolve_base_url(base_url)}/generateAudioFiles"
+        self.session = self._new_session()
         self.default_voice = default_voice
         self.temp_audio_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
                                            "../../../../data/cache/temp_audio.mp3")
@@ -47,6 +52,12 @@ class SpeechifyTTSProvider(BaseTTSProvider):
         
         logger.info(f"Initialized Speechify TTS provider with default voice: {default_voice}")
 
+    def warmup(self) -> None:
+        """
+        Open a pooled connection to the API so the first request skips DNS and TLS.
+        """
+        self._warm_connection(self.session, self.api_url)
+
     def generate_speech(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None) -> str:
         """
         Generate speech using Speechify's API.
@@ -69,7 +80,17 @@ class SpeechifyTTSProvider(BaseTTSProvider):
         except Exception as e:
             logger.warning(f"Failed to remove existing audio file: {e}")
         
-        # Prepare request
+        # Save audio file as the response arrives
+        with span("tts.generate_speech", provider=self.PROVIDER_NAME, voice=voice_name, chars=len(text)):
+            self._write_audio(self._request_audio(text, voice_name), file_path)
+        
+        return file_path
+    
+    def _request_audio(self, text: str, voice_name: str, block_size: int = RESPONSE_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Send the request and yield the audio as it is decoded from the response,
+        without holding the whole JSON body or base64 string in memory.
+        """
         payload = {
             "audioFormat": "mp3",
             "paragraphChunks": [text],
@@ -81,19 +102,23 @@ class SpeechifyTTSProvider(BaseTTSProvider):
         }
         
         try:
-            response = requests.post(self.api_url, json=payload)
-            response.raise_for_status()
-            
-            # Save audio file
-            audio_data = base64.b64decode(response.json()['audioStream'])
-            with open(file_path, 'wb') as audio_file:
-                audio_file.write(audio_data)
-            
-            return file_path
-            
+            with span("tts.http") as s:
+                response = self.session.post(self.api_url, json=payload, stream=True)
+                s.set_attributes(status=response.status_code, ttfb_ms=response.elapsed.total_seconds() * 1000)
+            with response:
+                response.raise_for_status()
+                yield from iter_base64_field(response.iter_content(RESPONSE_CHUNK_SIZE), 'audioStream', block_size)
         except Exception as e:
             logger.error(f"Failed to generate speech with Speechify: {e}")
             raise
+    
+    def _synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        voice_name = voice if voice in self.VOICE_MODELS else self.default_voice
+        return b"".join(self._request_audio(text, voice_name))
+    
+    def _stream_speech(self, text: str, voice: Optional[str], chunk_size: int) -> Iterator[bytes]:
+        voice_name = voice if voice in self.VOICE_MODELS else self.default_voice
+        return self._request_audio(text, voice_name, chunk_size)
 
     def speak(self, text: str, voice: Optional[str] = None) -> None:
         """
@@ -1,10 +1,12 @@
 import os
 import json
-import base64
 import requests
-from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+from typing import Optional, Dict, Any, Iterator
 from core.logger import get_logger
+from core.tracing import span
 from voice.text_to_speech.base import BaseTTSProvider
+from voice.text_to_speech.json_audio import RESPONSE_CHUNK_SIZE, iter_base64_field
 
 logger = get_logger(__name__)
 
@@ -23,8 +25,10 @@ class TikTokTTSProvider(BaseTTSProvider):
       • en_female_f08_salut_damour
 
     To select the underlying API, provide variant="gesserit" or variant="weilbyte" when initializing.
+    Passing base_url (or setting $TIKTOK_TTS_BASE_URL) keeps the variant's path but swaps its host.
     """
     PROVIDER_NAME = "tiktok"
+    BASE_URL_ENV = "TIKTOK_TTS_BASE_URL"
 
     VOICE_OPTIONS = (
         "en_au_001",
@@ -46,13 +50,14 @@ class TikTokTTSProvider(BaseTTSProvider):
         "weilbyte": "data",
     }
 
-    def __init__(self, variant: str = "gesserit", default_voice: str = "en_us_rocket"):
+    def __init__(self, variant: str = "gesserit", default_voice: str = "en_us_rocket", base_url: Optional[str] = None):
         """
         Initialize the tiktok API TTS provider.
         
         Args:
             variant (str): Which underlying API variant to use ("gesserit" or "weilbyte").
             default_voice (str): The default voice to use.
+            base_url (Optional[str]): Replaces scheme and host of the variant's endpoint.
         """
         super().__init__()
         if variant not in self.API_ENDPOINTS:
@@ -63,7 +68,11 @@ class TikTokTTSProvider(BaseTTSProvider):
             raise ValueError(f"Invalid default voice. Must be one of: {', '.join(self.voice_options)}")
         self.default_voice = default_voice
         self.api_endpoint = self.API_ENDPOINTS[variant]
+        base_url = self.resolve_base_url(base_url)
+        if base_url:
+            self.api_endpoint = base_url + urlsplit(self.api_endpoint).path
         self.request_data_key = self.REQUEST_DATA_KEYS[variant]
+        self.session = self._new_session()
         self.temp_audio_path = os.path.join(
             os.path.dirname(os.path.abspath(__file__)),
             "../../../../data/cache/temp_audio.mp3"
@@ -71,6 +80,12 @@ class TikTokTTSProvider(BaseTTSProvider):
         os.makedirs(os.path.dirname(self.temp_audio_path), exist_ok=True)
         logger.info(f"Initialized tiktokAPITTSProvider using variant '{variant}' with default voice: {default_voice}")
 
+    def warmup(self) -> None:
+        """
+        Open a pooled connection to the API so the first request skips DNS and TLS.
+        """
+        self._warm_connection(self.session, self.api_endpoint)
+
     def generate_speech(self, text: str, voice: Optional[str] = None, output_path: Optional[str] = None) -> str:
         """
         Convert text to speech using the selected API.
@@ -94,25 +109,43 @@ class TikTokTTSProvider(BaseTTSProvider):
             except Exception as e:
                 logger.warning(f"Couldn't remove existing temporary file: {e}")
 
+        with span("tts.generate_speech", provider=self.PROVIDER_NAME, voice=voice, chars=len(text)):
+            try:
+                self._write_audio(self._request_audio(text, voice), file_path)
+            except requests.RequestException:
+                raise
+            except Exception as e:
+                logger.error(f"Error saving audio data: {e}")
+                raise
+
+        return file_path
+
+    def _request_audio(self, text: str, voice: str, block_size: int = RESPONSE_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Send the request and yield the audio as it is decoded from the response,
+        without holding the whole JSON body or base64 string in memory.
+        """
         headers = {"Content-Type": "application/json"}
         payload = {"text": text, "voice": voice}
 
         try:
-            response = requests.post(self.api_endpoint, headers=headers, data=json.dumps(payload))
-            response.raise_for_status()
+            with span("tts.http") as s:
+                response = self.session.post(self.api_endpoint, headers=headers, data=json.dumps(payload), stream=True)
+                s.set_attributes(status=response.status_code, ttfb_ms=response.elapsed.total_seconds() * 1000)
+            with response:
+                response.raise_for_status()
+                yield from iter_base64_field(response.iter_content(RESPONSE_CHUNK_SIZE), self.request_data_key, block_size)
         except requests.RequestException as e:
             logger.error(f"Request to {self.api_endpoint} failed: {e}")
             raise
 
-        try:
-            audio_data = base64.b64decode(response.json()[self.request_data_key])
-            with open(file_path, "wb") as f:
-                f.write(audio_data)
-        except Exception as e:
-            logger.error(f"Error saving audio data: {e}")
-            raise
+    def _synthesize(self, text: str, voice: Optional[str] = None) -> bytes:
+        voice = voice if (voice and voice in self.voice_options) else self.default_voice
+        return b"".join(self._request_audio(text, voice))
 
-        return file_path
+    def _stream_speech(self, text: str, voice: Optional[str], chunk_size: int) -> Iterator[bytes]:
+        voice = voice if (voice and voice in self.voice_options) else self.default_voice
+        return self._request_audio(text, voice, chunk_size)
 
     def speak(self, text: str, voice: Optional[str] = None) -> None:
         """
@@ -0,0 +1,314 @@
+"""
+Priority and deadline scheduling of provider calls.
+
+Every provider gets a fixed number of concurrent calls ("slots"). Requests
+that find no free slot wait in a queue ordered by priority class, then
+deadline, then arrival, so a live reply never queues behind a warm-up run:
+
+    INTERACTIVE  a user is waiting for this audio right now
+    PREFETCH     audio that will be needed shortly (later sentences of a reply)
+    BATCH        background work: cache warm-up, bulk rendering
+
+Non-interactive work may only occupy `limit - reserved_interactive` slots
+of a provider, so there is always a slot an interactive request can take
+without waiting for a batch call to finish. Batch work is preempted at slot
+boundaries: as soon as interactive requests are queued, no queued batch or
+prefetch request is admitted until they have all been served. A call that
+has already reached the provider runs to completion.
+
+A request whose deadline (a time.monotonic() value) passes while it is
+queued is dropped with DeadlineExceeded instead of occupying a slot for
+audio nobody will play.
+
+    scheduler = SynthesisScheduler(max_concurrency=4)
+    with scheduler.slot("deepgram", Priority.BATCH):
+        provider.synthesize(text)
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from core.logger import get_logger
+from voice.text_to_speech import metrics
+
+logger = get_logger(__name__)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    PREFETCH = 1
+    BATCH = 2
+
+
+class DeadlineExceeded(TimeoutError):
+    """Exception raised when a request's deadline passes before it gets a provider slot."""
+    pass
+
+
+def parse_priority(value) -> Priority:
+    """
+    Convert a Priority, its name ("interactive", "prefetch", "batch") or its value.
+
+    Raises:
+        ValueError: If value names no priority class.
+    """
+    if isinstance(value, Priority):
+        return value
+    try:
+        return Priority[str(value).upper()] if not str(value).isdigit() else Priority(int(value))
+    except (KeyError, ValueError):
+        available = ", ".join(p.name.lower() for p in Priority)
+        raise ValueError(f"Invalid priority '{value}'. Available priorities: {available}")
+
+
+class _Ticket:
+    """A queued request."""
+
+    __slots__ = ("priority", "deadline", "enqueued", "wake", "admitted", "expired", "cancelled")
+
+    def __init__(self, priority: Priority, deadline: Optional[float], wake: Callable[[], None]):
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued = time.monotonic()
+        self.wake = wake
+        self.admitted = False
+        self.expired = False
+        self.cancelled = False
+
+
+class _ProviderQueue:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.heap: List[tuple] = []
+        self.queued = {priority: 0 for priority in Priority}
+
+
+class SynthesisScheduler:
+    """
+    Admits provider calls by priority class and deadline, with a fixed number
+    of concurrent calls per provider. Thread-safe; sync callers block on an
+    event and async callers await a future, so waiting never ties up an
+    executor thread.
+    """
+
+    def __init__(self, max_concurrency: int = 4, reserved_interactive: int = 1,
+                 limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency (int): Concurrent calls per provider.
+            reserved_interactive (int): Slots per provider that only interactive requests may use.
+            limits (Optional[Dict[str, int]]): Per-provider overrides of max_concurrency.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserved_interactive = max(0, reserved_interactive)
+        self.limits = dict(limits or {})
+        self._lock = threading.Lock()
+        self._queues: Dict[str, _ProviderQueue] = {}
+        self._sequence = itertools.count()
+        self._admitted = {priority: 0 for priority in Priority}
+        self._expired = {priority: 0 for priority in Priority}
+        self._wait_total = {priority: 0.0 for priority in Priority}
+        self._wait_max = {priority: 0.0 for priority in Priority}
+
+    def _queue(self, provider: str) -> _ProviderQueue:
+        queue = self._queues.get(provider)
+        if queue is None:
+            queue = self._queues[provider] = _ProviderQueue(max(1, self.limits.get(provider, self.max_concurrency)))
+        return queue
+
+    def _can_admit(self, queue: _ProviderQueue, priority: Priority) -> bool:
+        if priority == Priority.INTERACTIVE:
+            return queue.active < queue.limit
+        return queue.active < max(1, queue.limit - self.reserved_interactive)
+
+    def _admit(self, provider: str, queue: _ProviderQueue, ticket: _Ticket) -> None:
+        queue.active += 1
+        ticket.admitted = True
+        waited = time.monotonic() - ticket.enqueued
+        self._admitted[ticket.priority] += 1
+        self._wait_total[ticket.priority] += waited
+        self._wait_max[ticket.priority] = max(self._wait_max[ticket.priority], waited)
+        metrics.SCHEDULER_WAIT.labels(provider, ticket.priority.name.lower()).observe(waited)
+
+    def _expire(self, provider: str, ticket: _Ticket) -> None:
+        ticket.expired = True
+        self._expired[ticket.priority] += 1
+        metrics.SCHEDULER_EXPIRED.labels(provider, ticket.priority.name.lower()).inc()
+
+    def _unqueue(self, provider: str, queue: _ProviderQueue, ticket: _Ticket) -> None:
+        queue.queued[ticket.priority] -= 1
+        metrics.SCHEDULER_QUEUED.labels(provider, ticket.priority.name.lower()).dec()
+
+    def _dispatch(self, provider: str, queue: _ProviderQueue) -> None:
+        now = time.monotonic()
+        while queue.heap:
+            ticket = queue.heap[0][-1]
+            if ticket.cancelled:
+                heapq.heappop(queue.heap)
+                continue
+            if ticket.deadline is not None and ticket.deadline <= now:
+                heapq.heappop(queue.heap)
+                self._unqueue(provider, queue, ticket)
+                self._expire(provider, ticket)
+                ticket.wake()
+                continue
+            if not self._can_admit(queue, ticket.priority):
+                return
+            heapq.heappop(queue.heap)
+            self._unqueue(provider, queue, ticket)
+            self._admit(provider, queue, ticket)
+            ticket.wake()
+
+    def _enqueue(self, provider: str, priority, deadline: Optional[float],
+                 wake: Callable[[], None]) -> Optional[_Ticket]:
+        """Admit the request at once and return None, or queue it and return its ticket."""
+        priority = parse_priority(priority)
+        ticket = _Ticket(priority, deadline, wake)
+        with self._lock:
+            if deadline is not None and deadline <= ticket.enqueued:
+                self._expire(provider, ticket)
+                raise DeadlineExceeded(f"Deadline passed before the {priority.name.lower()} request was queued.")
+            queue = self._queue(provider)
+            ahead = queue.heap and queue.heap[0][0] <= priority
+            if not ahead and self._can_admit(queue, priority):
+                self._admit(provider, queue, ticket)
+                return None
+            entry = (priority, deadline if deadline is not None else float("inf"), next(self._sequence), ticket)
+            heapq.heappush(queue.heap, entry)
+            queue.queued[priority] += 1
+            metrics.SCHEDULER_QUEUED.labels(provider, priority.name.lower()).inc()
+            # Withdrawn tickets may still sit at the top of the heap; let them go now.
+            self._dispatch(provider, queue)
+            return ticket
+
+    def _settle(self, provider: str, ticket: _Ticket, abandon: bool = False) -> None:
+        """
+        Resolve a ticket after its wait ended: return if it was admitted, raise
+        DeadlineExceeded if it expired, or withdraw it from the queue.
+        """
+        with self._lock:
+            if ticket.admitted and not abandon:
+                return
+            if ticket.admitted:
+                self._release(provider)
+                return
+            if not ticket.expired and not ticket.cancelled:
+                ticket.cancelled = True
+                self._unqueue(provider, self._queue(provider), ticket)
+                if not abandon:
+                    self._expire(provider, ticket)
+        if not abandon:
+            raise DeadlineExceeded(f"Deadline passed while the {ticket.priority.name.lower()} request was queued "
+                                   f"for {provider} ({time.monotonic() - ticket.enqueued:.3f}s).")
+
+    def acquire(self, provider: str, priority=Priority.INTERACTIVE, deadline: Optional[float] = None) -> None:
+        """
+        Block until a slot of provider is free for this request. Pair with release().
+
+        Args:
+            provider (str): PROVIDER_NAME of the provider to call.
+            priority (Priority | str): Priority class of the request.
+            deadline (Optional[float]): time.monotonic() value after which the request is dropped.
+
+        Raises:
+            DeadlineExceeded: If the deadline passes before a slot is free.
+        """
+        event = threading.Event()
+        ticket = self._enqueue(provider, priority, deadline, event.set)
+        if ticket is None:
+            return
+        try:
+            event.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            self._settle(provider, ticket, abandon=True)
+            raise
+        self._settle(provider, ticket)
+
+    async def acquire_async(self, provider: str, priority=Priority.INTERACTIVE,
+                            deadline: Optional[float] = None) -> None:
+        """
+        Async variant of acquire(). Cancelling the waiting coroutine withdraws the request.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+            except RuntimeError:  # Loop already closed.
+                pass
+
+        ticket = self._enqueue(provider, priority, deadline, wake)
+        if ticket is None:
+            return
+        try:
+            await asyncio.wait({future}, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            self._settle(provider, ticket, abandon=True)
+            raise
+        self._settle(provider, ticket)
+
+    def _release(self, provider: str) -> None:
+        queue = self._queue(provider)
+        queue.active -= 1
+        self._dispatch(provider, queue)
+
+    def release(self, provider: str) -> None:
+        """
+        Free a slot taken with acquire() and admit the next queued request.
+        """
+        with self._lock:
+            self._release(provider)
+
+    @contextmanager
+    def slot(self, provider: str, priority=Priority.INTERACTIVE, deadline: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold a slot of provider for the duration of the with block.
+        """
+        self.acquire(provider, priority, deadline)
+        try:
+            yield
+        finally:
+            self.release(provider)
+
+    @asynccontextmanager
+    async def aslot(self, provider: str, priority=Priority.INTERACTIVE,
+                    deadline: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Async variant of slot().
+        """
+        await self.acquire_async(provider, priority, deadline)
+        try:
+            yield
+        finally:
+            self.release(provider)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Slots in use and queue lengths per provider, and admissions, expirations
+        and queue wait times per priority class.
+        """
+        with self._lock:
+            providers = {
+                name: {"active": queue.active, "limit": queue.limit,
+                       "queued": {p.name.lower(): n for p, n in queue.queued.items()}}
+                for name, queue in self._queues.items()
+            }
+            classes = {
+                p.name.lower(): {
+                    "admitted": self._admitted[p],
+                    "expired": self._expired[p],
+                    "mean_wait_ms": round(self._wait_total[p] / self._admitted[p] * 1000, 3) if self._admitted[p] else 0.0,
+                    "max_wait_ms": round(self._wait_max[p] * 1000, 3),
+                }
+                for p in Priority
+            }
+        return {"providers": providers, "priorities": classes}
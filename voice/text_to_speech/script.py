@@ -0,0 +1,258 @@
+"""
+Multi-speaker script rendering.
+
+Run with:
+    python -m voice.text_to_speech.script dialogue.json output/dialogue.mp3
+
+Script files are JSON:
+    {
+      "speakers": {"host": {"provider": "deepgram", "voice": "aura_luna"},
+                   "guest": {"provider": "speechify", "voice": "snoop"}},
+      "pause_ms": 300,
+      "lines": [{"speaker": "host", "text": "Welcome back."},
+                {"speaker": "guest", "text": "Good to be here.", "pause_ms": 800}, ...]
+    }
+
+A line's pause_ms overrides the silence after that line. All lines are
+synthesized at once, at most `provider_limit` per provider, and joined in
+script order as soon as each line and all lines before it are ready, so a
+render takes about as long as its slowest line. The timing manifest
+(<output>.json by default) records where every line sits in the output.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from core.logger import get_logger
+from voice.text_to_speech.active_provider import TTSProviderManager, tts_manager
+from voice.text_to_speech.assembler import AudioAssembler
+from voice.text_to_speech.scheduler import Priority
+
+logger = get_logger(__name__)
+
+DEFAULT_PAUSE_MS = 300.0
+DEFAULT_PROVIDER_LIMIT = 4
+
+
+class ScriptRenderError(Exception):
+    """Exception raised when a script is invalid or one of its lines can't be synthesized."""
+    pass
+
+
+def load_script(script_path: str) -> Dict[str, Any]:
+    """
+    Read a script file.
+
+    Returns:
+        Dict[str, Any]: The script with "speakers", "lines" and optional "pause_ms".
+
+    Raises:
+        ScriptRenderError: If the file is not a valid script.
+    """
+    try:
+        with open(script_path, "r", encoding="utf-8") as f:
+            script = json.load(f)
+    except ValueError as e:
+        raise ScriptRenderError(f"Script is not valid JSON: {script_path}: {e}") from e
+    if not isinstance(script.get("lines"), list):
+        raise ScriptRenderError(f"Script has no 'lines' list: {script_path}")
+    return script
+
+
+class ScriptRenderer:
+    """
+    Renders a list of (speaker, text) lines into one audio file.
+
+    Speakers map to a provider and voice, so a dialogue can mix voices from
+    different providers. Lines go through the manager, so cached lines are
+    not synthesized again and repeated lines are synthesized once. They are
+    never routed to the short-text or fallback provider, whose voice would
+    not match the speaker; a failing provider fails the render instead.
+    """
+
+    def __init__(self, speakers: Dict[str, Dict[str, Optional[str]]], manager: TTSProviderManager = tts_manager,
+                 pause_ms: float = DEFAULT_PAUSE_MS, max_concurrency: int = 16,
+                 provider_limit: int = DEFAULT_PROVIDER_LIMIT, provider_limits: Optional[Dict[str, int]] = None,
+                 crossfade_ms: float = 15.0, priority=Priority.PREFETCH):
+        """
+        Initialize the renderer.
+
+        Args:
+            speakers (Dict[str, Dict[str, Optional[str]]]): Speaker name -> {"provider": ..., "voice": ...};
+                                                           a missing provider or voice uses the default.
+            manager (TTSProviderManager): Manager whose providers and cache are used.
+            pause_ms (float): Silence between consecutive lines.
+            max_concurrency (int): Maximum number of lines synthesized at once.
+            provider_limit (int): Maximum number of concurrent calls per provider.
+            provider_limits (Optional[Dict[str, int]]): Per-provider overrides of provider_limit.
+            crossfade_ms (float): Crossfade between lines rendered with no pause between them.
+            priority (Priority | str): Scheduling class of the line requests.
+        """
+        self.speakers = speakers
+        self.manager = manager
+        self.pause_ms = pause_ms
+        self.max_concurrency = max(1, max_concurrency)
+        self.provider_limit = max(1, provider_limit)
+        self.provider_limits = dict(provider_limits or {})
+        self.crossfade_ms = crossfade_ms
+        self.priority = priority
+
+        self._limits_lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+
+    def _semaphore(self, provider_name: str) -> threading.Semaphore:
+        with self._limits_lock:
+            semaphore = self._semaphores.get(provider_name)
+            if semaphore is None:
+                limit = max(1, self.provider_limits.get(provider_name, self.provider_limit))
+                semaphore = self._semaphores[provider_name] = threading.Semaphore(limit)
+            return semaphore
+
+    def _normalize(self, lines: Iterable[Union[Dict[str, Any], Sequence[str]]]) -> List[Dict[str, Any]]:
+        normalized = []
+        for number, line in enumerate(lines, start=1):
+            if not isinstance(line, dict):
+                speaker, text = line
+                line = {"speaker": speaker, "text": text}
+            if line.get("speaker") not in self.speakers:
+                raise ScriptRenderError(f"Line {number} has unknown speaker '{line.get('speaker')}'.")
+            if not (line.get("text") or "").strip():
+                raise ScriptRenderError(f"Line {number} has no text.")
+            speaker = self.speakers[line["speaker"]] or {}
+            try:
+                provider = self.manager.get_provider(speaker.get("provider"))
+            except ValueError as e:
+                raise ScriptRenderError(f"Speaker '{line['speaker']}': {e}") from e
+            if provider is None:
+                raise ScriptRenderError("No active TTS provider for speakers without a provider.")
+            normalized.append({
+                "index": number - 1,
+                "speaker": line["speaker"],
+                "text": line["text"].strip(),
+                "provider": provider.PROVIDER_NAME,
+                "voice": speaker.get("voice"),
+                "pause_ms": float(line.get("pause_ms", self.pause_ms)),
+            })
+        if not normalized:
+            raise ScriptRenderError("Script has no lines.")
+        return normalized
+
+    def _synthesize(self, line: Dict[str, Any]) -> Tuple[bytes, float]:
+        with self._semaphore(line["provider"]):
+            start = time.perf_counter()
+            data = self.manager.synthesize(line["text"], line["voice"], line["provider"], self.priority,
+                                           fallback=False)
+        if not data:
+            raise ScriptRenderError(f"Line {line['index'] + 1} produced no audio.")
+        return data, time.perf_counter() - start
+
+    def render(self, lines: Iterable[Union[Dict[str, Any], Sequence[str]]], output_path: str,
+               manifest_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Synthesize all lines concurrently and join them in order into output_path.
+
+        Args:
+            lines (Iterable): {"speaker", "text", optional "pause_ms"} dicts or (speaker, text) pairs.
+            output_path (str): Destination file; the container is chosen from its extension.
+            manifest_path (Optional[str]): Where to write the timing manifest; defaults to
+                                           output_path with a .json extension.
+
+        Returns:
+            Dict[str, Any]: The timing manifest: output, duration_ms, render_ms and per line
+                            speaker, provider, voice, text, start_ms, end_ms and synth_ms.
+
+        Raises:
+            ScriptRenderError: If the script is invalid or a line fails; no output is kept then.
+        """
+        lines = self._normalize(lines)
+        manifest_path = manifest_path or os.path.splitext(output_path)[0] + ".json"
+        started = time.perf_counter()
+        entries = []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(lines)),
+                                thread_name_prefix="ScriptRenderer") as executor:
+            futures = [executor.submit(self._synthesize, line) for line in lines]
+            try:
+                with AudioAssembler(output_path, crossfade_ms=self.crossfade_ms) as assembler:
+                    for line, future in zip(lines, futures):
+                        try:
+                            data, synth_seconds = future.result()
+                        except ScriptRenderError:
+                            raise
+                        except Exception as e:
+                            raise ScriptRenderError(f"Line {line['index'] + 1} ({line['speaker']}) failed: {e}") from e
+                        start, end = assembler.add_segment(data)
+                        rate = assembler.sample_rate
+                        entries.append({
+                            "index": line["index"],
+                            "speaker": line["speaker"],
+                            "provider": line["provider"],
+                            "voice": line["voice"],
+                            "text": line["text"],
+                            "start_ms": round(start * 1000 / rate, 1),
+                            "end_ms": round(end * 1000 / rate, 1),
+                            "synth_ms": round(synth_seconds * 1000, 1),
+                        })
+                        if line is not lines[-1] and line["pause_ms"] > 0:
+                            assembler.add_silence(line["pause_ms"])
+                    duration_ms = round(assembler.position * 1000 / assembler.sample_rate, 1)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise
+
+        manifest = {
+            "output": output_path,
+            "duration_ms": duration_ms,
+            "render_ms": round((time.perf_counter() - started) * 1000, 1),
+            "lines": entries,
+        }
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        slowest = max(entry["synth_ms"] for entry in entries)
+        logger.info(f"Rendered {len(entries)} lines to {output_path} in {manifest['render_ms']} ms "
+                    f"(slowest line {slowest} ms)")
+        return manifest
+
+
+def render_script(script: Dict[str, Any], output_path: str, manager: TTSProviderManager = tts_manager,
+                  **kwargs) -> Dict[str, Any]:
+    """
+    Render a script as loaded by load_script(). kwargs are passed to ScriptRenderer;
+    the script's own pause_ms is used unless pause_ms is given.
+    """
+    kwargs.setdefault("pause_ms", script.get("pause_ms", DEFAULT_PAUSE_MS))
+    manifest_path = kwargs.pop("manifest_path", None)
+    renderer = ScriptRenderer(script.get("speakers") or {}, manager, **kwargs)
+    return renderer.render(script["lines"], output_path, manifest_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render a multi-speaker script into one audio file.")
+    parser.add_argument("script", help="Script JSON file")
+    parser.add_argument("output", help="Output audio file (.mp3 or .wav)")
+    parser.add_argument("--manifest", default=None, help="Timing manifest path (default: <output>.json)")
+    parser.add_argument("--pause-ms", type=float, default=None, help="Silence between lines (default: from the script)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Lines synthesized at once")
+    parser.add_argument("--provider-limit", type=int, default=DEFAULT_PROVIDER_LIMIT,
+                        help="Concurrent calls per provider")
+    parser.add_argument("--provider", default="deepgram", help="Provider of speakers that don't name one")
+    args = parser.parse_args()
+
+    tts_manager.initialize(args.provider)
+    options = {"max_concurrency": args.concurrency, "provider_limit": args.provider_limit,
+               "manifest_path": args.manifest}
+    if args.pause_ms is not None:
+        options["pause_ms"] = args.pause_ms
+    manifest = render_script(load_script(args.script), args.output, **options)
+    print(json.dumps({key: manifest[key] for key in ("output", "duration_ms", "render_ms")}))
+
+
+if __name__ == "__main__":
+    main()
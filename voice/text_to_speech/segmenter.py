@@ -0,0 +1,86 @@
+import re
+from typing import List
+
+# Sentence-final punctuation, optionally followed by closing quotes/brackets, then whitespace.
+_BOUNDARY = re.compile(r"([.!?…]+[\"'”’)\]]*)\s+|\n\s*\n")
+
+_ABBREVIATIONS = {
+    "mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "vs.", "etc.",
+    "e.g.", "i.e.", "a.m.", "p.m.", "no.", "fig.", "approx.",
+}
+
+
+class SentenceSegmenter:
+    """
+    Incrementally splits a stream of text fragments into sentences.
+
+    A sentence is emitted only once the whitespace after its final punctuation
+    has arrived, so fragments such as "3." followed by "5 percent" are not
+    split. Text that grows past max_chars without a boundary is cut at the
+    last comma or space so synthesis can start on very long sentences.
+    """
+
+    def __init__(self, max_chars: int = 300, min_chars: int = 2):
+        """
+        Initialize the segmenter.
+
+        Args:
+            max_chars (int): Force a split once this many characters are buffered.
+            min_chars (int): Boundaries that would produce a shorter sentence are skipped.
+        """
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    @property
+    def pending(self) -> str:
+        """Text received but not yet emitted."""
+        return self._buffer
+
+    def reset(self) -> None:
+        """Discard any buffered text."""
+        self._buffer = ""
+
+    def _is_abbreviation(self, end: int) -> bool:
+        words = self._buffer[:end].rsplit(None, 1)
+        return bool(words) and words[-1].lower() in _ABBREVIATIONS
+
+    def feed(self, fragment: str) -> List[str]:
+        """
+        Add a text fragment.
+
+        Args:
+            fragment (str): Next piece of text, e.g. an LLM token.
+
+        Returns:
+            List[str]: Sentences completed by this fragment, in order.
+        """
+        self._buffer += fragment
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            end = match.end(1) if match.group(1) else match.start()
+            candidate = self._buffer[start:end].strip()
+            if len(candidate) < self.min_chars or (match.group(1) and self._is_abbreviation(end)):
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+
+        while len(self._buffer) > self.max_chars:
+            cut = max(self._buffer.rfind(", ", 0, self.max_chars), self._buffer.rfind(" ", 0, self.max_chars))
+            cut = cut + 1 if cut > 0 else self.max_chars
+            sentences.append(self._buffer[:cut].strip())
+            self._buffer = self._buffer[cut:].lstrip()
+        return [s for s in sentences if s]
+
+    def flush(self) -> List[str]:
+        """
+        Emit whatever is buffered as a final sentence.
+
+        Returns:
+            List[str]: The remaining text as a single sentence, or an empty list.
+        """
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
@@ -0,0 +1,504 @@
+"""
+Local HTTP synthesis service.
+
+Run with:
+    python -m voice.text_to_speech.server --provider deepgram --port 8765
+
+Endpoints:
+    GET|POST /synthesize  text, voice, provider, priority, deadline_ms -> audio streamed with chunked
+                          transfer encoding
+    GET      /voices      voices of the default provider, or of ?provider=
+    GET      /health      liveness and load information
+    GET      /metrics     Prometheus metrics of the whole process
+    GET      /stream      WebSocket: push text fragments, receive audio per sentence
+
+Every endpoint uses the provider the server was started with unless the
+request names another one; providers are loaded on first use and shared.
+With --fallback-provider, a request whose provider fails is answered by that
+provider instead, and --short-text-provider answers short prompts that name
+no provider; the Content-Type follows the audio actually returned.
+--warmup connects to and probes the configured providers at startup and
+--probe-interval keeps probing the loaded ones; a provider whose last probe
+failed goes straight to the fallback, and /health lists every probe result.
+With --provider-concurrency, provider calls go through a SynthesisScheduler:
+/synthesize runs at `priority` (interactive by default, or prefetch/batch)
+and answers 504 if it is still queued after `deadline_ms`; /stream runs the
+sentence being waited for at interactive and those behind it at prefetch.
+
+WebSocket protocol (/stream?voice=...&provider=...):
+    client -> server  {"type": "text", "text": "..."}   (a bare text frame works too)
+                      {"type": "flush"}                 synthesize the buffered remainder
+                      {"type": "cancel"}                drop buffered and queued sentences
+    server -> client  {"type": "segment_start", "index": n, "text": "..."}
+                      binary frames with the sentence audio
+                      {"type": "segment_end", "index": n}
+                      {"type": "flushed"} / {"type": "cancelled"} / {"type": "error", ...}
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from aiohttp import web
+
+from core.logger import get_logger
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
+from core.tracing import wrap_context
+from voice.text_to_speech import metrics
+from voice.text_to_speech.active_provider import TTSProviderManager, tts_manager
+from voice.text_to_speech.base import detect_audio_format
+from voice.text_to_speech.bundle import import_bundle
+from voice.text_to_speech.cache import SynthesisCache
+from voice.text_to_speech.packed_cache import PackedSynthesisCache
+from voice.text_to_speech.scheduler import DeadlineExceeded, Priority, SynthesisScheduler, parse_priority
+from voice.text_to_speech.segmenter import SentenceSegmenter
+from voice.text_to_speech.transcoding_cache import DEFAULT_BITRATE, TranscodingCache
+
+logger = get_logger(__name__)
+
+CONTENT_TYPES = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "opus": "audio/ogg",
+}
+
+_END = object()
+
+
+async def iterate_in_thread(make_iterator: Callable[[], Iterator[bytes]], executor: ThreadPoolExecutor,
+                            max_buffered: int = 8) -> AsyncIterator[bytes]:
+    """
+    Drive a blocking iterator on executor and yield its items on the event loop.
+
+    At most max_buffered items are queued; when the consumer is slower the
+    producing thread blocks, which keeps memory bounded per request. Closing
+    the async generator early stops the producer after its current item.
+
+    Args:
+        make_iterator (Callable[[], Iterator[bytes]]): Creates the blocking iterator.
+        executor (ThreadPoolExecutor): Executor the iterator runs on.
+        max_buffered (int): Maximum number of items waiting to be consumed.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            for item in make_iterator():
+                if stop.is_set():
+                    return
+                asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+            asyncio.run_coroutine_threadsafe(queue.put(_END), loop).result()
+        except BaseException as e:
+            if not stop.is_set():
+                asyncio.run_coroutine_threadsafe(queue.put(e), loop).result()
+
+    producer = loop.run_in_executor(executor, wrap_context(produce))
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        while not producer.done():
+            # Unblock a producer waiting on a full queue so its thread is released.
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
+
+
+class _StreamSession:
+    """
+    State of one /stream WebSocket connection.
+
+    Three stages run concurrently: the reader segments incoming text into a
+    bounded queue of sentences, the dispatcher starts synthesis for up to
+    `prefetch` sentences ahead, and the sender delivers their audio strictly
+    in order. When the queues are full the reader stops consuming the socket,
+    so a fast client is throttled by TCP instead of growing server memory.
+    """
+
+    _FLUSH = object()
+
+    def __init__(self, server: "SynthesisServer", ws: web.WebSocketResponse, voice: Optional[str],
+                 provider: Optional[str] = None):
+        self.server = server
+        self.ws = ws
+        self.voice = voice
+        self.provider = provider
+        self.segmenter = SentenceSegmenter()
+        self.sentences: asyncio.Queue = asyncio.Queue(maxsize=server.stream_max_pending)
+        self.ordered: asyncio.Queue = asyncio.Queue(maxsize=server.stream_prefetch)
+        self.generation = 0
+        self.next_index = 0
+        self.current_task: Optional[asyncio.Task] = None
+
+    async def _synthesize(self, text: str, priority: Priority) -> bytes:
+        async with self.server._semaphore:
+            self.server.active_requests += 1
+            try:
+                return await self.server.manager.asynthesize(text, self.voice, self.provider, priority)
+            finally:
+                self.server.active_requests -= 1
+
+    async def _enqueue(self, sentences: list) -> None:
+        for sentence in sentences:
+            await self.sentences.put((self.generation, sentence))
+
+    def _cancel(self) -> None:
+        self.generation += 1
+        self.segmenter.reset()
+        while not self.sentences.empty():
+            self.sentences.get_nowait()
+        while not self.ordered.empty():
+            _, _, _, task = self.ordered.get_nowait()
+            if task:
+                task.cancel()
+        if self.current_task:
+            self.current_task.cancel()
+
+    async def read(self) -> None:
+        async for msg in self.ws:
+            if msg.type != web.WSMsgType.TEXT:
+                continue
+            try:
+                payload = json.loads(msg.data)
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict):
+                payload = {"type": "text", "text": msg.data}
+
+            kind = payload.get("type", "text")
+            if kind == "text":
+                await self._enqueue(self.segmenter.feed(str(payload.get("text", ""))))
+            elif kind == "flush":
+                await self._enqueue(self.segmenter.flush())
+                await self.sentences.put((self.generation, self._FLUSH))
+            elif kind == "cancel":
+                self._cancel()
+                await self.ws.send_json({"type": "cancelled"})
+            else:
+                await self.ws.send_json({"type": "error", "error": f"Unknown message type '{kind}'."})
+
+    async def dispatch(self) -> None:
+        while True:
+            generation, sentence = await self.sentences.get()
+            if generation != self.generation:
+                continue
+            if sentence is self._FLUSH:
+                await self.ordered.put((generation, None, sentence, None))
+                continue
+            # Nothing queued ahead means the client is waiting for this sentence now.
+            priority = Priority.INTERACTIVE if self.ordered.empty() else Priority.PREFETCH
+            task = asyncio.create_task(self._synthesize(sentence, priority))
+            await self.ordered.put((generation, self.next_index, sentence, task))
+            self.next_index += 1
+
+    async def send(self) -> None:
+        chunk_size = self.server.chunk_size or 16384
+        while True:
+            generation, index, sentence, task = await self.ordered.get()
+            if generation != self.generation:
+                if task:
+                    task.cancel()
+                continue
+            if task is None:
+                await self.ws.send_json({"type": "flushed"})
+                continue
+            self.current_task = task
+            try:
+                await asyncio.wait({task})
+            finally:
+                self.current_task = None
+            if task.cancelled() or generation != self.generation:
+                continue
+            if task.exception():
+                logger.error(f"Synthesis failed in /stream: {task.exception()}")
+                await self.ws.send_json({"type": "error", "index": index, "error": str(task.exception())})
+                continue
+            audio = task.result()
+            await self.ws.send_json({"type": "segment_start", "index": index, "text": sentence})
+            for offset in range(0, len(audio), chunk_size):
+                if generation != self.generation:
+                    break
+                await self.ws.send_bytes(audio[offset:offset + chunk_size])
+            await self.ws.send_json({"type": "segment_end", "index": index})
+
+    async def run(self) -> None:
+        workers = [asyncio.create_task(self.dispatch()), asyncio.create_task(self.send())]
+        try:
+            await self.read()
+        finally:
+            self._cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+class SynthesisServer:
+    """
+    aiohttp application exposing a TTSProviderManager over HTTP.
+
+    All clients share the manager's providers, cache and in-flight coalescing.
+    A semaphore caps concurrent synthesis; excess requests wait for a slot
+    without tying up a thread.
+    """
+
+    def __init__(self, manager: TTSProviderManager = tts_manager, max_concurrency: int = 64,
+                 chunk_size: Optional[int] = None, stream_prefetch: int = 2, stream_max_pending: int = 16,
+                 probe_interval: float = 0.0):
+        """
+        Initialize the server.
+
+        Args:
+            manager (TTSProviderManager): Initialized manager serving the requests.
+            max_concurrency (int): Maximum number of synthesis requests processed at once.
+            chunk_size (Optional[int]): Size of streamed audio chunks in bytes.
+            stream_prefetch (int): Sentences synthesized ahead of the one being sent on /stream.
+            stream_max_pending (int): Sentences buffered per /stream connection before reading pauses.
+            probe_interval (float): Seconds between health probes of the loaded providers; 0 disables them.
+        """
+        self.manager = manager
+        self.max_concurrency = max_concurrency
+        self.chunk_size = chunk_size
+        self.stream_prefetch = max(1, stream_prefetch)
+        self.stream_max_pending = max(1, stream_max_pending)
+        self.probe_interval = probe_interval
+        self._probe_task: Optional[asyncio.Task] = None
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="TTSServer")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.active_requests = 0
+        self.waiting_requests = 0
+        self.stream_connections = 0
+        metrics.SERVER_ACTIVE.set_function(lambda: self.active_requests)
+        metrics.SERVER_WAITING.set_function(lambda: self.waiting_requests)
+        metrics.SERVER_STREAMS.set_function(lambda: self.stream_connections)
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/synthesize", self.handle_synthesize)
+        app.router.add_post("/synthesize", self.handle_synthesize)
+        app.router.add_get("/voices", self.handle_voices)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/stream", self.handle_stream)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app: web.Application) -> None:
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.probe_interval > 0:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _probe_loop(self) -> None:
+        # Probes run on their own threads, so a hung provider never holds a request slot.
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            providers = self.manager.loaded_providers()
+            try:
+                results = await asyncio.to_thread(self.manager.probe_all, providers)
+            except Exception as e:
+                logger.error(f"Provider health probe failed: {e}")
+                continue
+            down = [name for name, result in results.items() if not result["healthy"]]
+            if down:
+                logger.warning(f"TTS providers failing health probes: {', '.join(down)}")
+
+    @staticmethod
+    async def _read_params(request: web.Request) -> dict:
+        params = dict(request.query)
+        if request.method == "POST" and request.can_read_body:
+            if request.content_type == "application/json":
+                try:
+                    body = await request.json()
+                except ValueError as e:
+                    raise web.HTTPBadRequest(text=f"Request body is not valid JSON: {e}")
+                if not isinstance(body, dict):
+                    raise web.HTTPBadRequest(text="Request body must be a JSON object.")
+                params.update(body)
+            else:
+                params.update(await request.post())
+        return params
+
+    async def _resolve_provider(self, provider_name: Optional[str]):
+        if provider_name and provider_name not in self.manager.loaded_providers():
+            # The first request for a provider instantiates it; keep that off the event loop.
+            try:
+                provider = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.manager.get_provider, provider_name)
+            except ValueError as e:
+                raise web.HTTPBadRequest(text=str(e))
+        else:
+            provider = self.manager.get_provider(provider_name)
+        if not provider:
+            raise web.HTTPServiceUnavailable(text="No active TTS provider.")
+        return provider
+
+    async def handle_synthesize(self, request: web.Request) -> web.StreamResponse:
+        params = await self._read_params(request)
+        for name in ("text", "voice", "provider"):
+            if params.get(name) is not None and not isinstance(params[name], str):
+                raise web.HTTPBadRequest(text=f"'{name}' must be a string.")
+        text = (params.get("text") or "").strip()
+        voice = params.get("voice") or None
+        provider_name = params.get("provider") or None
+        if not text:
+            raise web.HTTPBadRequest(text="Missing 'text' parameter.")
+        try:
+            priority = parse_priority(params.get("priority") or Priority.INTERACTIVE)
+            deadline = time.monotonic() + float(params["deadline_ms"]) / 1000 if params.get("deadline_ms") else None
+        except (TypeError, ValueError) as e:
+            raise web.HTTPBadRequest(text=f"Invalid priority or deadline_ms: {e}")
+
+        provider = await self._resolve_provider(provider_name)
+
+        self.waiting_requests += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting_requests -= 1
+
+        self.active_requests += 1
+        response = web.StreamResponse()
+        response.content_type = CONTENT_TYPES.get(provider.AUDIO_FORMAT, "application/octet-stream")
+        response.enable_chunked_encoding()
+        try:
+            chunks = iterate_in_thread(
+                lambda: self.manager.stream_speech(text, voice, self.chunk_size, provider_name, priority, deadline),
+                self.executor)
+            try:
+                async for chunk in chunks:
+                    if not response.prepared:
+                        # The fallback or short-text provider may answer in another format.
+                        audio_format = detect_audio_format(chunk, provider.AUDIO_FORMAT)
+                        response.content_type = CONTENT_TYPES.get(audio_format, "application/octet-stream")
+                        await response.prepare(request)
+                    await response.write(chunk)
+            finally:
+                await chunks.aclose()
+        except (ConnectionResetError, asyncio.CancelledError):
+            logger.debug("Client disconnected during /synthesize.")
+            raise
+        except DeadlineExceeded as e:
+            logger.info(f"Dropped /synthesize request: {e}")
+            raise web.HTTPGatewayTimeout(text=str(e))
+        except Exception as e:
+            logger.error(f"Synthesis failed in /synthesize: {e}")
+            if not response.prepared:
+                raise web.HTTPBadGateway(text=f"Synthesis failed: {e}")
+            return response
+        finally:
+            self.active_requests -= 1
+            self._semaphore.release()
+
+        if not response.prepared:
+            await response.prepare(request)
+        await response.write_eof()
+        return response
+
+    async def handle_stream(self, request: web.Request) -> web.WebSocketResponse:
+        provider_name = request.query.get("provider") or None
+        await self._resolve_provider(provider_name)
+        ws = web.WebSocketResponse(max_msg_size=1024 * 1024)
+        await ws.prepare(request)
+        self.stream_connections += 1
+        try:
+            await _StreamSession(self, ws, request.query.get("voice") or None, provider_name).run()
+        finally:
+            self.stream_connections -= 1
+        return ws
+
+    async def handle_voices(self, request: web.Request) -> web.Response:
+        provider = await self._resolve_provider(request.query.get("provider") or None)
+        return web.json_response({
+            "provider": provider.PROVIDER_NAME,
+            "voices": list(provider.list_available_voices()),
+        })
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        provider = self.manager.get_provider()
+        scheduler = self.manager.get_scheduler()
+        return web.json_response({
+            "status": "ok" if provider else "no_provider",
+            "provider": provider.PROVIDER_NAME if provider else None,
+            "loaded_providers": self.manager.loaded_providers(),
+            "provider_health": self.manager.provider_health(),
+            "scheduler": scheduler.stats() if scheduler else None,
+            "active_requests": self.active_requests,
+            "waiting_requests": self.waiting_requests,
+            "stream_connections": self.stream_connections,
+            "max_concurrency": self.max_concurrency,
+        })
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=render_metrics().encode("utf-8"), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the TTS-Engine HTTP synthesis service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--provider", default="deepgram",
+                        help=f"Default provider, one of: {', '.join(TTSProviderManager.PROVIDERS)}")
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    parser.add_argument("--provider-concurrency", type=int, default=0,
+                        help="Concurrent calls per provider, admitted by priority and deadline (0 = unscheduled)")
+    parser.add_argument("--reserved-interactive", type=int, default=1,
+                        help="Slots per provider kept free for interactive requests")
+    parser.add_argument("--fallback-provider", default=None,
+                        help="Provider that answers when the requested one fails, e.g. espeak")
+    parser.add_argument("--short-text-provider", default=None,
+                        help="Provider for prompts of at most --short-text-max-chars characters, e.g. espeak")
+    parser.add_argument("--short-text-max-chars", type=int, default=24)
+    parser.add_argument("--warmup", action="store_true",
+                        help="Connect to and probe the configured providers in the background at startup")
+    parser.add_argument("--probe-interval", type=float, default=0.0,
+                        help="Seconds between health probes of the loaded providers (0 = off)")
+    parser.add_argument("--cache-dir", default=None, help="Synthesis cache directory (default: data/cache/tts)")
+    parser.add_argument("--cache-backend", choices=("files", "packed"), default="files",
+                        help="One file per clip, or clips packed into segment files with a memory-mapped index")
+    parser.add_argument("--cache-codec", choices=("opus", "mp3"), default=None,
+                        help="Re-encode cached clips to this codec in the background to save space")
+    parser.add_argument("--cache-bitrate", default=DEFAULT_BITRATE, help="Bitrate of re-encoded cached clips")
+    parser.add_argument("--import-bundle", action="append", default=[],
+                        help="Merge a cache bundle into the cache before serving (repeatable)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the synthesis cache")
+    args = parser.parse_args()
+
+    tts_manager.initialize(args.provider)
+    if args.provider_concurrency > 0:
+        tts_manager.set_scheduler(SynthesisScheduler(args.provider_concurrency, args.reserved_interactive))
+    tts_manager.set_fallback(args.fallback_provider)
+    tts_manager.set_short_text_provider(args.short_text_provider, args.short_text_max_chars)
+    if not args.no_cache:
+        cache_class = PackedSynthesisCache if args.cache_backend == "packed" else SynthesisCache
+        cache = cache_class(args.cache_dir) if args.cache_dir else cache_class()
+        if args.cache_codec:
+            cache = TranscodingCache(cache, codec=args.cache_codec, bitrate=args.cache_bitrate)
+        for bundle_path in args.import_bundle:
+            import_bundle(cache, bundle_path)
+        tts_manager.set_cache(cache)
+
+    if args.warmup:
+        tts_manager.warmup()
+
+    server = SynthesisServer(tts_manager, max_concurrency=args.max_concurrency, probe_interval=args.probe_interval)
+    web.run_app(server.create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
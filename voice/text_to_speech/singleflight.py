@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Set, Tuple, TypeVar
+
+from core.logger import get_logger
+from core.tracing import wrap_context
+from voice.text_to_speech import metrics
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key runs the function; every caller that arrives
+    while it is still running waits for the same result (or exception) instead
+    of running it again. Sync and async callers share the same in-flight
+    table, so a thread and a coroutine asking for the same key are coalesced
+    too. Once the call finishes the key is forgotten, so results are never
+    served stale.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.coalesced = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of distinct calls currently in flight."""
+        return len(self._calls)
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                metrics.COALESCED.inc()
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], T]) -> None:
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run fn for key unless an identical call is in flight, then return its result.
+
+        Args:
+            key (Hashable): Identity of the call.
+            fn (Callable[[], T]): Blocking function producing the result.
+
+        Returns:
+            T: The result shared by every caller of this flight.
+        """
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn)
+        else:
+            logger.debug(f"Coalesced duplicate request for key {key}")
+        return future.result()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Async variant of do(). The leader runs the blocking fn in the default executor.
+
+        Cancelling a waiting coroutine does not cancel the shared call.
+        """
+        future, leader = self._join(key)
+        if leader:
+            asyncio.get_running_loop().run_in_executor(None, wrap_context(self._run), key, future, fn)
+        else:
+            logger.debug(f"Coalesced duplicate request for key {key}")
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    async def _run_coroutine(self, key: Hashable, future: Future, make_coroutine: Callable[[], Awaitable[T]]) -> None:
+        try:
+            future.set_result(await make_coroutine())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_coroutine(self, key: Hashable, make_coroutine: Callable[[], Awaitable[T]]) -> T:
+        """
+        Like do_async(), but the leader runs a coroutine on the event loop, for
+        work that awaits (e.g. a scheduler slot) before it blocks.
+
+        Cancelling a waiting coroutine does not cancel the shared call.
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(self._run_coroutine(key, future, make_coroutine))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            logger.debug(f"Coalesced duplicate request for key {key}")
+        return await asyncio.shield(asyncio.wrap_future(future))
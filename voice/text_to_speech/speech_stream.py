@@ -0,0 +1,240 @@
+import asyncio
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator, Optional
+
+from core.logger import get_logger
+from core.tracing import wrap_context
+from voice.text_to_speech.active_provider import TTSProviderManager, tts_manager
+from voice.text_to_speech.base import detect_audio_format
+from voice.text_to_speech.scheduler import Priority
+from voice.text_to_speech.segmenter import SentenceSegmenter
+
+logger = get_logger(__name__)
+
+_CLOSED = object()
+
+
+class SpeechStream:
+    """
+    Incremental text-to-speech for token streams.
+
+    Text fragments are fed as they arrive; every completed sentence is handed
+    to the provider immediately, with up to `prefetch` syntheses in flight, and
+    the audio comes out strictly in order. At most `max_pending` segments are
+    synthesizing or waiting to be consumed; later sentences wait as text until
+    the consumer catches up, so feed() never blocks. Iterate the stream (sync or async)
+    to consume audio, or pass play=True to have it played in the background.
+    A sentence with no audio queued ahead of it is synthesized at interactive
+    priority, one queued behind others at prefetch priority.
+
+    Usage:
+        with SpeechStream(play=True) as stream:
+            for token in llm_reply:
+                stream.feed(token)
+        stream.wait()
+    """
+
+    def __init__(self, manager: TTSProviderManager = tts_manager, voice: Optional[str] = None,
+                 prefetch: int = 2, play: bool = False, segmenter: Optional[SentenceSegmenter] = None,
+                 provider: Optional[str] = None, max_pending: int = 8):
+        """
+        Initialize the stream.
+
+        Args:
+            manager (TTSProviderManager): Initialized manager used for synthesis.
+            voice (Optional[str]): Voice to use; None uses the provider default.
+            prefetch (int): Maximum number of segments synthesized concurrently.
+            play (bool): Play each segment as soon as it is ready, in a background thread.
+            segmenter (Optional[SentenceSegmenter]): Custom segmenter; defaults to sentence splitting.
+            provider (Optional[str]): Provider to use; None uses the manager's default.
+            max_pending (int): Maximum number of segments submitted for synthesis but not yet consumed.
+        """
+        self.manager = manager
+        self.voice = voice
+        self.provider = provider
+        self.prefetch = max(1, prefetch)
+        self.max_pending = max(self.prefetch, max_pending)
+        self.segmenter = segmenter or SentenceSegmenter()
+        self.segments_submitted = 0
+        self.segments_failed = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix="SpeechStream")
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._backlog: deque = deque()  # Segments not submitted yet
+        self._pending: deque = deque()  # (segment, future) submitted and not consumed yet, in order
+        self._waiters: list = []        # (loop, future) of async consumers waiting for _pending
+        self._closed = False
+        self._consumed = False
+        self._player: Optional[threading.Thread] = None
+
+        if play:
+            self._player = threading.Thread(target=self._play_all, name="SpeechStreamPlayer", daemon=True)
+            self._player.start()
+
+    def _submit(self, segments: list) -> None:
+        # Called with the lock held.
+        self._backlog.extend(segments)
+        while self._backlog and len(self._pending) < self.max_pending:
+            segment = self._backlog.popleft()
+            priority = Priority.PREFETCH if self._pending else Priority.INTERACTIVE
+            future = self._executor.submit(wrap_context(self.manager.synthesize), segment, self.voice, self.provider,
+                                           priority)
+            self._pending.append((segment, future))
+            self.segments_submitted += 1
+        if self._closed and not self._backlog:
+            self._executor.shutdown(wait=False)
+        self._notify()
+
+    def _notify(self) -> None:
+        self._ready.notify_all()
+        for loop, waiter in self._waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+        self._waiters.clear()
+
+    def _pop(self):
+        """
+        Take the next submitted segment; called with the lock held.
+
+        Returns:
+            (segment, future), _CLOSED at the end of the stream, or None if nothing is ready yet.
+        """
+        if self._pending:
+            item = self._pending.popleft()
+            self._submit([])
+            return item
+        if self._closed and not self._backlog:
+            return _CLOSED
+        return None
+
+    def feed(self, text_fragment: str) -> None:
+        """
+        Add a text fragment; any sentence it completes starts synthesizing at once.
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("Cannot feed a closed SpeechStream.")
+            self._submit(self.segmenter.feed(text_fragment))
+
+    def flush(self) -> None:
+        """
+        Synthesize whatever text is buffered, even without a sentence boundary.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._submit(self.segmenter.flush())
+
+    def close(self) -> None:
+        """
+        Flush the remaining text and mark the end of the stream.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._submit(self.segmenter.flush())
+
+    def _next_result(self, item) -> Optional[bytes]:
+        segment, future = item
+        try:
+            return future.result()
+        except Exception as e:
+            self.segments_failed += 1
+            logger.error(f"SpeechStream failed to synthesize segment '{segment[:40]}': {e}")
+            return None
+
+    def _claim(self) -> None:
+        if self._consumed:
+            raise RuntimeError("SpeechStream audio can only be consumed once.")
+        self._consumed = True
+
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Yield the audio of every segment in order, blocking until each is ready.
+        """
+        self._claim()
+        while True:
+            with self._ready:
+                item = self._pop()
+                while item is None:
+                    self._ready.wait()
+                    item = self._pop()
+            if item is _CLOSED:
+                return
+            audio = self._next_result(item)
+            if audio:
+                yield audio
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """
+        Async variant of iteration; waits without blocking the event loop.
+        """
+        self._claim()
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                item = self._pop()
+                if item is None:
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+            if item is None:
+                # Woken from the feeding thread through call_soon_threadsafe.
+                await waiter
+                continue
+            if item is _CLOSED:
+                return
+            segment, future = item
+            try:
+                audio = await asyncio.wrap_future(future)
+            except Exception as e:
+                self.segments_failed += 1
+                logger.error(f"SpeechStream failed to synthesize segment '{segment[:40]}': {e}")
+                continue
+            if audio:
+                yield audio
+
+    def _play_all(self) -> None:
+        from utils.helpers import play_audio
+
+        provider = self.manager.get_provider(self.provider)
+        default_format = provider.AUDIO_FORMAT if provider else "mp3"
+        for audio in self:
+            suffix = f".{detect_audio_format(audio, default_format)}"
+            fd, file_path = tempfile.mkstemp(suffix=suffix, prefix="speech_stream_")
+            try:
+                with os.fdopen(fd, "wb") as audio_file:
+                    audio_file.write(audio)
+                play_audio(file_path)
+            except Exception as e:
+                logger.error(f"SpeechStream playback failed: {e}")
+            finally:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until background playback has finished. Call close() first.
+
+        Returns:
+            bool: True if playback finished (or play was not enabled).
+        """
+        if self._player is None:
+            return True
+        self._player.join(timeout)
+        return not self._player.is_alive()
+
+    def __enter__(self) -> "SpeechStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -0,0 +1,285 @@
+import itertools
+import queue
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional
+
+from core.logger import get_logger
+from voice.audio.codec import AudioCodecError, transcode_bytes
+from voice.text_to_speech import metrics
+from voice.text_to_speech.base import detect_audio_format
+
+logger = get_logger(__name__)
+
+DEFAULT_CODEC = "opus"
+DEFAULT_BITRATE = "24k"
+DEFAULT_DECODED_ENTRIES = 32
+# Container signatures of the compact codecs, checked before the metadata is read on a hit.
+_SIGNATURES = {"opus": b"OggS", "mp3": b"ID3"}
+
+
+class TranscodingCache:
+    """
+    Cache policy that re-encodes entries to a compact codec after they are stored.
+
+    Wraps a SynthesisCache or PackedSynthesisCache. put() stores the audio as
+    the provider returned it and queues the entry; a background thread then
+    re-encodes it (low-bitrate mono Opus by default) and replaces the stored
+    copy when that is smaller. Reads of a re-encoded entry decode it back to
+    the original format, so callers always get what the provider would have
+    returned. The metadata of a re-encoded entry records the stored codec and
+    both sizes, which stats() sums up as the savings of the whole cache.
+
+    Re-encoding is lossy: an MP3 served from an Opus copy has been through
+    two lossy encoders, which is audible at low bitrates. Entries already
+    stored in the target codec are never re-encoded. Decoding a hit costs an
+    ffmpeg run, so the most recently decoded entries are kept in memory;
+    beyond those this suits large prompt catalogs where disk footprint and
+    cold reads dominate, not hot loops.
+    """
+
+    def __init__(self, cache, codec: str = DEFAULT_CODEC, bitrate: str = DEFAULT_BITRATE, mono: bool = True,
+                 min_saving: float = 0.1, decoded_entries: int = DEFAULT_DECODED_ENTRIES):
+        """
+        Initialize the policy.
+
+        Args:
+            cache (SynthesisCache | PackedSynthesisCache): Cache that holds the entries.
+            codec (str): Storage codec, "opus" or "mp3".
+            bitrate (str): Target bitrate of the stored copy, e.g. "16k", "24k" or "32k".
+            mono (bool): Downmix to one channel before encoding.
+            min_saving (float): Keep the original unless re-encoding saves at least this fraction of it.
+                                Re-encoded entries are served after a second lossy encode, so raise this
+                                (or the bitrate) if quality matters more than disk space.
+            decoded_entries (int): Number of decoded re-encoded entries kept in memory; 0 disables it.
+        """
+        if codec not in _SIGNATURES:
+            raise ValueError(f"Unsupported cache codec '{codec}'. Available codecs: {', '.join(_SIGNATURES)}")
+        self.cache = cache
+        self.codec = codec
+        self.bitrate = bitrate
+        self.mono = mono
+        self.min_saving = min_saving
+        self.decoded_entries = max(0, decoded_entries)
+
+        self.transcoded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+        self._lock = threading.Lock()
+        # Generation of the latest put of each queued key; a re-encode of replaced or deleted audio is discarded.
+        self._generations: Dict[str, int] = {}
+        self._next_generation = itertools.count(1)
+        # Decoded audio of recently read re-encoded entries, most recent last.
+        self._decoded: "OrderedDict[str, bytes]" = OrderedDict()
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        metrics.CACHE_TRANSCODE_QUEUE.set_function(self._queue.qsize)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.cache
+
+    def _decode(self, key: str, data) -> Any:
+        if not any(bytes(data[:len(signature)]) == signature for signature in _SIGNATURES.values()):
+            return data
+        metadata = self.cache.get_metadata(key) or {}
+        stored_format = metadata.get("stored_format")
+        source_format = metadata.get("format") or "mp3"
+        if not stored_format or stored_format == source_format:
+            return data
+        with self._lock:
+            decoded = self._decoded.get(key)
+            if decoded is not None:
+                self._decoded.move_to_end(key)
+                return decoded
+        try:
+            decoded = transcode_bytes(bytes(data), source_format)
+        except AudioCodecError as e:
+            logger.error(f"Could not decode cached entry {key[:12]} from {stored_format}: {e}")
+            return None
+        if self.decoded_entries:
+            with self._lock:
+                self._decoded[key] = decoded
+                while len(self._decoded) > self.decoded_entries:
+                    self._decoded.popitem(last=False)
+        return decoded
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return the cached audio for key in its original format, or None on a miss.
+        """
+        data = self.cache.get(key)
+        return None if data is None else self._decode(key, data)
+
+    def get_view(self, key: str) -> Optional[memoryview]:
+        """
+        Return the cached audio for key as a memoryview, or None on a miss.
+        Entries that were not re-encoded are returned without a copy.
+        """
+        view = self.cache.get_view(key)
+        if view is None:
+            return None
+        data = self._decode(key, view)
+        return None if data is None else memoryview(data)
+
+    def get_metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the metadata stored alongside key, or None if the entry does not exist.
+        """
+        return self.cache.get_metadata(key)
+
+    def put(self, key: str, data: bytes, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store audio under key and queue it for re-encoding.
+
+        Args:
+            key (str): Cache key from make_cache_key.
+            data (bytes): Encoded audio.
+            metadata (Optional[Dict[str, Any]]): Provider, voice, text_sha256 and format of the entry.
+        """
+        with self._lock:
+            generation = next(self._next_generation)
+            self._generations[key] = generation
+            self._decoded.pop(key, None)
+            self.cache.put(key, data, metadata)
+        self._queue.put((key, generation))
+        self._ensure_worker()
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry if present.
+        """
+        with self._lock:
+            self._generations.pop(key, None)
+            self._decoded.pop(key, None)
+            self.cache.delete(key)
+
+    def keys(self) -> Iterator[str]:
+        """
+        Iterate over the keys of all entries.
+        """
+        return self.cache.keys()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="tts-cache-transcoder", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._transcode(*item)
+            except Exception as e:
+                logger.error(f"Cache transcoder failed on {item[0][:12]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _transcode(self, key: str, generation: int) -> None:
+        try:
+            self._transcode_entry(key, generation)
+        finally:
+            with self._lock:
+                if self._generations.get(key) == generation:
+                    del self._generations[key]
+
+    def _transcode_entry(self, key: str, generation: int) -> None:
+        if self._generations.get(key) != generation:
+            return
+        data = self.cache.get(key)
+        metadata = dict(self.cache.get_metadata(key) or {})
+        if data is None or metadata.get("stored_format"):
+            return
+        if (metadata.get("format") or detect_audio_format(data, "")) == self.codec:
+            # Already in the storage codec; a second lossy pass would only cost quality.
+            self._count("skipped")
+            return
+        try:
+            encoded = transcode_bytes(data, self.codec, self.bitrate, 1 if self.mono else None)
+        except AudioCodecError as e:
+            logger.warning(f"Could not re-encode cached entry {key[:12]} to {self.codec}: {e}")
+            self._count("failed")
+            return
+        if len(encoded) > len(data) * (1 - self.min_saving):
+            self._count("skipped")
+            return
+        metadata.update(stored_format=self.codec, stored_bitrate=self.bitrate,
+                        source_bytes=len(data), stored_bytes=len(encoded))
+        with self._lock:
+            if self._generations.get(key) != generation:
+                return
+            self.cache.put(key, encoded, metadata)
+        self._count("stored", len(data), len(encoded))
+
+    def _count(self, result: str, before: int = 0, after: int = 0) -> None:
+        with self._lock:
+            if result == "stored":
+                self.transcoded += 1
+                self.bytes_before += before
+                self.bytes_after += after
+            elif result == "skipped":
+                self.skipped += 1
+            else:
+                self.failed += 1
+        metrics.CACHE_TRANSCODES.labels(result).inc()
+        if before:
+            metrics.CACHE_BYTES_SAVED.inc(before - after)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued entry has been processed.
+
+        Returns:
+            bool: True if the queue drained, False if timeout expired first.
+        """
+        if timeout is None:
+            self._queue.join()
+            return True
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        return done.wait(timeout)
+
+    def stats(self, scan: bool = False) -> Dict[str, int]:
+        """
+        Re-encoding counts and byte savings.
+
+        Args:
+            scan (bool): Also sum the savings recorded in the metadata of every
+                         entry, including those re-encoded by earlier runs.
+
+        Returns:
+            Dict[str, int]: Counts for this process, the queue length and, with scan,
+                            the stored and original sizes of all re-encoded entries.
+        """
+        with self._lock:
+            result = {
+                "transcoded": self.transcoded,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "pending": self._queue.qsize(),
+                "bytes_saved": self.bytes_before - self.bytes_after,
+            }
+        if scan:
+            source = stored = 0
+            for key in self.cache.keys():
+                metadata = self.cache.get_metadata(key) or {}
+                if metadata.get("stored_format"):
+                    source += metadata.get("source_bytes", 0)
+                    stored += metadata.get("stored_bytes", 0)
+            result.update(total_source_bytes=source, total_stored_bytes=stored, total_bytes_saved=source - stored)
+        return result
+
+    def close(self) -> None:
+        """
+        Let queued entries finish, stop the background thread and close the wrapped cache.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if hasattr(self.cache, "close"):
+            self.cache.close()
@@ -0,0 +1,128 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from core.logger import get_logger
+from voice.text_to_speech.scheduler import Priority
+
+logger = get_logger(__name__)
+
+DEFAULT_PHRASES_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "user_data", "tts_phrases.txt")
+)
+
+
+def load_phrases(phrases_path: str = DEFAULT_PHRASES_PATH) -> List[str]:
+    """
+    Read a phrase list file: one phrase per line, blank lines and lines starting with '#' ignored.
+
+    Returns:
+        List[str]: The phrases in file order, without duplicates.
+    """
+    phrases = []
+    seen = set()
+    with open(phrases_path, "r", encoding="utf-8") as f:
+        for line in f:
+            phrase = line.strip()
+            if phrase and not phrase.startswith("#") and phrase not in seen:
+                seen.add(phrase)
+                phrases.append(phrase)
+    return phrases
+
+
+class CacheWarmer:
+    """
+    Pre-synthesizes a list of phrases into the synthesis cache in the background.
+
+    Work runs on a daemon thread with at most max_concurrency provider calls in
+    flight, so application startup never waits for it. Phrases already in the
+    cache are skipped without touching the provider. Requests run at batch
+    priority, so with a scheduler they yield to live synthesis.
+    """
+
+    def __init__(self, manager, phrases: List[str], voice: Optional[str] = None, max_concurrency: int = 2,
+                 on_progress: Optional[Callable[["CacheWarmer"], None]] = None, provider: Optional[str] = None):
+        """
+        Initialize the warmer.
+
+        Args:
+            manager (TTSProviderManager): Manager whose providers and cache are used.
+            phrases (List[str]): Phrases to pre-synthesize.
+            voice (Optional[str]): Voice to synthesize with; None uses the provider default.
+            max_concurrency (int): Maximum number of concurrent provider requests.
+            on_progress (Optional[Callable]): Called with this warmer after every phrase.
+            provider (Optional[str]): Provider to synthesize with; None uses the manager's default.
+        """
+        self.manager = manager
+        self.phrases = phrases
+        self.voice = voice
+        self.max_concurrency = max(1, max_concurrency)
+        self.on_progress = on_progress
+        self.provider = provider
+
+        self.total = len(phrases)
+        self.completed = 0
+        self.skipped = 0
+        self.failed = 0
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def processed(self) -> int:
+        return self.completed + self.skipped + self.failed
+
+    def is_running(self) -> bool:
+        return self._thread is not None and not self._done.is_set()
+
+    def start(self) -> "CacheWarmer":
+        """
+        Start warming in a background daemon thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="TTSCacheWarmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until warming finishes.
+
+        Returns:
+            bool: True if warming finished within the timeout.
+        """
+        return self._done.wait(timeout)
+
+    def _warm_one(self, phrase: str) -> None:
+        try:
+            if self.manager.is_cached(phrase, self.voice, self.provider):
+                outcome = "skipped"
+            else:
+                self.manager.synthesize(phrase, self.voice, self.provider, Priority.BATCH)
+                outcome = "completed"
+        except Exception as e:
+            logger.warning(f"Cache warm-up failed for phrase '{phrase[:40]}': {e}")
+            outcome = "failed"
+
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        logger.debug(f"Cache warm-up progress: {self.processed}/{self.total}")
+        if self.on_progress:
+            try:
+                self.on_progress(self)
+            except Exception as e:
+                logger.warning(f"Cache warm-up progress callback failed: {e}")
+
+    def _run(self) -> None:
+        logger.info(f"Warming TTS cache with {self.total} phrases (concurrency {self.max_concurrency}).")
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="TTSCacheWarmer") as executor:
+                list(executor.map(self._warm_one, self.phrases))
+        finally:
+            self._done.set()
+            logger.info(
+                f"TTS cache warm-up finished: {self.completed} synthesized, "
+                f"{self.skipped} already cached, {self.failed} failed."
+            )
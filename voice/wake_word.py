@@ -1,8 +1,7 @@
-import pvporcupine
-import pyaudio
 import struct
 from core.logger import get_logger
 from core.config import AppConfig
+from core.tracing import span
 
 class WakeWordDetector:
     def __init__(self, access_key, keywords=None, keyword_paths=None, sensitivities=None):
@@ -19,6 +18,8 @@ class WakeWordDetector:
         self.porcupine = None
         self.audio_stream = None
         try:
+            # Imported on first use so that importing this module stays cheap.
+            import pyaudio
             self.pa = pyaudio.PyAudio()
             self.logger.info("PyAudio initialized for WakeWordDetector.")
         except Exception as e:
@@ -32,6 +33,8 @@ class WakeWordDetector:
             self.logger.warning("Detector already started.")
             return
 
+        import pvporcupine
+        import pyaudio
         try:
             self.porcupine = pvporcupine.create(
                 access_key=self.access_key,
@@ -64,18 +67,23 @@ class WakeWordDetector:
             self.logger.error("Detector not started. Call start_detector() first.")
             raise RuntimeError("Wake word detector is not properly started.")
 
-        try:
-            while True:
-                pcm = self.audio_stream.read(self.porcupine.frame_length, exception_on_overflow=False)
-                pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
-                result = self.porcupine.process(pcm)
+        with span("wake_word.listen") as s:
+            frames = 0
+            try:
+                while True:
+                    pcm = self.audio_stream.read(self.porcupine.frame_length, exception_on_overflow=False)
+                    pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
+                    result = self.porcupine.process(pcm)
+                    frames += 1
 
-                if result >= 0:
-                    self.logger.info(f"Wake word '{self.keywords[result]}' detected.")
-                    return True
-        except Exception as e:
-            self.logger.error(f"Error during wake word listening: {e}")
-            return False
+                    if result >= 0:
+                        self.logger.info(f"Wake word '{self.keywords[result]}' detected.")
+                        s.set_attributes(keyword=self.keywords[result], frames=frames)
+                        return True
+            except Exception as e:
+                self.logger.error(f"Error during wake word listening: {e}")
+                s.set_attributes(error=f"{type(e).__name__}: {e}", frames=frames)
+                return False
 
     def stop_detector(self):
         if self.audio_stream is not None: